@@ -0,0 +1,172 @@
+"""Benchmark de carga contra uma instância em execução do site.
+
+Exemplo (com um banco populado por `flask gerar-dados`):
+
+    DATABASE_URL=sqlite:///bench.db gunicorn app:app --bind 127.0.0.1:8000 -w 4
+    python benchmark.py --url http://127.0.0.1:8000 --concorrencia 8 --duracao 30 --saida base.json
+    python benchmark.py --url http://127.0.0.1:8000 --comparar base.json
+
+Usa apenas a biblioteca padrão para poder rodar em qualquer máquina.
+"""
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Peso de cada cenário no sorteio: a lanchonete domina o tráfego real.
+CENARIOS = {
+    'GET /lanchonete': 30,
+    'POST /finalizar-pedido': 10,
+    'GET /dashboard': 20,
+    'GET /pedidos': 10,
+    'GET /admin/relatorio/produtos.csv': 3,
+    'GET /admin/relatorio/usuarios.csv': 3,
+    'GET /admin/relatorio/vendas_diarias.csv': 4,
+}
+
+
+class Cliente:
+    """Um navegador simulado: guarda o cookie de sessão do login."""
+
+    def __init__(self, url_base, usuario, senha):
+        self.url_base = url_base.rstrip('/')
+        self.abridor = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self.requisitar('POST', '/login', formulario={'username': usuario, 'password': senha})
+
+    def requisitar(self, metodo, caminho, formulario=None, json_corpo=None):
+        dados, cabecalhos = None, {}
+        if formulario is not None:
+            dados = urllib.parse.urlencode(formulario).encode()
+        elif json_corpo is not None:
+            dados = json.dumps(json_corpo).encode()
+            cabecalhos['Content-Type'] = 'application/json'
+        pedido = urllib.request.Request(self.url_base + caminho, data=dados, headers=cabecalhos, method=metodo)
+        try:
+            with self.abridor.open(pedido, timeout=30) as resposta:
+                return resposta.status, resposta.read()
+        except urllib.error.HTTPError as erro:
+            return erro.code, erro.read()
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def ids_dos_produtos(cliente):
+    _, corpo = cliente.requisitar('GET', '/lanchonete/catalogo')
+    return [produto['id'] for produto in json.loads(corpo)['produtos']]
+
+
+def executar(args):
+    random.seed(args.semente)
+    cenarios = list(CENARIOS)
+    pesos = [CENARIOS[c] for c in cenarios]
+    resultados = {c: {'latencias': [], 'erros': 0} for c in cenarios}
+    lock = threading.Lock()
+    produtos = ids_dos_produtos(Cliente(args.url, args.usuario, args.senha))
+    if not produtos:
+        sys.exit('Nenhum produto encontrado em /lanchonete. Rode `flask gerar-dados` antes.')
+    fim = time.perf_counter() + args.duracao
+
+    def trabalhador(numero):
+        cliente = Cliente(args.url, args.usuario, args.senha)
+        sorteio = random.Random(args.semente + numero)
+        while time.perf_counter() < fim:
+            cenario = sorteio.choices(cenarios, weights=pesos)[0]
+            metodo, caminho = cenario.split(' ', 1)
+            corpo = None
+            if caminho == '/finalizar-pedido':
+                corpo = {'nome_cliente': f'Benchmark {numero}', 'carrinho': [
+                    {'id': pid, 'quantidade': sorteio.randint(1, 2)}
+                    for pid in sorteio.sample(produtos, min(3, len(produtos)))]}
+            inicio = time.perf_counter()
+            try:
+                status, _ = cliente.requisitar(metodo, caminho, json_corpo=corpo)
+            except OSError:
+                status = None
+            duracao = time.perf_counter() - inicio
+            with lock:
+                resultados[cenario]['latencias'].append(duracao)
+                if status is None or status >= 400:
+                    resultados[cenario]['erros'] += 1
+
+    inicio_geral = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        list(executor.map(trabalhador, range(args.concorrencia)))
+    tempo_total = time.perf_counter() - inicio_geral
+
+    def resumir(latencias, erros):
+        return {
+            'requisicoes': len(latencias),
+            'erros': erros,
+            'vazao_rps': round(len(latencias) / tempo_total, 2),
+            'p50_ms': _ms(percentil(latencias, 50)),
+            'p95_ms': _ms(percentil(latencias, 95)),
+            'p99_ms': _ms(percentil(latencias, 99)),
+        }
+
+    todas = [l for r in resultados.values() for l in r['latencias']]
+    return {
+        'url': args.url,
+        'concorrencia': args.concorrencia,
+        'duracao_s': round(tempo_total, 2),
+        'total': resumir(todas, sum(r['erros'] for r in resultados.values())),
+        'rotas': {c: resumir(r['latencias'], r['erros']) for c, r in resultados.items()},
+    }
+
+
+def _ms(segundos):
+    return None if segundos is None else round(segundos * 1000, 2)
+
+
+def comparar(atual, base):
+    """Mostra a variação percentual de vazão e p95 em relação a um resultado anterior."""
+    linhas = []
+    for nome, atual_rota in [('total', atual['total'])] + list(atual['rotas'].items()):
+        base_rota = base['total'] if nome == 'total' else base['rotas'].get(nome)
+        if not base_rota or not base_rota['p95_ms'] or not atual_rota['p95_ms']:
+            continue
+        vazao = (atual_rota['vazao_rps'] / base_rota['vazao_rps'] - 1) * 100 if base_rota['vazao_rps'] else 0
+        p95 = (atual_rota['p95_ms'] / base_rota['p95_ms'] - 1) * 100
+        linhas.append(f'{nome:45} vazão {vazao:+7.1f}%   p95 {p95:+7.1f}%')
+    return '\n'.join(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concorrencia', type=int, default=8)
+    parser.add_argument('--duracao', type=float, default=30, help='segundos de carga')
+    parser.add_argument('--usuario', default='bench_admin')
+    parser.add_argument('--senha', default='bench')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', help='arquivo onde gravar o resultado em JSON')
+    parser.add_argument('--comparar', help='resultado JSON anterior para comparação')
+    args = parser.parse_args()
+
+    resultado = executar(args)
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto)
+    print(texto)
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            print('\n--- Comparação com', args.comparar, '---')
+            print(comparar(resultado, json.load(f)))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,12 @@
-import os
-import re
 import ast
-from bs4 import BeautifulSoup
-
-# Funções auxiliares para extrair classes (pode colocar no início do arquivo)
-def extrair_classes_html(arquivo_html):
-    """Extrai todas as classes únicas de um arquivo HTML."""
-    try:
-        with open(arquivo_html, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f, 'html.parser')
-        classes = set()
-        for tag in soup.find_all(True, class_=True):
-            for cls in tag.get('class', []):
-                classes.add(cls)
-        return classes
-    except Exception as e:
-        print(f"  [AVISO] Não foi possível ler o arquivo HTML '{arquivo_html}': {e}")
-        return set()
+from fraternoamor.purga_css import classes_definidas, classes_por_template
 
+# Extração de classes compartilhada com o build do CSS (`flask construir-estaticos`)
 def extrair_classes_css(arquivo_css):
     """Extrai todos os seletores de classe de um arquivo CSS."""
     try:
         with open(arquivo_css, 'r', encoding='utf-8') as f:
-            content = f.read()
-        classes = set(re.findall(r'\.([a-zA-Z0-9_-]+)', content))
-        return classes
+            return classes_definidas(f.read())
     except FileNotFoundError:
         print(f"  [ERRO] Arquivo CSS principal '{arquivo_css}' não encontrado.")
         return None
@@ -65,22 +47,16 @@ def check_html_css_consistency(templates_dir='templates', css_file='static/css/e
     print("  Analisando arquivos de template...")
 
     problemas_encontrados = False
-    
-    # Percorre todos os arquivos e subpastas dentro de 'templates'
-    for root, _, files in os.walk(templates_dir):
-        for file in files:
-            if file.endswith('.html'):
-                html_path = os.path.join(root, file)
-                classes_html = extrair_classes_html(html_path)
-                
-                classes_faltando = classes_html - classes_css
-                
-                if classes_faltando:
-                    problemas_encontrados = True
-                    # Mostra o caminho relativo para ficar mais limpo
-                    caminho_relativo = os.path.relpath(html_path, templates_dir)
-                    print(f"\n  [AVISO] No arquivo '{caminho_relativo}':")
-                    print(f"    - Classes usadas mas não definidas no CSS: {', '.join(sorted(list(classes_faltando)))}")
+
+    # Templates analisados em paralelo; os que não mudaram desde a última execução vêm do cache.
+    por_template = classes_por_template(templates_dir, arquivo_cache='instance/cache_classes_css.json')
+    for caminho_relativo, (classes_html, _) in sorted(por_template.items()):
+        classes_faltando = classes_html - classes_css
+
+        if classes_faltando:
+            problemas_encontrados = True
+            print(f"\n  [AVISO] No arquivo '{caminho_relativo}':")
+            print(f"    - Classes usadas mas não definidas no CSS: {', '.join(sorted(list(classes_faltando)))}")
 
     if not problemas_encontrados:
         print("\n  [OK] Todas as classes usadas nos templates HTML parecem ter uma definição no CSS.")
@@ -0,0 +1,71 @@
+import os
+
+from flask import Flask
+
+from .config import Config
+from .extensoes import db, bcrypt, login_manager
+
+# Templates, arquivos estáticos e instance/ continuam em backend/, um nível acima do pacote.
+PASTA_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app(config=None, instance_path=None):
+    """Cria a aplicação. `config` sobrescreve a Config padrão (útil para testes e scripts).
+
+    `instance_path` troca a pasta instance/ (banco padrão, caches, vagas, backups), para
+    testes não tocarem na do site.
+    """
+    app = Flask(__name__, root_path=PASTA_BACKEND, instance_path=instance_path)
+    app.config.from_object(Config)
+    app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static/uploads')
+    if config:
+        app.config.update(config)
+
+    db.init_app(app)
+    bcrypt.init_app(app)
+    login_manager.init_app(app)
+    _init_migrate(app)
+
+    # Registrada antes dos demais after_request para rodar por último, já com a resposta final.
+    if app.config['COMPRESSAO_ATIVA']:
+        from . import compressao
+        compressao.init_app(app)
+
+    from .rotas import publico, lanchonete, membro, admin
+    from . import comandos
+    for modulo in (publico, lanchonete, membro, admin, comandos):
+        app.register_blueprint(modulo.bp)
+
+    from . import (admissao, arquivamento, backup, cache_templates, dinheiro, estaticos, invalidacao, prerenderizacao,
+                   tarefas, uploads)
+    admissao.init_app(app)
+    arquivamento.init_app(app)
+    backup.init_app(app)
+    invalidacao.init_app(app)
+    # Antes de cache_templates, que pré-compila os templates e precisa dos filtros registrados.
+    dinheiro.init_app(app)
+    cache_templates.init_app(app)
+    estaticos.init_app(app)
+    prerenderizacao.init_app(app)
+    tarefas.init_app(app)
+    uploads.init_app(app)
+
+    if app.config['SQL_INSTRUMENTACAO']:
+        from . import instrumentacao_sql
+        instrumentacao_sql.init_app(app)
+    if app.config['METRICAS_ATIVAS']:
+        from . import metricas
+        metricas.init_app(app)
+    if app.config['PERFILADOR_ATIVO']:
+        from . import perfilador
+        perfilador.init_app(app)
+    return app
+
+
+def _init_migrate(app):
+    # O Flask-Migrate puxa o Alembic inteiro; só serve para o comando `flask db`,
+    # então o registramos apenas quando a aplicação é carregada pela CLI.
+    if not app.config.get('CARREGAR_MIGRACOES', os.environ.get('FLASK_RUN_FROM_CLI') == 'true'):
+        return
+    from flask_migrate import Migrate
+    Migrate(app, db)
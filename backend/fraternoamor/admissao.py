@@ -0,0 +1,62 @@
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+
+from . import invalidacao
+from .modelos import Configuracao
+
+# Status da lanchonete guardado por processo; gravar em configuracao o esvazia em todos os workers.
+_status = invalidacao.cache(Configuracao.__tablename__)
+
+
+class Sobrecarga(Exception):
+    """Todas as vagas de gravação de pedido estão ocupadas."""
+
+
+def lanchonete_aberta():
+    """Se a lanchonete aceita pedidos. Só consulta o banco depois de uma mudança em configuracao."""
+    if 'aberta' not in _status:
+        registro = Configuracao.query.filter_by(chave='lanchonete_status').first()
+        _status['aberta'] = bool(registro and registro.valor == 'Aberto')
+    return _status['aberta']
+
+
+@contextmanager
+def vaga_para_pedido():
+    """Ocupa uma das PEDIDOS_MAX_SIMULTANEOS vagas de gravação de pedido.
+
+    As vagas são arquivos com flock em instance/, valendo para todos os workers e threads
+    da máquina. Se nenhuma abrir em PEDIDOS_ESPERA_VAGA segundos, levanta Sobrecarga:
+    melhor recusar na hora do que enfileirar mais um escritor atrás do lock do SQLite.
+    """
+    config = current_app.config
+    pasta = os.path.join(current_app.instance_path, 'vagas_pedidos')
+    os.makedirs(pasta, exist_ok=True)
+    prazo = time.monotonic() + config['PEDIDOS_ESPERA_VAGA']
+    while True:
+        for numero in range(config['PEDIDOS_MAX_SIMULTANEOS']):
+            arquivo = open(os.path.join(pasta, f'{numero}.lock'), 'a')
+            try:
+                fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                arquivo.close()
+                continue
+            try:
+                yield
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+                arquivo.close()
+            return
+        if time.monotonic() >= prazo:
+            raise Sobrecarga()
+        time.sleep(0.01)
+
+
+def init_app(app):
+    # O SQLite grava um pedido por vez; mais de duas gravações simultâneas só aumentam a fila.
+    app.config.setdefault('PEDIDOS_MAX_SIMULTANEOS', 2)
+    app.config.setdefault('PEDIDOS_ESPERA_VAGA', 0.05)
+    app.config.setdefault('PEDIDOS_RETRY_AFTER', 2)
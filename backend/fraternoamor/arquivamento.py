@@ -0,0 +1,111 @@
+import datetime
+import time
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, literal, select, text, union_all
+
+from .extensoes import db
+from .modelos import ItemPedido, ItemPedidoArquivado, Pedido, PedidoArquivado
+
+STATUS_ARQUIVAVEL = 'Concluído'
+
+
+def pedidos_todos():
+    """Subconsulta com os pedidos ativos e os arquivados (id, cliente, data, valor e status).
+
+    Para relatórios e exportações que precisam do histórico inteiro.
+    """
+    colunas = ('id', 'cliente_id', 'data_pedido', 'valor_total_centavos', 'status')
+    return union_all(
+        select(*(getattr(Pedido, coluna) for coluna in colunas)),
+        select(*(getattr(PedidoArquivado, coluna) for coluna in colunas)),
+    ).subquery('pedidos_todos')
+
+
+def total_de_pedidos():
+    return (db.session.query(func.count(Pedido.id)).scalar()
+            + db.session.query(func.count(PedidoArquivado.id)).scalar())
+
+
+def _arquivar_lote(ids, agora):
+    item = ItemPedido.__table__.c
+    pedido = Pedido.__table__.c
+    db.session.execute(insert(PedidoArquivado).from_select(
+        ['id', 'cliente_id', 'data_pedido', 'valor_total_centavos', 'status', 'arquivado_em'],
+        select(pedido.id, pedido.cliente_id, pedido.data_pedido, pedido.valor_total_centavos, pedido.status,
+               literal(agora)).where(pedido.id.in_(ids))))
+    db.session.execute(insert(ItemPedidoArquivado).from_select(
+        ['pedido_id', 'produto_id', 'quantidade', 'preco_unitario_centavos'],
+        select(item.pedido_id, item.produto_id, item.quantidade, item.preco_unitario_centavos)
+        .where(item.pedido_id.in_(ids)).order_by(item.id)))
+    db.session.execute(delete(ItemPedido.__table__).where(item.pedido_id.in_(ids)))
+    db.session.execute(delete(Pedido.__table__).where(pedido.id.in_(ids)))
+    db.session.commit()
+
+
+def arquivar_pedidos(dias=None, lote=None, pausa=None):
+    """Move para o arquivo os pedidos concluídos há mais de `dias` dias. Retorna quantos moveu.
+
+    Cada lote é uma transação curta; entre um lote e outro o lock de escrita fica livre
+    por `pausa` segundos para os pedidos novos não esperarem.
+    """
+    config = current_app.config
+    dias = config['PEDIDOS_RETENCAO_DIAS'] if dias is None else dias
+    lote = lote or config['ARQUIVAMENTO_LOTE']
+    pausa = config['ARQUIVAMENTO_PAUSA'] if pausa is None else pausa
+    limite = datetime.datetime.utcnow() - datetime.timedelta(days=dias)
+    # O pedido de maior id fica sempre: o SQLite reaproveitaria esse id num pedido novo,
+    # que daria conflito com o arquivado quando chegasse a vez dele.
+    maior_id = db.session.query(func.max(Pedido.id)).scalar() or 0
+    movidos = 0
+    while True:
+        ids = [pedido_id for pedido_id, in db.session.query(Pedido.id).filter(
+            Pedido.status == STATUS_ARQUIVAVEL, Pedido.data_pedido < limite, Pedido.id < maior_id,
+        ).order_by(Pedido.id).limit(lote)]
+        if not ids:
+            return movidos
+        _arquivar_lote(ids, datetime.datetime.utcnow())
+        movidos += len(ids)
+        time.sleep(pausa)
+
+
+def _pragma(conexao, nome):
+    return conexao.execute(text(f'PRAGMA {nome}')).scalar()
+
+
+def compactar(paginas_por_passo=None, pausa=None, converter=False):
+    """Devolve ao sistema de arquivos as páginas livres do banco, aos poucos (incremental_vacuum).
+
+    Só funciona com auto_vacuum=INCREMENTAL. `converter=True` liga o modo e roda um VACUUM
+    completo uma única vez — ele bloqueia o banco enquanto reescreve o arquivo inteiro.
+    Retorna (páginas liberadas, páginas livres restantes).
+    """
+    config = current_app.config
+    paginas_por_passo = paginas_por_passo or config['VACUUM_PAGINAS_POR_PASSO']
+    pausa = config['ARQUIVAMENTO_PAUSA'] if pausa is None else pausa
+    # PRAGMA e VACUUM não podem rodar dentro de uma transação.
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conexao:
+        if _pragma(conexao, 'auto_vacuum') != 2:
+            if not converter:
+                return None
+            conexao.execute(text('PRAGMA auto_vacuum=INCREMENTAL'))
+            conexao.execute(text('VACUUM'))
+        liberadas = 0
+        while True:
+            livres = _pragma(conexao, 'freelist_count')
+            if not livres:
+                return liberadas, 0
+            # O resultado precisa ser consumido, ou o SQLite libera só uma página.
+            conexao.execute(text(f'PRAGMA incremental_vacuum({int(paginas_por_passo)})')).fetchall()
+            depois = _pragma(conexao, 'freelist_count')
+            liberadas += livres - depois
+            if depois >= livres:
+                return liberadas, depois
+            time.sleep(pausa)
+
+
+def init_app(app):
+    app.config.setdefault('PEDIDOS_RETENCAO_DIAS', 90)
+    app.config.setdefault('ARQUIVAMENTO_LOTE', 200)
+    app.config.setdefault('ARQUIVAMENTO_PAUSA', 0.05)
+    app.config.setdefault('VACUUM_PAGINAS_POR_PASSO', 256)
@@ -0,0 +1,175 @@
+import datetime
+import glob
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+
+from flask import current_app
+
+from . import catalogo, invalidacao
+from .extensoes import db
+
+# Cópias do banco com a API de backup online do SQLite: a cópia anda `paginas_por_passo`
+# páginas por vez e, entre um passo e outro, o banco fica livre por `pausa` segundos.
+# No modo WAL a leitura não bloqueia os escritores; os passos e a pausa servem para a
+# cópia não disputar disco e CPU com as requisições. Restaurar é o inverso, num passo só.
+
+PREFIXO = 'site-'
+EXTENSAO = '.db.gz'
+
+
+class BackupFalhou(Exception):
+    pass
+
+
+def _pasta():
+    pasta = current_app.config['BACKUP_PASTA'] or os.path.join(current_app.instance_path, 'backups')
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def _verificar(caminho):
+    """Roda o PRAGMA integrity_check no arquivo; levanta BackupFalhou se não vier 'ok'."""
+    conexao = sqlite3.connect(caminho)
+    try:
+        resultado = [linha for linha, in conexao.execute('PRAGMA integrity_check')]
+    finally:
+        conexao.close()
+    if resultado != ['ok']:
+        raise BackupFalhou(f'integrity_check em {caminho}: {"; ".join(resultado[:5])}')
+
+
+def _copiar(origem, destino, paginas_por_passo, pausa, max_reinicios):
+    """Copia `origem` para `destino` passo a passo e devolve a duração de cada passo, em segundos."""
+    passos, reinicios = [], 0
+    estado = {'fim_anterior': time.perf_counter(), 'restantes': None}
+
+    def progresso(status, restantes, total):
+        nonlocal reinicios
+        # O callback roda entre os passos, com o lock já solto: o tempo desde o fim da
+        # pausa anterior é o tempo que o passo segurou o banco.
+        passos.append(time.perf_counter() - estado['fim_anterior'])
+        if estado['restantes'] is not None and restantes > estado['restantes']:
+            reinicios += 1
+            if reinicios > max_reinicios:
+                raise BackupFalhou(f'a cópia recomeçou {reinicios} vezes por gravações concorrentes; '
+                                   'tente num horário mais calmo ou com mais páginas por passo')
+        estado['restantes'] = restantes
+        if restantes:
+            time.sleep(pausa)
+        estado['fim_anterior'] = time.perf_counter()
+
+    # Uma transação de leitura aberta na origem durante a cópia inteira fixa o snapshot do
+    # WAL: as gravações das outras conexões seguem normalmente e não fazem a cópia recomeçar.
+    origem.execute('BEGIN')
+    origem.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchall()
+    try:
+        origem.backup(destino, pages=paginas_por_passo, progress=progresso)
+    finally:
+        origem.rollback()
+    return passos, reinicios
+
+
+def _rotacionar(pasta, manter):
+    arquivos = sorted(glob.glob(os.path.join(pasta, f'{PREFIXO}*{EXTENSAO}')))
+    removidos = arquivos[:-manter] if manter > 0 else []
+    for caminho in removidos:
+        os.remove(caminho)
+    return removidos
+
+
+def fazer_backup(paginas_por_passo=None, pausa=None, manter=None):
+    """Copia o banco com o site no ar, confere a cópia, comprime e apaga as mais antigas.
+
+    O arquivo fica em BACKUP_PASTA como site-AAAAMMDD-HHMMSS.db.gz. Retorna um dict com o
+    caminho, o tamanho e os tempos dos passos (o que cada um segurou o lock).
+    """
+    config = current_app.config
+    paginas_por_passo = paginas_por_passo or config['BACKUP_PAGINAS_POR_PASSO']
+    pausa = config['BACKUP_PAUSA'] if pausa is None else pausa
+    manter = config['BACKUP_MANTER'] if manter is None else manter
+    pasta = _pasta()
+    nome = f'{PREFIXO}{datetime.datetime.now():%Y%m%d-%H%M%S}'
+    temporario = os.path.join(pasta, f'.{nome}.db')
+    final = os.path.join(pasta, nome + EXTENSAO)
+
+    inicio = time.perf_counter()
+    origem = db.engine.raw_connection()
+    destino = sqlite3.connect(temporario)
+    try:
+        passos, reinicios = _copiar(origem.driver_connection, destino, paginas_por_passo, pausa,
+                                    config['BACKUP_MAX_REINICIOS'])
+        destino.close()
+        _verificar(temporario)
+        with open(temporario, 'rb') as entrada, gzip.open(final + '.tmp', 'wb', compresslevel=6) as saida:
+            shutil.copyfileobj(entrada, saida, 1024 * 1024)
+        os.replace(final + '.tmp', final)
+    except BaseException:
+        if os.path.exists(final + '.tmp'):
+            os.remove(final + '.tmp')
+        raise
+    finally:
+        destino.close()
+        origem.close()
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+    return {
+        'caminho': final,
+        'tamanho': os.path.getsize(final),
+        'passos': len(passos),
+        'reinicios': reinicios,
+        'passo_maximo': max(passos, default=0),
+        'passo_medio': sum(passos) / len(passos) if passos else 0,
+        'duracao': time.perf_counter() - inicio,
+        'removidos': _rotacionar(pasta, manter),
+    }
+
+
+def listar():
+    """Backups existentes, do mais novo para o mais antigo."""
+    return sorted(glob.glob(os.path.join(_pasta(), f'{PREFIXO}*{EXTENSAO}')), reverse=True)
+
+
+def restaurar(caminho):
+    """Substitui o conteúdo do banco pelo de um backup (.db.gz ou .db), depois de conferi-lo.
+
+    Usa a mesma API de backup no sentido inverso, numa transação só: os workers no ar
+    passam a ver o banco restaurado na próxima consulta, sem precisar reiniciar. O catálogo
+    ganha uma versão acima da já publicada, para os workers e navegadores o buscarem de novo.
+    """
+    temporario = os.path.join(_pasta(), '.restaurando.db')
+    # Versão do catálogo que os navegadores já conhecem, antes de trocar o banco.
+    publicada = catalogo.versao_do_banco()
+    db.session.remove()
+    abrir = gzip.open if caminho.endswith('.gz') else open
+    try:
+        with abrir(caminho, 'rb') as entrada, open(temporario, 'wb') as saida:
+            shutil.copyfileobj(entrada, saida, 1024 * 1024)
+        _verificar(temporario)
+        fonte = sqlite3.connect(temporario)
+        destino = db.engine.raw_connection()
+        try:
+            # Sem `pages`, a cópia vai inteira num passo: o banco fica travado só por esse tempo.
+            fonte.backup(destino.driver_connection)
+        finally:
+            destino.close()
+            fonte.close()
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    # Conexões abertas antes da restauração podem ter páginas do banco antigo em cache.
+    db.engine.dispose()
+    # O banco restaurado volta com um contador de catálogo menor que o publicado.
+    catalogo.avancar_versao(publicada)
+    invalidacao.invalidar_tudo()
+
+
+def init_app(app):
+    app.config.setdefault('BACKUP_PASTA', os.environ.get('BACKUP_PASTA'))
+    app.config.setdefault('BACKUP_PAGINAS_POR_PASSO', 256)
+    app.config.setdefault('BACKUP_PAUSA', 0.01)
+    app.config.setdefault('BACKUP_MANTER', 7)
+    app.config.setdefault('BACKUP_MAX_REINICIOS', 20)
@@ -0,0 +1,77 @@
+import threading
+
+from flask import current_app
+
+
+class BufferEmLote:
+    """Acumula registros em memória, um por chave, e os grava em lote numa thread do worker.
+
+    Grava a cada `intervalo` segundos ou assim que houver `lote_maximo` chaves pendentes.
+    Registros repetidos da mesma chave são fundidos por `combinar` antes de chegar ao
+    banco. Se o processo morrer, perde-se no máximo um intervalo de registros.
+    Subclasses implementam `gravar_lote`, chamado dentro do contexto da aplicação.
+    """
+
+    nome = 'buffer'
+
+    def __init__(self, intervalo, lote_maximo):
+        self.intervalo = intervalo
+        self.lote_maximo = lote_maximo
+        self._pendentes = {}
+        self._condicao = threading.Condition()
+        self._thread = None
+        self._app = None
+
+    def combinar(self, antigo, novo):
+        return novo
+
+    def gravar_lote(self, lote):
+        raise NotImplementedError
+
+    def adicionar(self, chave, valor):
+        with self._condicao:
+            if chave in self._pendentes:
+                valor = self.combinar(self._pendentes[chave], valor)
+            self._pendentes[chave] = valor
+            self._app = current_app._get_current_object()
+            self._garantir_thread()
+            if len(self._pendentes) >= self.lote_maximo:
+                self._condicao.notify()
+
+    def pendente(self, chave):
+        with self._condicao:
+            return self._pendentes.get(chave)
+
+    def _garantir_thread(self):
+        # Criada sob demanda para nascer dentro do worker, não no mestre antes do fork.
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name=self.nome, daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(lambda: len(self._pendentes) >= self.lote_maximo, timeout=self.intervalo)
+            self.gravar()
+
+    def gravar(self):
+        """Grava tudo o que está pendente. Retorna quantos registros foram enviados ao banco."""
+        with self._condicao:
+            lote, self._pendentes = self._pendentes, {}
+            app = self._app
+        if not lote:
+            return 0
+        try:
+            with app.app_context():
+                self.gravar_lote(lote)
+        except Exception:
+            # Devolve o lote para a próxima tentativa, fundido com o que chegou nesse meio-tempo.
+            with self._condicao:
+                for chave, valor in lote.items():
+                    if chave in self._pendentes:
+                        valor = self.combinar(valor, self._pendentes[chave])
+                    self._pendentes[chave] = valor
+            app.logger.exception('Falha ao gravar %d registros de %s; nova tentativa no próximo ciclo.',
+                                 len(lote), self.nome)
+            return 0
+        return len(lote)
@@ -0,0 +1,82 @@
+import os
+import time
+
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache, TemplateError, nodes
+from jinja2.ext import Extension
+
+from . import invalidacao
+
+# Fragmentos renderizados, por processo: chave -> (expira_em, html). O conteúdo das páginas
+# editáveis vem da tabela configuracao; gravar nela esvazia o cache em todos os workers.
+FRAGMENTOS = 'fragmentos_templates'
+_fragmentos = invalidacao.cache('configuracao', FRAGMENTOS)
+
+
+def invalidar():
+    """Descarta todos os fragmentos em cache, em todos os workers."""
+    invalidacao.invalidar(FRAGMENTOS)
+
+
+class CacheFragmentos(Extension):
+    """Tag `{% cache 'parte', 'da', 'chave' %} ... {% endcache %}`.
+
+    O conteúdo do bloco é renderizado uma vez e reaproveitado até expirar
+    (CACHE_FRAGMENTOS_TTL segundos) ou até `invalidar()`. A chave deve identificar
+    tudo de que o bloco depende; nada ligado ao usuário logado deve ficar dentro dele.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        partes = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            partes.append(parser.parse_expression())
+        corpo = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_renderizar', [nodes.List(partes)]), [], [], corpo).set_lineno(lineno)
+
+    def _renderizar(self, partes, caller):
+        if not current_app.config['CACHE_FRAGMENTOS_ATIVO']:
+            return caller()
+        chave = ':'.join(str(parte) for parte in partes)
+        agora = time.monotonic()
+        guardado = _fragmentos.get(chave)
+        if guardado and guardado[0] > agora:
+            return guardado[1]
+        html = caller()
+        _fragmentos[chave] = (agora + current_app.config['CACHE_FRAGMENTOS_TTL'], html)
+        return html
+
+
+def precompilar(app):
+    """Compila todos os templates agora, e não na primeira requisição de cada worker.
+
+    Com preload_app no gunicorn, isso roda no mestre e os workers herdam os templates prontos.
+    """
+    inicio = time.perf_counter()
+    total = 0
+    for nome in app.jinja_env.list_templates(extensions=('html',)):
+        try:
+            app.jinja_env.get_template(nome)
+            total += 1
+        except TemplateError as erro:
+            app.logger.warning('Template %s não compilou: %s', nome, erro)
+    app.logger.info('%d templates pré-compilados em %.0f ms.', total, (time.perf_counter() - inicio) * 1000)
+    return total
+
+
+def init_app(app):
+    app.config.setdefault('CACHE_FRAGMENTOS_TTL', 600)
+    # Em modo de depuração os templates mudam o tempo todo; o cache só atrapalharia.
+    app.config.setdefault('CACHE_FRAGMENTOS_ATIVO', not app.debug)
+    app.jinja_env.add_extension(CacheFragmentos)
+
+    # Bytecode compilado fica em disco: um worker novo (ou um restart) só lê o .cache,
+    # sem reprocessar o template. O Jinja refaz o arquivo se o template mudar.
+    pasta = app.config.setdefault('JINJA_BYTECODE_FOLDER', os.path.join(app.instance_path, 'jinja_bytecode'))
+    os.makedirs(pasta, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(pasta)
+
+    if app.config['TEMPLATES_PRECOMPILAR']:
+        precompilar(app)
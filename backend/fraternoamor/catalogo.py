@@ -0,0 +1,127 @@
+from itertools import chain
+
+from flask import url_for
+from sqlalchemy import delete, event, insert, update
+
+from . import estoque, invalidacao
+from .extensoes import db
+from .modelos import Configuracao, MovimentoEstoque, Produto, VersaoCatalogo
+
+# Configurações que aparecem no catálogo; mudar qualquer uma gera uma versão nova.
+CHAVES_CONFIGURACAO = ('lanchonete_status', 'aviso_lanchonete')
+
+
+# A versão é um contador no banco, incrementado na mesma transação que altera produtos ou
+# configurações da lanchonete: como o SQLite tem um escritor por vez, a ordem das versões
+# é a ordem dos commits. Cada worker guarda a versão lida num cache de invalidacao.py,
+# esvaziado quando versao_catalogo muda em qualquer worker: o "nada mudou" (304) é
+# respondido sem abrir o banco.
+
+_versao = invalidacao.cache(VersaoCatalogo.__tablename__)
+
+
+def versao_do_banco():
+    return db.session.query(VersaoCatalogo.versao).scalar() or 0
+
+
+def versao_atual():
+    """Versão atual do catálogo, sem consultar o banco (exceto depois de uma mudança)."""
+    if 'versao' not in _versao:
+        _versao['versao'] = versao_do_banco()
+    return _versao['versao']
+
+
+def _afeta_catalogo(sessao, objeto):
+    relevante = isinstance(objeto, Produto) or (
+        isinstance(objeto, Configuracao) and objeto.chave in CHAVES_CONFIGURACAO)
+    return relevante and (objeto in sessao.new or objeto in sessao.deleted or sessao.is_modified(objeto))
+
+
+def _nova_versao(sessao):
+    tabela = VersaoCatalogo.__table__
+    versao = sessao.execute(
+        update(tabela).values(versao=tabela.c.versao + 1).returning(tabela.c.versao)).scalar()
+    if versao is None:
+        versao = 1
+        sessao.execute(insert(tabela).values(id=1, versao=versao))
+    return versao
+
+
+@event.listens_for(db.session, 'before_flush')
+def _versionar_alteracoes(sessao, contexto, instancias):
+    alterados = [objeto for objeto in chain(sessao.new, sessao.dirty, sessao.deleted)
+                 if _afeta_catalogo(sessao, objeto)]
+    # Movimento de estoque muda o produto no catálogo sem tocar na linha dele.
+    movimentados = {objeto.produto_id for objeto in sessao.new if isinstance(objeto, MovimentoEstoque)}
+    if not alterados and not movimentados:
+        return
+    versao = _nova_versao(sessao)
+    for objeto in alterados:
+        if isinstance(objeto, Produto) and objeto not in sessao.deleted:
+            objeto.versao = versao
+    if movimentados:
+        sessao.execute(update(Produto.__table__).where(Produto.id.in_(movimentados)).values(versao=versao))
+
+
+def marcar_alterados(produto_ids):
+    """Gera uma versão nova para produtos gravados sem passar pelo ORM (inserts e updates em lote).
+
+    Como nas alterações pelo ORM, a versão só é publicada no commit da sessão.
+    """
+    versao = _nova_versao(db.session)
+    if produto_ids:
+        db.session.execute(update(Produto.__table__).where(Produto.id.in_(produto_ids)).values(versao=versao))
+    return versao
+
+
+def avancar_versao(minima):
+    """Leva o contador para acima de `minima` e marca todos os produtos como alterados.
+
+    Depois de restaurar um backup o contador do banco pode estar abaixo da versão que os
+    navegadores guardaram: sem isso eles receberiam 304 (ou um delta vazio) com o catálogo
+    antigo até o contador alcançá-la. Publicada no commit da sessão.
+    """
+    tabela = VersaoCatalogo.__table__
+    if versao_do_banco() < minima:
+        db.session.execute(delete(tabela))
+        db.session.execute(insert(tabela).values(id=1, versao=minima))
+    return marcar_alterados([produto_id for produto_id, in db.session.query(Produto.id)])
+
+
+def _produto(produto, saldos):
+    imagem = 'uploads/' + produto.imagem_url if produto.imagem_url else 'imagens/placeholder.png'
+    return {
+        'id': produto.id,
+        'nome': produto.nome,
+        'categoria': produto.categoria,
+        'preco_centavos': produto.preco_centavos,
+        'estoque': saldos.get(produto.id, 0),
+        'imagem': url_for('static', filename=imagem),
+    }
+
+
+def montar(desde=None):
+    """Catálogo completo ou, com `desde`, só os produtos alterados depois dessa versão.
+
+    No modo delta, `ids` lista todos os produtos existentes: o que não estiver ali foi excluído.
+    """
+    # A versão é lida antes dos produtos: se um commit cair entre as duas consultas, o
+    # cliente recebe a mudança de novo na próxima vez, mas nunca deixa de recebê-la.
+    versao = versao_do_banco()
+    consulta = Produto.query
+    if desde is not None:
+        consulta = consulta.filter(Produto.versao > desde)
+    produtos = consulta.order_by(Produto.id).all()
+    saldos = estoque.saldos(None if desde is None else [produto.id for produto in produtos])
+    configuracoes = dict(db.session.query(Configuracao.chave, Configuracao.valor)
+                         .filter(Configuracao.chave.in_(CHAVES_CONFIGURACAO)).all())
+    dados = {
+        'versao': versao,
+        'completo': desde is None,
+        'aberta': configuracoes.get('lanchonete_status') == 'Aberto',
+        'aviso': configuracoes.get('aviso_lanchonete') or '',
+        'produtos': [_produto(produto, saldos) for produto in produtos],
+    }
+    if desde is not None:
+        dados['ids'] = [produto_id for produto_id, in db.session.query(Produto.id).order_by(Produto.id)]
+    return dados
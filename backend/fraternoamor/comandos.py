@@ -0,0 +1,241 @@
+import datetime
+import os
+import time
+
+import click
+from flask import Blueprint, current_app
+
+from . import (arquivamento, backup, cache_templates, dados_sinteticos, estaticos, estoque, frequencia,
+               prerenderizacao, purga_css, tarefas, uploads, videos)
+from .extensoes import db
+from .modelos import Curso
+
+# Comandos do `flask` ficam num blueprint só de CLI: `flask gerar-dados`, etc.
+bp = Blueprint('comandos', __name__, cli_group=None)
+
+
+@bp.cli.command('gerar-dados')
+@click.option('--escala', default=1.0, show_default=True, help='Multiplicador das quantidades base (escala 1 = 1000 pedidos).')
+@click.option('--semente', default=42, show_default=True, help='Semente do gerador aleatório, para repetir exatamente os mesmos dados.')
+def gerar_dados_comando(escala, semente):
+    """Popula o banco com dados sintéticos para benchmarks.
+
+    Use com um banco separado, por exemplo:
+    DATABASE_URL=sqlite:///bench.db flask db upgrade && DATABASE_URL=sqlite:///bench.db flask gerar-dados --escala 5
+    """
+    inicio = datetime.datetime.now()
+    quantidades = dados_sinteticos.gerar_dados(escala=escala, semente=semente)
+    for nome, quantidade in quantidades.items():
+        click.echo(f'  {nome}: {quantidade}')
+    click.echo(f'Dados gerados em {(datetime.datetime.now() - inicio).total_seconds():.1f}s. '
+               f'Admin de benchmark: {dados_sinteticos.USUARIO_ADMIN_BENCHMARK} / {dados_sinteticos.SENHA_BENCHMARK}')
+
+
+@bp.cli.command('recalcular-frequencia')
+def recalcular_frequencia_comando():
+    """Refaz os agregados de frequência nas reuniões a partir da tabela de presenças."""
+    inicio = datetime.datetime.now()
+    quantidades = frequencia.recalcular()
+    for nome, quantidade in quantidades.items():
+        click.echo(f'  {nome}: {quantidade}')
+    click.echo(f'Agregados recalculados em {(datetime.datetime.now() - inicio).total_seconds():.1f}s.')
+
+
+@bp.cli.command('baixar-posters')
+def baixar_posters_comando():
+    """Baixa as miniaturas dos vídeos dos cursos que ainda não têm poster local."""
+    cursos = Curso.query.filter(Curso.video_provedor != None, Curso.video_poster == None).all()  # noqa: E711
+    for curso in cursos:
+        videos.atualizar_video(curso)
+        click.echo(f'  {curso.titulo}: {curso.video_poster or "falhou"}')
+    db.session.commit()
+    click.echo(f'{len(cursos)} curso(s) processado(s).')
+
+
+@bp.cli.command('limpar-cache-templates')
+def limpar_cache_templates_comando():
+    """Descarta os fragmentos de template em cache em todos os workers (ex.: depois de um deploy)."""
+    cache_templates.invalidar()
+    click.echo('Cache de fragmentos invalidado.')
+
+
+def _arquivos_js(pasta_static):
+    for raiz, pastas, nomes in os.walk(pasta_static):
+        if raiz == pasta_static:
+            pastas[:] = [p for p in pastas if p not in estaticos.PASTAS_IGNORADAS]
+        yield from (os.path.join(raiz, nome) for nome in nomes if nome.endswith('.js'))
+
+
+@bp.cli.command('construir-estaticos')
+@click.option('--sem-purga', is_flag=True, help='Só minifica o CSS, sem remover as classes que nenhum template usa.')
+def construir_estaticos_comando(sem_purga):
+    """Gera em static/dist/ as cópias versionadas e pré-comprimidas de CSS, JS e imagens.
+
+    O CSS publicado perde os seletores de classes que não aparecem em nenhum template
+    nem no JavaScript (veja purga_css.SAFELIST) e sai minificado.
+    Rode a cada deploy e reinicie a aplicação para que ela leia o novo manifesto.
+    """
+    pasta_static = current_app.static_folder
+    if not sem_purga:
+        classes, prefixos = purga_css.classes_usadas(
+            os.path.join(current_app.root_path, current_app.template_folder),
+            list(_arquivos_js(pasta_static)),
+            arquivo_cache=os.path.join(current_app.instance_path, 'cache_classes_css.json'),
+        )
+        click.echo(f'{len(classes)} classe(s) e {len(prefixos)} prefixo(s) em uso nos templates e scripts.')
+
+    relatorios = []
+
+    def transformar_css(caminho, conteudo):
+        css = conteudo.decode('utf-8')
+        if sem_purga:
+            final, estatisticas = purga_css.minificar(css), None
+        else:
+            final, estatisticas = purga_css.purgar(css, classes, prefixos)
+        final = final.encode('utf-8')
+        relatorios.append(purga_css.relatorio(caminho, conteudo, final, estatisticas))
+        return final
+
+    manifesto = estaticos.construir(pasta_static, transformar_css)
+    for linha in relatorios:
+        click.echo(f'  {linha}')
+    click.echo(f'{len(manifesto)} arquivo(s) versionado(s) em static/{estaticos.PASTA_DIST}/.'
+               + ('' if estaticos.brotli else ' (brotli não instalado: apenas .gz)'))
+
+
+@bp.cli.command('prerenderizar-paginas')
+def prerenderizar_paginas_comando():
+    """Gera o HTML estático das páginas públicas para o proxy servir sem passar pela aplicação.
+
+    Rode depois de cada deploy (e depois de `flask construir-estaticos`). Daí em diante,
+    salvar uma página em /admin/pagina/<chave> regenera o arquivo correspondente.
+    """
+    for caminho in prerenderizacao.renderizar():
+        click.echo(f'  {os.path.relpath(caminho, current_app.root_path)}')
+
+
+@bp.cli.command('arquivar-pedidos')
+@click.option('--dias', type=int, help='Arquiva pedidos concluídos há mais que isso (padrão: PEDIDOS_RETENCAO_DIAS).')
+@click.option('--lote', type=int, help='Pedidos por transação (padrão: ARQUIVAMENTO_LOTE).')
+@click.option('--sem-compactar', is_flag=True, help='Não roda o incremental_vacuum depois de arquivar.')
+def arquivar_pedidos_comando(dias, lote, sem_compactar):
+    """Move pedidos concluídos antigos para as tabelas de arquivo e compacta o banco.
+
+    Pode rodar com o site no ar (ex.: no cron, uma vez por dia): trabalha em lotes curtos.
+    """
+    inicio = datetime.datetime.now()
+    movidos = arquivamento.arquivar_pedidos(dias=dias, lote=lote)
+    click.echo(f'{movidos} pedido(s) arquivado(s) em {(datetime.datetime.now() - inicio).total_seconds():.1f}s.')
+    if not sem_compactar:
+        _compactar()
+
+
+@bp.cli.command('compactar-banco')
+@click.option('--converter', is_flag=True,
+              help='Liga auto_vacuum=INCREMENTAL com um VACUUM completo (uma vez só; bloqueia o banco enquanto roda).')
+def compactar_banco_comando(converter):
+    """Devolve ao disco, aos poucos, o espaço livre deixado por exclusões e arquivamentos."""
+    _compactar(converter)
+
+
+def _compactar(converter=False):
+    resultado = arquivamento.compactar(converter=converter)
+    if resultado is None:
+        click.echo('O banco não está com auto_vacuum=INCREMENTAL; rode `flask compactar-banco --converter` uma vez.')
+        return
+    liberadas, restantes = resultado
+    click.echo(f'{liberadas} página(s) devolvida(s) ao disco; {restantes} livre(s) restante(s).')
+
+
+@bp.cli.command('compactar-estoque')
+def compactar_estoque_comando():
+    """Grava a foto do saldo dos produtos movimentados, para o estoque não somar o livro inteiro.
+
+    Rode de tempos em tempos (ex.: no cron, a cada hora); sem ela o estoque continua certo, só mais lento.
+    """
+    fotos = estoque.compactar()
+    click.echo(f'Saldo de {fotos} produto(s) atualizado(s).')
+
+
+@bp.cli.command('backup-banco')
+@click.option('--paginas', type=int, help='Páginas copiadas por passo (padrão: BACKUP_PAGINAS_POR_PASSO).')
+@click.option('--manter', type=int, help='Quantos backups guardar; os mais antigos são apagados (padrão: BACKUP_MANTER).')
+@click.option('--a-cada', type=int, metavar='MINUTOS', help='Fica rodando e faz um backup a cada tantos minutos.')
+def backup_banco_comando(paginas, manter, a_cada):
+    """Faz um backup comprimido e conferido do banco, sem parar o site.
+
+    Para backups agendados, rode no cron ou deixe um processo com `--a-cada 360`.
+    """
+    while True:
+        try:
+            resultado = backup.fazer_backup(paginas_por_passo=paginas, manter=manter)
+        except backup.BackupFalhou as erro:
+            click.echo(f'Backup falhou: {erro}', err=True)
+            if not a_cada:
+                raise SystemExit(1)
+        else:
+            click.echo(f'{os.path.relpath(resultado["caminho"])}: {resultado["tamanho"] / 1024:.0f} KB '
+                       f'em {resultado["duracao"]:.1f}s, {resultado["passos"]} passo(s) '
+                       f'(lock por passo: máx. {resultado["passo_maximo"] * 1000:.1f} ms, '
+                       f'médio {resultado["passo_medio"] * 1000:.1f} ms), {resultado["reinicios"]} reinício(s).')
+            for caminho in resultado['removidos']:
+                click.echo(f'  removido {os.path.basename(caminho)}')
+        if not a_cada:
+            return
+        time.sleep(a_cada * 60)
+
+
+@bp.cli.command('restaurar-banco')
+@click.argument('arquivo', required=False)
+@click.confirmation_option(prompt='O conteúdo atual do banco será substituído. Continuar?')
+def restaurar_banco_comando(arquivo):
+    """Restaura o banco a partir de um backup (o mais recente, se ARQUIVO não for informado).
+
+    Faça um `flask backup-banco` antes, se quiser poder voltar atrás.
+    """
+    if not arquivo:
+        existentes = backup.listar()
+        if not existentes:
+            raise click.ClickException('Nenhum backup encontrado.')
+        arquivo = existentes[0]
+    elif not os.path.exists(arquivo):
+        raise click.ClickException(f'Arquivo não encontrado: {arquivo}')
+    try:
+        backup.restaurar(arquivo)
+    except backup.BackupFalhou as erro:
+        raise click.ClickException(f'Backup inválido, nada foi alterado: {erro}')
+    click.echo(f'Banco restaurado de {arquivo}.')
+
+
+@bp.cli.command('limpar-uploads')
+@click.option('--dias', type=int, help='Dias em quarentena antes de apagar (padrão: UPLOADS_QUARENTENA_DIAS).')
+@click.option('--simular', is_flag=True, help='Só lista o que seria movido ou apagado.')
+def limpar_uploads_comando(dias, simular):
+    """Move para a quarentena os uploads que nenhum registro usa e apaga os que já passaram do prazo.
+
+    Pode rodar no cron (ex.: uma vez por dia). Para recuperar um arquivo, mova-o de volta
+    de instance/uploads_quarentena/ para static/uploads/.
+    """
+    resultado = uploads.coletar(dias=dias, simular=simular)
+    prefixo = '(simulação) ' if simular else ''
+    for acao, rotulo in (('quarentena', 'em quarentena'), ('restaurados', 'restaurado'), ('apagados', 'apagado')):
+        for nome in resultado[acao]:
+            click.echo(f'  {prefixo}{rotulo}: {nome}')
+    click.echo(f'{prefixo}{len(resultado["quarentena"])} arquivo(s) em quarentena, '
+               f'{len(resultado["restaurados"])} restaurado(s), {len(resultado["apagados"])} apagado(s) '
+               f'({resultado["bytes_apagados"] / 1024:.0f} KB liberados).')
+
+
+@bp.cli.command('trabalhar-tarefas')
+@click.option('--processos', default=1, show_default=True, help='Quantas tarefas executar ao mesmo tempo.')
+@click.option('--uma-vez', is_flag=True, help='Executa o que estiver na fila e sai.')
+def trabalhar_tarefas_comando(processos, uma_vez):
+    """Executa as tarefas em segundo plano enfileiradas pelo painel (exportações, recálculos...).
+
+    Rode ao lado do gunicorn, como um processo próprio (ex.: no supervisor ou como um
+    segundo serviço). SIGTERM espera a tarefa em andamento terminar.
+    """
+    click.echo(f'Trabalhando com {processos} processo(s). Ctrl+C para parar.' if not uma_vez else 'Esvaziando a fila...')
+    executadas = tarefas.iniciar(processos=processos, uma_vez=uma_vez)
+    if executadas is not None:
+        click.echo(f'{executadas} tarefa(s) executada(s).')
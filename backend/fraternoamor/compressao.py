@@ -0,0 +1,88 @@
+import gzip
+import zlib
+
+from flask import request
+
+try:
+    import brotli  # opcional: pip install brotli
+except ImportError:
+    brotli = None
+
+TIPOS_COMPRESSIVEIS = {
+    'text/html', 'text/css', 'text/csv', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+
+
+def escolher_codificacao():
+    """Melhor codificação aceita pelo cliente entre as disponíveis: 'br', 'gzip' ou None."""
+    aceitas = request.accept_encodings
+    if brotli and aceitas['br']:
+        return 'br'
+    if aceitas['gzip']:
+        return 'gzip'
+    return None
+
+
+def _comprimir_fluxo(partes, codificacao):
+    # Cada parte sai comprimida e com flush, para o cliente continuar recebendo
+    # o conteúdo aos poucos (ex.: exportações CSV em streaming).
+    if codificacao == 'br':
+        compressor = brotli.Compressor(quality=5)
+        for parte in partes:
+            dados = compressor.process(parte) + compressor.flush()
+            if dados:
+                yield dados
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for parte in partes:
+        dados = compressor.compress(parte) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if dados:
+            yield dados
+    yield compressor.flush()
+
+
+def _deve_comprimir(resposta):
+    return (request.method != 'HEAD'
+            and 200 <= resposta.status_code < 300 and resposta.status_code != 204
+            and resposta.mimetype in TIPOS_COMPRESSIVEIS
+            and 'Content-Encoding' not in resposta.headers
+            and 'no-transform' not in resposta.headers.get('Cache-Control', '')
+            and not resposta.direct_passthrough)
+
+
+def comprimir_resposta(resposta, minimo):
+    resposta.vary.add('Accept-Encoding')
+    if not _deve_comprimir(resposta):
+        return resposta
+    codificacao = escolher_codificacao()
+    if not codificacao:
+        return resposta
+
+    if resposta.is_streamed:
+        resposta.response = _comprimir_fluxo(resposta.iter_encoded(), codificacao)
+        resposta.headers.pop('Content-Length', None)
+    else:
+        corpo = resposta.get_data()
+        if len(corpo) < minimo:
+            return resposta
+        if codificacao == 'br':
+            resposta.set_data(brotli.compress(corpo, quality=5))
+        else:
+            resposta.set_data(gzip.compress(corpo, compresslevel=6))
+
+    resposta.headers['Content-Encoding'] = codificacao
+    # O conteúdo muda com a codificação: o ETag deixa de ser forte.
+    etag, fraco = resposta.get_etag()
+    if etag and not fraco:
+        resposta.set_etag(etag, weak=True)
+    return resposta
+
+
+def init_app(app):
+    minimo = app.config.setdefault('COMPRESSAO_MINIMO', 1024)
+
+    @app.after_request
+    def _comprimir(resposta):
+        return comprimir_resposta(resposta, minimo)
@@ -0,0 +1,16 @@
+import os
+
+
+class Config:
+    """Configuração padrão; variáveis de ambiente sobrescrevem o que for sensível ou do servidor."""
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'uma-chave-secreta-muito-dificil-de-adivinhar')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///site.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQL_INSTRUMENTACAO = os.environ.get('SQL_INSTRUMENTACAO', '1') == '1'
+    METRICAS_ATIVAS = True
+    PERFILADOR_ATIVO = True
+    TEMPLATES_PRECOMPILAR = True
+    COMPRESSAO_ATIVA = True
+
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
@@ -0,0 +1,152 @@
+import random
+import datetime
+
+from .extensoes import db, bcrypt
+from . import catalogo, estoque, frequencia, modelos as m
+
+# Quantidades para escala 1; todas são multiplicadas pelo --escala do comando.
+QUANTIDADES_BASE = {
+    'categorias_usuario': 4,
+    'usuarios': 50,
+    'categorias_curso': 5,
+    'cursos': 20,
+    'categorias_material': 4,
+    'materiais': 20,
+    'avisos': 10,
+    'reunioes': 10,
+    'produtos': 40,
+    'clientes': 200,
+    'pedidos': 1000,
+}
+
+CATEGORIAS_PRODUTO = ['Salgados', 'Doces', 'Bebidas', 'Lanches']
+STATUS_PEDIDO = ['Recebido', 'Em Produção', 'Disponível para Retirada', 'Concluído']
+USUARIO_ADMIN_BENCHMARK = 'bench_admin'
+SENHA_BENCHMARK = 'bench'
+
+
+def _inserir(db, modelo, linhas):
+    """Insere em lote com um único executemany, sem passar pela unit of work do ORM."""
+    if linhas:
+        db.session.execute(getattr(modelo, '__table__', modelo).insert(), linhas)
+
+
+def _proximo_id(db, modelo):
+    return (db.session.query(db.func.max(modelo.id)).scalar() or 0) + 1
+
+
+def gerar_dados(escala=1, semente=42):
+    """Popula o banco com dados sintéticos e reprodutíveis (mesma semente, mesmos dados).
+
+    Os IDs são atribuídos aqui, a partir do maior já existente, para que as tabelas
+    filhas possam ser inseridas em lote sem reler as tabelas pais.
+    """
+    aleatorio = random.Random(semente)
+    qtd = {nome: max(1, int(valor * escala)) for nome, valor in QUANTIDADES_BASE.items()}
+    agora = datetime.datetime.utcnow()
+
+    # --- Usuários e permissões ---
+    id_cat_usuario = _proximo_id(db, m.CategoriaUsuario)
+    categorias_usuario = [{'id': id_cat_usuario + i, 'nome': f'Grupo {id_cat_usuario + i}', 'nivel': i}
+                          for i in range(qtd['categorias_usuario'])]
+    _inserir(db, m.CategoriaUsuario, categorias_usuario)
+    ids_cat_usuario = [c['id'] for c in categorias_usuario]
+
+    # Um único hash para todos: o bcrypt é propositalmente lento.
+    hash_senha = bcrypt.generate_password_hash(SENHA_BENCHMARK).decode('utf-8')
+    id_usuario = _proximo_id(db, m.Usuario)
+    usuarios = [{'id': id_usuario + i, 'username': f'membro_{id_usuario + i}', 'password_hash': hash_senha,
+                 'is_admin': False} for i in range(qtd['usuarios'])]
+    if not m.Usuario.query.filter_by(username=USUARIO_ADMIN_BENCHMARK).first():
+        usuarios.append({'id': id_usuario + len(usuarios), 'username': USUARIO_ADMIN_BENCHMARK,
+                         'password_hash': hash_senha, 'is_admin': True})
+    _inserir(db, m.Usuario, usuarios)
+    _inserir(db, m.user_category_association, [
+        {'usuario_id': u['id'], 'categoria_usuario_id': c}
+        for u in usuarios for c in aleatorio.sample(ids_cat_usuario, aleatorio.randint(1, min(2, len(ids_cat_usuario))))
+    ])
+
+    # --- Cursos, biblioteca, avisos e reuniões ---
+    id_cat_curso = _proximo_id(db, m.CategoriaCurso)
+    categorias_curso = [{'id': id_cat_curso + i, 'nome': f'Trilha {id_cat_curso + i}'} for i in range(qtd['categorias_curso'])]
+    _inserir(db, m.CategoriaCurso, categorias_curso)
+    _inserir(db, m.Curso, [{
+        'titulo': f'Formação {i + 1}',
+        'link_video': f'https://www.youtube.com/watch?v=video{i:06d}',
+        'video_provedor': 'youtube',
+        'video_id': f'video{i:06d}',
+        'categoria_id': aleatorio.choice(categorias_curso)['id'],
+        'descricao': 'Conteúdo gerado para testes de carga.',
+        'categoria_permissao_id': aleatorio.choice(ids_cat_usuario + [None]),
+    } for i in range(qtd['cursos'])])
+
+    id_cat_material = _proximo_id(db, m.CategoriaMaterial)
+    categorias_material = [{'id': id_cat_material + i, 'nome': f'Estante {id_cat_material + i}'}
+                           for i in range(qtd['categorias_material'])]
+    _inserir(db, m.CategoriaMaterial, categorias_material)
+    _inserir(db, m.MaterialDigital, [{
+        'titulo': f'Material {i + 1}',
+        'descricao': 'Material gerado para testes de carga.',
+        'arquivo_pdf': f'pdf_sintetico_{i + 1}.pdf',
+        'categoria_id': aleatorio.choice(categorias_material)['id'],
+        'categoria_permissao_id': aleatorio.choice(ids_cat_usuario + [None]),
+    } for i in range(qtd['materiais'])])
+
+    _inserir(db, m.Aviso, [{
+        'mensagem': f'Aviso sintético {i + 1}',
+        'data_criacao': agora - datetime.timedelta(days=aleatorio.randint(0, 90)),
+        'categoria_permissao_id': aleatorio.choice(ids_cat_usuario + [None]),
+    } for i in range(qtd['avisos'])])
+
+    id_reuniao = _proximo_id(db, m.Reuniao)
+    reunioes = [{'id': id_reuniao + i, 'titulo': f'Encontro {id_reuniao + i}',
+                 'data_reuniao': agora - datetime.timedelta(days=7 * i),
+                 'sala_jitsi': f'fraternoamor-sintetica-{id_reuniao + i}'} for i in range(qtd['reunioes'])]
+    _inserir(db, m.Reuniao, reunioes)
+    _inserir(db, m.Presenca, [
+        {'usuario_id': u['id'], 'reuniao_id': r['id'], 'data_presenca': r['data_reuniao']}
+        for r in reunioes for u in usuarios if aleatorio.random() < 0.7
+    ])
+
+    # --- Lanchonete ---
+    id_produto = _proximo_id(db, m.Produto)
+    produtos = [{'id': id_produto + i, 'nome': f'Produto {id_produto + i}',
+                 'categoria': aleatorio.choice(CATEGORIAS_PRODUTO),
+                 'preco_centavos': aleatorio.randint(200, 2500)} for i in range(qtd['produtos'])]
+    _inserir(db, m.Produto, produtos)
+    _inserir(db, m.MovimentoEstoque, [
+        {'produto_id': p['id'], 'quantidade': aleatorio.randint(50, 500), 'motivo': estoque.REPOSICAO,
+         'criado_em': agora} for p in produtos
+    ])
+    catalogo.marcar_alterados([p['id'] for p in produtos])
+    # O benchmark faz pedidos, que só são aceitos com a lanchonete aberta.
+    if not m.Configuracao.query.filter_by(chave='lanchonete_status').first():
+        db.session.add(m.Configuracao(chave='lanchonete_status', valor='Aberto'))
+
+    id_cliente = _proximo_id(db, m.Cliente)
+    clientes = [{'id': id_cliente + i, 'nome': f'Cliente {id_cliente + i}',
+                 'contato': f'83 9{aleatorio.randint(10000000, 99999999)}'} for i in range(qtd['clientes'])]
+    _inserir(db, m.Cliente, clientes)
+
+    id_pedido = _proximo_id(db, m.Pedido)
+    pedidos, itens = [], []
+    for i in range(qtd['pedidos']):
+        escolhidos = aleatorio.sample(produtos, aleatorio.randint(1, min(5, len(produtos))))
+        quantidades = [aleatorio.randint(1, 3) for _ in escolhidos]
+        pedidos.append({
+            'id': id_pedido + i,
+            'cliente_id': aleatorio.choice(clientes)['id'],
+            'data_pedido': agora - datetime.timedelta(minutes=aleatorio.randint(0, 60 * 24 * 180)),
+            'valor_total_centavos': sum(p['preco_centavos'] * q for p, q in zip(escolhidos, quantidades)),
+            'status': aleatorio.choice(STATUS_PEDIDO),
+        })
+        itens.extend({'pedido_id': id_pedido + i, 'produto_id': p['id'], 'quantidade': q,
+                      'preco_unitario_centavos': p['preco_centavos']} for p, q in zip(escolhidos, quantidades))
+    _inserir(db, m.Pedido, pedidos)
+    _inserir(db, m.ItemPedido, itens)
+
+    db.session.commit()
+    # As presenças foram inseridas direto na tabela, sem passar pelos agregados.
+    frequencia.recalcular()
+    qtd['itens_pedido'] = len(itens)
+    return qtd
@@ -0,0 +1,29 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+# Valores em dinheiro são guardados em centavos (inteiros): somas no SQL e no carrinho
+# ficam exatas, sem arredondar depois. A conversão para reais só acontece na exibição.
+
+
+def para_centavos(texto):
+    """Converte o valor digitado em reais ("5,50", "5.5", "12") para centavos.
+
+    Levanta ValueError se o texto não for um número.
+    """
+    try:
+        valor = Decimal(str(texto).strip().replace(',', '.'))
+    except InvalidOperation:
+        raise ValueError(f'Valor em reais inválido: {texto!r}') from None
+    if not valor.is_finite():
+        raise ValueError(f'Valor em reais inválido: {texto!r}')
+    return int((valor * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def reais(centavos):
+    """Centavos no formato "5.50", sem o "R$" (filtro de template `reais`)."""
+    sinal = '-' if centavos < 0 else ''
+    inteiro, resto = divmod(abs(centavos), 100)
+    return f'{sinal}{inteiro}.{resto:02d}'
+
+
+def init_app(app):
+    app.add_template_filter(reais)
@@ -0,0 +1,137 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+
+from flask import request, send_from_directory
+
+from .compressao import TIPOS_COMPRESSIVEIS, brotli
+
+# Arquivos gerados por `flask construir-estaticos`: cópias com o hash do conteúdo no
+# nome (css/estilos.3f2a9c1b0d.css) e, para texto, irmãos .gz/.br pré-comprimidos.
+PASTA_DIST = 'dist'
+ARQUIVO_MANIFESTO = 'manifesto.json'
+# Conteúdo enviado pelos usuários não é versionado: pode mudar sem mudar de nome.
+PASTAS_IGNORADAS = {PASTA_DIST, 'uploads'}
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+
+_URL_CSS = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+
+
+def _com_hash(caminho, conteudo):
+    raiz, extensao = posixpath.splitext(caminho)
+    return f'{raiz}.{hashlib.sha256(conteudo).hexdigest()[:10]}{extensao}'
+
+
+def _reescrever_urls_css(conteudo, caminho_css, manifesto):
+    # As URLs relativas do CSS passam a apontar para as cópias com hash; como dist/
+    # espelha a estrutura de static/, o caminho relativo continua o mesmo.
+    pasta_css = posixpath.dirname(caminho_css)
+
+    def trocar(achado):
+        url = achado.group(2)
+        if re.match(r'^(?:[a-z]+:|/|#)', url):
+            return achado.group(0)
+        alvo = posixpath.normpath(posixpath.join(pasta_css, url))
+        if alvo in manifesto:
+            novo = posixpath.relpath(manifesto[alvo], pasta_css)
+        else:
+            # Sem versão: aponta para o original, um nível acima por causa de dist/.
+            novo = posixpath.join('..', url) if pasta_css else url
+        return f'url({achado.group(1)}{novo}{achado.group(1)})'
+
+    return _URL_CSS.sub(trocar, conteudo.decode('utf-8')).encode('utf-8')
+
+
+def construir(pasta_static, transformar_css=None):
+    """Gera static/dist/ e o manifesto. Retorna o manifesto {original: versionado}.
+
+    `transformar_css(caminho, conteudo)`, se informado, recebe cada CSS antes do hash e
+    devolve o conteúdo a publicar (ex.: purgado e minificado).
+    """
+    destino = os.path.join(pasta_static, PASTA_DIST)
+    shutil.rmtree(destino, ignore_errors=True)
+
+    arquivos = []
+    for raiz, pastas, nomes in os.walk(pasta_static):
+        relativo = os.path.relpath(raiz, pasta_static)
+        if relativo == '.':
+            pastas[:] = [p for p in pastas if p not in PASTAS_IGNORADAS]
+        arquivos += [posixpath.normpath(posixpath.join(relativo.replace(os.sep, '/'), nome))
+                     for nome in nomes if nome != ARQUIVO_MANIFESTO]
+    # CSS por último: as URLs de imagens dentro dele precisam já estar no manifesto.
+    arquivos.sort(key=lambda caminho: (caminho.endswith('.css'), caminho))
+
+    manifesto = {}
+    for caminho in arquivos:
+        with open(os.path.join(pasta_static, caminho), 'rb') as arquivo:
+            conteudo = arquivo.read()
+        if caminho.endswith('.css'):
+            if transformar_css:
+                conteudo = transformar_css(caminho, conteudo)
+            conteudo = _reescrever_urls_css(conteudo, caminho, manifesto)
+        versionado = _com_hash(caminho, conteudo)
+        saida = os.path.join(destino, versionado)
+        os.makedirs(os.path.dirname(saida), exist_ok=True)
+        with open(saida, 'wb') as arquivo:
+            arquivo.write(conteudo)
+        if mimetypes.guess_type(caminho)[0] in TIPOS_COMPRESSIVEIS:
+            with open(saida + '.gz', 'wb') as arquivo:
+                arquivo.write(gzip.compress(conteudo, compresslevel=9, mtime=0))
+            if brotli:
+                with open(saida + '.br', 'wb') as arquivo:
+                    arquivo.write(brotli.compress(conteudo, quality=11))
+        manifesto[caminho] = versionado
+
+    with open(os.path.join(pasta_static, ARQUIVO_MANIFESTO), 'w') as arquivo:
+        json.dump(manifesto, arquivo, indent=1, sort_keys=True)
+    return manifesto
+
+
+def carregar_manifesto(pasta_static):
+    try:
+        with open(os.path.join(pasta_static, ARQUIVO_MANIFESTO)) as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return {}
+
+
+def init_app(app):
+    """Faz url_for('static', ...) apontar para as cópias versionadas e as serve com cache longo.
+
+    Sem manifesto (build não executado), nada muda. Depois de um novo build é preciso
+    reiniciar a aplicação para recarregar o manifesto.
+    """
+    manifesto = carregar_manifesto(app.static_folder)
+    if not manifesto:
+        return
+
+    @app.url_defaults
+    def _versionar_estatico(endpoint, valores):
+        if endpoint == 'static' and valores.get('filename') in manifesto:
+            valores['filename'] = f"{PASTA_DIST}/{manifesto[valores['filename']]}"
+
+    servir_padrao = app.view_functions['static']
+
+    def servir_estatico(filename):
+        if not filename.startswith(PASTA_DIST + '/'):
+            return servir_padrao(filename=filename)
+        aceitas = request.accept_encodings
+        for codificacao, extensao in (('br', '.br'), ('gzip', '.gz')):
+            if aceitas[codificacao] and os.path.isfile(os.path.join(app.static_folder, filename + extensao)):
+                resposta = send_from_directory(app.static_folder, filename + extensao,
+                                               mimetype=mimetypes.guess_type(filename)[0])
+                resposta.headers['Content-Encoding'] = codificacao
+                break
+        else:
+            resposta = send_from_directory(app.static_folder, filename)
+        resposta.vary.add('Accept-Encoding')
+        # O nome muda quando o conteúdo muda: o navegador nunca precisa revalidar.
+        resposta.headers['Cache-Control'] = CACHE_IMUTAVEL
+        return resposta
+
+    app.view_functions['static'] = servir_estatico
@@ -0,0 +1,86 @@
+from sqlalchemy import and_, func, insert, select
+
+from .extensoes import db
+from .modelos import MovimentoEstoque, SaldoEstoque
+
+# Motivos dos movimentos de estoque.
+VENDA = 'venda'
+REPOSICAO = 'reposicao'
+AJUSTE = 'ajuste'
+ESTORNO = 'estorno'
+NOMES_MOTIVO = {VENDA: 'Venda', REPOSICAO: 'Reposição', AJUSTE: 'Ajuste manual', ESTORNO: 'Pedido excluído'}
+
+# O estoque de um produto é a soma do livro de movimentos. Para não somar o histórico
+# inteiro a cada leitura, `compactar` grava de tempos em tempos uma foto do saldo de cada
+# produto que mudou (SaldoEstoque); o saldo atual é a última foto mais os movimentos
+# posteriores a ela. As fotos também são só de acréscimo, então servem para consultar o
+# estoque numa data passada.
+
+
+def movimentar(produto_id, quantidade, motivo, pedido_id=None):
+    """Acrescenta um movimento ao livro (gravado no commit da sessão)."""
+    movimento = MovimentoEstoque(produto_id=produto_id, quantidade=quantidade, motivo=motivo, pedido_id=pedido_id)
+    db.session.add(movimento)
+    return movimento
+
+
+def _ultimo_movimento_em(data):
+    return db.session.query(MovimentoEstoque.id).filter(MovimentoEstoque.criado_em <= data)\
+        .order_by(MovimentoEstoque.criado_em.desc(), MovimentoEstoque.id.desc()).limit(1).scalar() or 0
+
+
+def _saldos(produto_ids, ate_movimento):
+    # Última foto de cada produto, pela chave (produto_id, movimento_id).
+    fotos = select(SaldoEstoque.produto_id, func.max(SaldoEstoque.movimento_id).label('movimento_id'))
+    movimentos = db.session.query(MovimentoEstoque.produto_id, func.sum(MovimentoEstoque.quantidade))
+    if ate_movimento is not None:
+        fotos = fotos.where(SaldoEstoque.movimento_id <= ate_movimento)
+        movimentos = movimentos.filter(MovimentoEstoque.id <= ate_movimento)
+    if produto_ids is not None:
+        fotos = fotos.where(SaldoEstoque.produto_id.in_(produto_ids))
+        movimentos = movimentos.filter(MovimentoEstoque.produto_id.in_(produto_ids))
+    fotos = fotos.group_by(SaldoEstoque.produto_id).subquery()
+
+    saldos = dict(db.session.query(SaldoEstoque.produto_id, SaldoEstoque.estoque).join(fotos, and_(
+        SaldoEstoque.produto_id == fotos.c.produto_id, SaldoEstoque.movimento_id == fotos.c.movimento_id)))
+    # Só os movimentos depois da foto de cada produto (todos, para quem ainda não tem foto).
+    posteriores = movimentos.outerjoin(fotos, fotos.c.produto_id == MovimentoEstoque.produto_id)\
+        .filter(MovimentoEstoque.id > func.coalesce(fotos.c.movimento_id, 0))\
+        .group_by(MovimentoEstoque.produto_id)
+    for produto_id, quantidade in posteriores:
+        saldos[produto_id] = saldos.get(produto_id, 0) + quantidade
+    return saldos
+
+
+def saldos(produto_ids=None, em=None):
+    """Estoque por produto ({produto_id: quantidade}); `em` (datetime) dá o estoque naquele momento.
+
+    Produto sem nenhum movimento fica de fora do dicionário: use `.get(produto_id, 0)`.
+    """
+    ate_movimento = None if em is None else _ultimo_movimento_em(em)
+    return _saldos(produto_ids, ate_movimento)
+
+
+def movimentos_do_produto(produto_id, limite=200):
+    """Movimentos mais recentes de um produto, do mais novo para o mais antigo."""
+    return MovimentoEstoque.query.filter_by(produto_id=produto_id)\
+        .order_by(MovimentoEstoque.id.desc()).limit(limite).all()
+
+
+def compactar():
+    """Grava uma foto do saldo de cada produto que teve movimentos desde a última. Retorna quantas gravou.
+
+    Movimentos nunca mudam depois de gravados, então a foto vale mesmo com pedidos
+    chegando enquanto ela é montada: o que entrar depois fica para a próxima.
+    """
+    ultima_marca = db.session.query(func.max(SaldoEstoque.movimento_id)).scalar() or 0
+    marca = db.session.query(func.max(MovimentoEstoque.id)).scalar() or 0
+    if marca <= ultima_marca:
+        return 0
+    alterados = [produto_id for produto_id, in db.session.query(MovimentoEstoque.produto_id).distinct()
+                 .filter(MovimentoEstoque.id > ultima_marca, MovimentoEstoque.id <= marca)]
+    fotos = [{'produto_id': produto_id, 'movimento_id': marca, 'estoque': estoque}
+             for produto_id, estoque in _saldos(alterados, marca).items()]
+    db.session.execute(insert(SaldoEstoque), fotos)
+    db.session.commit()
+    return len(fotos)
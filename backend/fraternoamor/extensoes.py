@@ -0,0 +1,27 @@
+import sqlite3
+
+from flask_sqlalchemy import SQLAlchemy
+from flask_bcrypt import Bcrypt
+from flask_login import LoginManager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# As extensões são criadas sem aplicação e ligadas a ela em create_app().
+db = SQLAlchemy()
+bcrypt = Bcrypt()
+login_manager = LoginManager()
+login_manager.login_view = 'membro.login'
+login_manager.login_message = "Por favor, faça o login para acessar esta página."
+login_manager.login_message_category = 'info'
+
+
+@event.listens_for(Engine, 'connect')
+def _configurar_sqlite(dbapi_connection, connection_record):
+    # WAL deixa leituras seguirem durante uma escrita; busy_timeout faz quem disputa o
+    # lock de escrita esperar em vez de falhar com "database is locked".
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA busy_timeout=5000')
+        cursor.close()
@@ -0,0 +1,186 @@
+import bisect
+import datetime
+from collections import Counter
+
+from sqlalchemy import case, func, literal, select, true
+from sqlalchemy.dialects.sqlite import insert
+
+from .extensoes import db
+from .modelos import (CategoriaUsuario, Presenca, Reuniao, ResumoPresencaCategoria,
+                      ResumoPresencaMembro, Usuario, user_category_association)
+
+# Agregados de frequência nas reuniões. São atualizados na mesma transação que grava
+# as presenças (ver presencas.BufferPresencas.gravar), então os relatórios leem só
+# as tabelas de resumo, sem varrer presenca/usuario/user_category.
+
+uc = user_category_association
+
+
+def _membros_da_categoria():
+    return select(func.count()).select_from(uc)\
+        .where(uc.c.categoria_usuario_id == CategoriaUsuario.id).scalar_subquery()
+
+
+def garantir_resumos_reunioes(reuniao_ids):
+    """Cria (presentes = 0) as linhas de resumo que faltam para as reuniões e categorias atuais."""
+    if not reuniao_ids:
+        return
+    linhas = select(Reuniao.id, CategoriaUsuario.id, Reuniao.data_reuniao, literal(0), _membros_da_categoria())\
+        .join(CategoriaUsuario, true()).where(Reuniao.id.in_(reuniao_ids))
+    db.session.execute(
+        insert(ResumoPresencaCategoria)
+        .from_select(['reuniao_id', 'categoria_id', 'data_reuniao', 'presentes', 'membros'], linhas)
+        .on_conflict_do_nothing()
+    )
+
+
+def acumular(novas, ate=None):
+    """Soma aos agregados as presenças recém-inseridas: lista de pares (usuario_id, reuniao_id).
+
+    Reuniões marcadas para depois de `ate` (padrão: agora) contam no total, mas não viram a
+    última reunião do membro: senão ele sumiria de ausentes_seguidos até a data chegar.
+    """
+    if not novas:
+        return
+    ate = ate or datetime.datetime.now()
+    reuniao_ids = {reuniao_id for _, reuniao_id in novas}
+    usuario_ids = {usuario_id for usuario_id, _ in novas}
+    datas = dict(db.session.execute(select(Reuniao.id, Reuniao.data_reuniao).where(Reuniao.id.in_(reuniao_ids))).all())
+
+    # --- Por membro ---
+    por_membro = {}
+    for usuario_id, reuniao_id in novas:
+        total, ultima = por_membro.get(usuario_id, (0, None))
+        data = datas[reuniao_id] if datas[reuniao_id] <= ate else None
+        por_membro[usuario_id] = (total + 1, max(filter(None, (ultima, data)), default=None))
+    instrucao = insert(ResumoPresencaMembro)
+    tabela = ResumoPresencaMembro.__table__.c
+    db.session.execute(
+        instrucao.on_conflict_do_update(
+            index_elements=['usuario_id'],
+            set_={
+                'total_presencas': tabela.total_presencas + instrucao.excluded.total_presencas,
+                'ultima_reuniao_data': case(
+                    (instrucao.excluded.ultima_reuniao_data.is_(None), tabela.ultima_reuniao_data),
+                    (tabela.ultima_reuniao_data.is_(None), instrucao.excluded.ultima_reuniao_data),
+                    (tabela.ultima_reuniao_data > instrucao.excluded.ultima_reuniao_data, tabela.ultima_reuniao_data),
+                    else_=instrucao.excluded.ultima_reuniao_data),
+            }),
+        [{'usuario_id': u, 'total_presencas': t, 'ultima_reuniao_data': d} for u, (t, d) in por_membro.items()]
+    )
+
+    # --- Por reunião e categoria ---
+    garantir_resumos_reunioes(reuniao_ids)
+    categorias = {}
+    for usuario_id, categoria_id in db.session.execute(
+            select(uc.c.usuario_id, uc.c.categoria_usuario_id).where(uc.c.usuario_id.in_(usuario_ids))):
+        categorias.setdefault(usuario_id, []).append(categoria_id)
+    contagem = Counter((reuniao_id, categoria_id) for usuario_id, reuniao_id in novas
+                       for categoria_id in categorias.get(usuario_id, ()))
+    if contagem:
+        db.session.execute(
+            ResumoPresencaCategoria.__table__.update()
+            .where(ResumoPresencaCategoria.reuniao_id == db.bindparam('r_id'),
+                   ResumoPresencaCategoria.categoria_id == db.bindparam('c_id'))
+            .values(presentes=ResumoPresencaCategoria.presentes + db.bindparam('qtd')),
+            [{'r_id': r, 'c_id': c, 'qtd': q} for (r, c), q in contagem.items()]
+        )
+
+
+def recalcular(ate=None):
+    """Refaz todos os agregados a partir de presenca. Retorna quantas linhas de cada resumo foram criadas.
+
+    O número de membros de cada categoria passa a ser o atual também para reuniões antigas.
+    Como em acumular, reuniões depois de `ate` (padrão: agora) não contam como a última do membro.
+    """
+    ate = ate or datetime.datetime.now()
+    db.session.execute(ResumoPresencaMembro.__table__.delete())
+    db.session.execute(ResumoPresencaCategoria.__table__.delete())
+    db.session.execute(
+        insert(ResumoPresencaMembro).from_select(
+            ['usuario_id', 'total_presencas', 'ultima_reuniao_data'],
+            select(Presenca.usuario_id, func.count(),
+                   func.max(case((Reuniao.data_reuniao <= ate, Reuniao.data_reuniao))))
+            .join(Reuniao, Reuniao.id == Presenca.reuniao_id)
+            .group_by(Presenca.usuario_id))
+    )
+    presentes = select(func.count()).select_from(Presenca)\
+        .join(uc, uc.c.usuario_id == Presenca.usuario_id)\
+        .where(Presenca.reuniao_id == Reuniao.id, uc.c.categoria_usuario_id == CategoriaUsuario.id)\
+        .scalar_subquery()
+    db.session.execute(
+        insert(ResumoPresencaCategoria).from_select(
+            ['reuniao_id', 'categoria_id', 'data_reuniao', 'presentes', 'membros'],
+            select(Reuniao.id, CategoriaUsuario.id, Reuniao.data_reuniao, presentes, _membros_da_categoria())
+            .join(CategoriaUsuario, true()))
+    )
+    db.session.commit()
+    return {
+        'membros': db.session.query(ResumoPresencaMembro).count(),
+        'reunioes_x_categorias': db.session.query(ResumoPresencaCategoria).count(),
+    }
+
+
+# --- Consultas dos relatórios ---
+
+def _filtrar_periodo(consulta, de=None, ate=None):
+    if de:
+        consulta = consulta.where(ResumoPresencaCategoria.data_reuniao >= de)
+    if ate:
+        consulta = consulta.where(ResumoPresencaCategoria.data_reuniao < ate)
+    return consulta
+
+
+def taxa_por_categoria(de=None, ate=None, ultimas=12):
+    """Frequência de cada categoria nas últimas `ultimas` reuniões do período (até agora, por padrão)."""
+    ate = ate or datetime.datetime.now()
+    reunioes = _filtrar_periodo(
+        select(ResumoPresencaCategoria.reuniao_id, ResumoPresencaCategoria.data_reuniao).distinct(), de, ate)\
+        .order_by(ResumoPresencaCategoria.data_reuniao.desc()).limit(ultimas).subquery()
+    linhas = db.session.execute(
+        select(CategoriaUsuario.nome, func.count(), func.sum(ResumoPresencaCategoria.presentes),
+               func.sum(ResumoPresencaCategoria.membros))
+        .join(CategoriaUsuario, CategoriaUsuario.id == ResumoPresencaCategoria.categoria_id)
+        .where(ResumoPresencaCategoria.reuniao_id.in_(select(reunioes.c.reuniao_id)))
+        .group_by(CategoriaUsuario.id).order_by(CategoriaUsuario.nome)
+    ).all()
+    return [{'categoria': nome, 'reunioes': qtd, 'presentes': presentes, 'esperados': membros,
+             'taxa': (presentes / membros * 100) if membros else 0.0}
+            for nome, qtd, presentes, membros in linhas]
+
+
+def ausentes_seguidos(seguidas=3, ate=None):
+    """Membros (não administradores) que faltaram às últimas `seguidas` reuniões já realizadas.
+
+    Como o resumo guarda a data da última reunião com presença, basta compará-la com a
+    data da N-ésima reunião mais recente.
+    """
+    ate = ate or datetime.datetime.now()
+    datas = db.session.execute(
+        select(Reuniao.data_reuniao).where(Reuniao.data_reuniao <= ate).order_by(Reuniao.data_reuniao)
+    ).scalars().all()
+    if len(datas) < seguidas:
+        return []
+    limite = datas[-seguidas]
+    linhas = db.session.execute(
+        select(Usuario, ResumoPresencaMembro.total_presencas, ResumoPresencaMembro.ultima_reuniao_data)
+        .outerjoin(ResumoPresencaMembro, ResumoPresencaMembro.usuario_id == Usuario.id)
+        .where(Usuario.is_admin == False)  # noqa: E712
+        .where((ResumoPresencaMembro.ultima_reuniao_data == None) | (ResumoPresencaMembro.ultima_reuniao_data < limite))  # noqa: E711
+        .order_by(ResumoPresencaMembro.ultima_reuniao_data, Usuario.username)
+    ).all()
+    return [{'usuario': usuario, 'total_presencas': total or 0, 'ultima_presenca': ultima,
+             'faltas_seguidas': len(datas) - (bisect.bisect_right(datas, ultima) if ultima else 0)}
+            for usuario, total, ultima in linhas]
+
+
+def linhas_por_reuniao(de=None, ate=None):
+    """Gera (data, reunião, categoria, presentes, membros) em ordem cronológica, sem carregar tudo na memória."""
+    consulta = _filtrar_periodo(
+        select(ResumoPresencaCategoria.data_reuniao, Reuniao.titulo, CategoriaUsuario.nome,
+               ResumoPresencaCategoria.presentes, ResumoPresencaCategoria.membros)
+        .join(Reuniao, Reuniao.id == ResumoPresencaCategoria.reuniao_id)
+        .join(CategoriaUsuario, CategoriaUsuario.id == ResumoPresencaCategoria.categoria_id), de, ate)\
+        .order_by(ResumoPresencaCategoria.data_reuniao, CategoriaUsuario.nome)\
+        .execution_options(yield_per=500)
+    yield from db.session.execute(consulta)
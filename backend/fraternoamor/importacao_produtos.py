@@ -0,0 +1,183 @@
+import csv
+import datetime
+import io
+import os
+import unicodedata
+
+from flask import current_app
+from sqlalchemy import bindparam, delete, func, insert, update
+
+from . import catalogo, dinheiro, estoque
+from .extensoes import db
+from .modelos import MovimentoEstoque, Produto
+
+# Planilha no mesmo formato de /admin/relatorio/produtos.csv: ID, Nome, Categoria, Preco,
+# Estoque. Linha sem ID é produto novo; Estoque em branco não mexe no estoque. Aceita
+# vírgula ou ponto e vírgula como separador (o Excel em português salva com ;).
+
+COLUNAS_OBRIGATORIAS = ('nome', 'categoria', 'preco')
+CAMPOS = (('nome', 'Nome'), ('categoria', 'Categoria'), ('preco_centavos', 'Preço'))
+
+
+class PlanilhaInvalida(Exception):
+    """A planilha tem erros; nada foi gravado. `erros` lista as mensagens por linha."""
+
+    def __init__(self, erros):
+        super().__init__('; '.join(erros))
+        self.erros = erros
+
+
+def decodificar(conteudo):
+    """Bytes do arquivo enviado para texto: UTF-8 (com ou sem BOM) ou, se falhar, o latin-1 do Excel."""
+    try:
+        return conteudo.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return conteudo.decode('latin-1')
+
+
+def _normalizar(cabecalho):
+    sem_acento = unicodedata.normalize('NFKD', cabecalho or '').encode('ascii', 'ignore').decode()
+    return sem_acento.strip().lower()
+
+
+def ler_planilha(texto):
+    """Lê o CSV e devolve (linhas, erros); cada linha é um dict com os valores já convertidos."""
+    texto = texto.lstrip('\ufeff')
+    try:
+        dialeto = csv.Sniffer().sniff(texto.split('\n', 1)[0], delimiters=',;')
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.reader(io.StringIO(texto), dialeto)
+    cabecalho = [_normalizar(coluna) for coluna in next(leitor, [])]
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in cabecalho]
+    if faltando:
+        return [], [f'Faltam as colunas: {", ".join(faltando)}.']
+
+    linhas, erros, vistos = [], [], set()
+    for numero, valores in enumerate(leitor, start=2):
+        if not any(valor.strip() for valor in valores):
+            continue
+        bruta = {coluna: valor.strip() for coluna, valor in zip(cabecalho, valores)}
+        linha = {'linha': numero, 'id': None, 'estoque': None,
+                 'nome': bruta.get('nome', ''), 'categoria': bruta.get('categoria', '')}
+        try:
+            if bruta.get('id'):
+                linha['id'] = int(bruta['id'])
+            linha['preco_centavos'] = dinheiro.para_centavos(bruta.get('preco', ''))
+            if bruta.get('estoque'):
+                linha['estoque'] = int(bruta['estoque'])
+        except ValueError:
+            erros.append(f'Linha {numero}: ID, preço ou estoque não é um número.')
+            continue
+        if not linha['nome'] or not linha['categoria']:
+            erros.append(f'Linha {numero}: nome e categoria são obrigatórios.')
+        elif len(linha['nome']) > 100 or len(linha['categoria']) > 50:
+            erros.append(f'Linha {numero}: nome (até 100) ou categoria (até 50 caracteres) longo demais.')
+        elif linha['preco_centavos'] < 0 or (linha['estoque'] or 0) < 0:
+            erros.append(f'Linha {numero}: preço e estoque não podem ser negativos.')
+        elif linha['id'] is not None and linha['id'] in vistos:
+            erros.append(f'Linha {numero}: o produto {linha["id"]} aparece mais de uma vez.')
+        else:
+            vistos.add(linha['id'])
+            linhas.append(linha)
+    return linhas, erros
+
+
+def planejar(texto, excluir_ausentes=False):
+    """Compara a planilha com a tabela de produtos e devolve o que mudaria. Nada é gravado.
+
+    O plano tem as listas 'inserir', 'atualizar', 'excluir' e 'erros'. Produtos fora da
+    planilha só entram em 'excluir' com `excluir_ausentes`.
+    """
+    linhas, erros = ler_planilha(texto)
+    atuais = {produto.id: produto for produto in db.session.query(
+        Produto.id, Produto.nome, Produto.categoria, Produto.preco_centavos, Produto.imagem_url)}
+    saldos = estoque.saldos()
+    plano = {'inserir': [], 'atualizar': [], 'excluir': [], 'erros': erros}
+    for linha in linhas:
+        if linha['id'] is None:
+            plano['inserir'].append(linha)
+            continue
+        atual = atuais.get(linha['id'])
+        if atual is None:
+            erros.append(f'Linha {linha["linha"]}: não existe produto com ID {linha["id"]}.')
+            continue
+        mudancas = [f'{rotulo}: {_exibir(campo, getattr(atual, campo))} → {_exibir(campo, linha[campo])}'
+                    for campo, rotulo in CAMPOS if getattr(atual, campo) != linha[campo]]
+        # Só o estoque mudou: a linha do produto não precisa de UPDATE, só do movimento.
+        campos_alterados = bool(mudancas)
+        saldo = saldos.get(atual.id, 0)
+        if linha['estoque'] is not None and linha['estoque'] != saldo:
+            mudancas.append(f'Estoque: {saldo} → {linha["estoque"]}')
+        if mudancas:
+            plano['atualizar'].append(dict(linha, mudancas=mudancas, campos_alterados=campos_alterados, saldo=saldo))
+    if excluir_ausentes:
+        presentes = {linha['id'] for linha in linhas}
+        plano['excluir'] = [{'id': atual.id, 'nome': atual.nome, 'imagem_url': atual.imagem_url}
+                            for atual in atuais.values() if atual.id not in presentes]
+    return plano
+
+
+def _exibir(campo, valor):
+    return dinheiro.reais(valor) if campo == 'preco_centavos' else valor
+
+
+def aplicar(texto, excluir_ausentes=False):
+    """Grava a planilha numa transação só e devolve o plano aplicado.
+
+    O plano é refeito com o lock de escrita já tomado (pela versão nova do catálogo), então
+    vale contra o estado do banco no momento da gravação, e não o da pré-visualização.
+    Inserts, updates e movimentos de estoque vão em lote (executemany). Levanta
+    PlanilhaInvalida, sem gravar nada, se houver erros.
+    """
+    versao = catalogo.marcar_alterados([])
+    plano = planejar(texto, excluir_ausentes)
+    if plano['erros']:
+        db.session.rollback()
+        raise PlanilhaInvalida(plano['erros'])
+    if not (plano['inserir'] or plano['atualizar'] or plano['excluir']):
+        db.session.rollback()
+        return plano
+
+    agora = datetime.datetime.utcnow()
+    movimentos = []
+    proximo_id = (db.session.query(func.max(Produto.id)).scalar() or 0) + 1
+    novos = []
+    for numero, linha in enumerate(plano['inserir']):
+        produto_id = proximo_id + numero
+        novos.append({'id': produto_id, 'nome': linha['nome'], 'categoria': linha['categoria'],
+                      'preco_centavos': linha['preco_centavos'], 'versao': versao})
+        if linha['estoque']:
+            movimentos.append({'produto_id': produto_id, 'quantidade': linha['estoque'],
+                               'motivo': estoque.REPOSICAO, 'criado_em': agora})
+    alterados = []
+    for linha in plano['atualizar']:
+        if linha['campos_alterados']:
+            alterados.append({'b_id': linha['id'], 'b_nome': linha['nome'], 'b_categoria': linha['categoria'],
+                              'b_preco_centavos': linha['preco_centavos'], 'b_versao': versao})
+        if linha['estoque'] is not None and linha['estoque'] != linha['saldo']:
+            movimentos.append({'produto_id': linha['id'], 'quantidade': linha['estoque'] - linha['saldo'],
+                               'motivo': estoque.AJUSTE, 'criado_em': agora})
+
+    tabela = Produto.__table__
+    if novos:
+        db.session.execute(insert(tabela), novos)
+    if alterados:
+        db.session.execute(update(tabela).where(tabela.c.id == bindparam('b_id')).values(
+            nome=bindparam('b_nome'), categoria=bindparam('b_categoria'),
+            preco_centavos=bindparam('b_preco_centavos'), versao=bindparam('b_versao')), alterados)
+    if movimentos:
+        db.session.execute(insert(MovimentoEstoque.__table__), movimentos)
+        # Produto com só o estoque alterado também precisa da versão nova no catálogo.
+        db.session.execute(update(tabela).where(tabela.c.id.in_({m['produto_id'] for m in movimentos}))
+                           .values(versao=versao))
+    if plano['excluir']:
+        db.session.execute(delete(tabela).where(tabela.c.id.in_([produto['id'] for produto in plano['excluir']])))
+    db.session.commit()
+
+    for produto in plano['excluir']:
+        if produto['imagem_url']:
+            caminho = os.path.join(current_app.config['UPLOAD_FOLDER'], produto['imagem_url'])
+            if os.path.exists(caminho):
+                os.remove(caminho)
+    return plano
@@ -0,0 +1,240 @@
+import json
+import os
+import shutil
+import time
+import threading
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from . import invalidacao
+from .extensoes import db
+
+# Quantas vezes a mesma instrução pode se repetir numa requisição antes de ser
+# marcada como provável N+1, e quantas instruções lentas guardar por endpoint.
+LIMITE_N_MAIS_UM = 5
+MAX_INSTRUCOES_LENTAS = 5
+
+# Cada worker do gunicorn acumula o seu resumo e o grava (no máximo a cada SQL_RESUMO_INTERVALO
+# segundos) num arquivo próprio em SQL_RESUMO_PASTA, como o diretório multiprocesso das métricas;
+# a página do admin soma os arquivos de todos. Limpar passa pelo barramento de invalidação.
+NOME_CACHE = 'resumo_sql'
+
+_lock = threading.Lock()
+_resumo_por_endpoint = invalidacao.cache(NOME_CACHE)
+_processo = {'pid': None, 'arquivo': None, 'gravado_em': 0.0}
+
+
+def _encurtar(instrucao, limite=300):
+    """Compacta espaços e corta instruções SQL muito longas para exibição."""
+    texto = ' '.join(instrucao.split())
+    return texto if len(texto) <= limite else texto[:limite] + '...'
+
+
+# --- 1. HOOKS DO SQLALCHEMY (ligados ao engine da aplicação em init_app) ---
+def _antes_de_executar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_inicio_instrucao', []).append(time.perf_counter())
+
+
+def _erro_ao_executar(contexto):
+    # Instrução que falhou não chega ao after_cursor_execute: o início dela sai da pilha aqui,
+    # senão a pilha cresce na conexão do pool e os tempos seguintes ficam trocados.
+    conexao = contexto.connection
+    inicios = conexao.info.get('_inicio_instrucao') if conexao is not None else None
+    if inicios:
+        inicios.pop()
+
+
+def _depois_de_executar(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('_inicio_instrucao')
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    # Fora de uma requisição (CLI, migrações) não há onde acumular.
+    dados = g.get('_sql') if has_request_context() else None
+    if dados is None:
+        return
+    dados['total'] += 1
+    dados['tempo'] += duracao
+    dados['repeticoes'][statement] += 1
+    dados['lentas'].append((duracao, statement))
+
+
+# --- 2. HOOKS DA REQUISIÇÃO ---
+def _iniciar_requisicao():
+    g._sql = {'inicio': time.perf_counter(), 'total': 0, 'tempo': 0.0,
+              'repeticoes': Counter(), 'lentas': []}
+
+
+def _finalizar_requisicao(response):
+    dados = g.pop('_sql', None)
+    if dados is None:
+        return response
+    duracao_total = time.perf_counter() - dados['inicio']
+    suspeitas = [(instrucao, vezes) for instrucao, vezes in dados['repeticoes'].items()
+                 if vezes >= LIMITE_N_MAIS_UM]
+    lentas = sorted(dados['lentas'], key=lambda item: item[0], reverse=True)[:MAX_INSTRUCOES_LENTAS]
+
+    metricas = [
+        f'db;dur={dados["tempo"] * 1000:.1f};desc="{dados["total"]} consultas"',
+        f'app;dur={duracao_total * 1000:.1f}',
+    ]
+    if suspeitas:
+        metricas.append(f'n1;desc="{len(suspeitas)} instrucoes repetidas"')
+    response.headers.add('Server-Timing', ', '.join(metricas))
+
+    endpoint = request.endpoint or '<sem endpoint>'
+    for instrucao, vezes in suspeitas:
+        current_app.logger.warning('Provável N+1 em %s: %dx %s', endpoint, vezes, _encurtar(instrucao, 120))
+    _acumular(endpoint, dados, duracao_total, suspeitas, lentas)
+    return response
+
+
+def _acumular(endpoint, dados, duracao_total, suspeitas, lentas):
+    with _lock:
+        resumo = _resumo_por_endpoint.setdefault(endpoint, {
+            'endpoint': endpoint, 'requisicoes': 0, 'consultas': 0, 'max_consultas': 0,
+            'tempo_db': 0.0, 'tempo_total': 0.0, 'requisicoes_n_mais_um': 0,
+            'suspeitas': {}, 'lentas': [],
+        })
+        resumo['requisicoes'] += 1
+        resumo['consultas'] += dados['total']
+        resumo['max_consultas'] = max(resumo['max_consultas'], dados['total'])
+        resumo['tempo_db'] += dados['tempo']
+        resumo['tempo_total'] += duracao_total
+        if suspeitas:
+            resumo['requisicoes_n_mais_um'] += 1
+            for instrucao, vezes in suspeitas:
+                resumo['suspeitas'][instrucao] = max(vezes, resumo['suspeitas'].get(instrucao, 0))
+        resumo['lentas'] = sorted(resumo['lentas'] + lentas, key=lambda item: item[0],
+                                  reverse=True)[:MAX_INSTRUCOES_LENTAS]
+    if time.monotonic() - _processo['gravado_em'] >= current_app.config['SQL_RESUMO_INTERVALO']:
+        _gravar()
+
+
+# --- 3. ARQUIVOS POR PROCESSO ---
+def _pasta():
+    return current_app.config['SQL_RESUMO_PASTA']
+
+
+def _arquivo_do_processo():
+    # O nome leva o instante de início: um worker novo que herde o PID de um morto
+    # não sobrescreve o que o outro acumulou.
+    if _processo['pid'] != os.getpid():
+        _processo.update(pid=os.getpid(), arquivo=f'{os.getpid()}-{time.time_ns()}.json', gravado_em=0.0)
+    return _processo['arquivo']
+
+
+def _gravar():
+    """Grava o resumo deste processo no seu arquivo, com a versão de limpeza que ele já viu."""
+    _processo['gravado_em'] = time.monotonic()
+    with _lock:
+        conteudo = json.dumps({'versao': invalidacao.versao(NOME_CACHE),
+                               'endpoints': list(_resumo_por_endpoint.values())})
+    pasta = _pasta()
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, _arquivo_do_processo())
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w') as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def _resumos_dos_outros_processos():
+    """Resumos gravados pelos demais workers (inclusive os que já terminaram) desde a última limpeza."""
+    proprio = _arquivo_do_processo()
+    versao = invalidacao.versao(NOME_CACHE)
+    try:
+        nomes = os.listdir(_pasta())
+    except FileNotFoundError:
+        return []
+    resumos = []
+    for nome in nomes:
+        if not nome.endswith('.json') or nome == proprio:
+            continue
+        try:
+            with open(os.path.join(_pasta(), nome)) as arquivo:
+                dados = json.load(arquivo)
+        except (FileNotFoundError, ValueError):
+            continue
+        # Worker que estava no meio de uma requisição durante a limpeza grava números antigos.
+        if dados.get('versao', 0) >= versao:
+            resumos.append(dados['endpoints'])
+    return resumos
+
+
+def _somar(resumos):
+    total = {}
+    for endpoints in resumos:
+        for resumo in endpoints:
+            soma = total.setdefault(resumo['endpoint'], {
+                'endpoint': resumo['endpoint'], 'requisicoes': 0, 'consultas': 0, 'max_consultas': 0,
+                'tempo_db': 0.0, 'tempo_total': 0.0, 'requisicoes_n_mais_um': 0,
+                'suspeitas': {}, 'lentas': [],
+            })
+            for campo in ('requisicoes', 'consultas', 'tempo_db', 'tempo_total', 'requisicoes_n_mais_um'):
+                soma[campo] += resumo[campo]
+            soma['max_consultas'] = max(soma['max_consultas'], resumo['max_consultas'])
+            for instrucao, vezes in resumo['suspeitas'].items():
+                soma['suspeitas'][instrucao] = max(vezes, soma['suspeitas'].get(instrucao, 0))
+            soma['lentas'] = sorted(soma['lentas'] + [tuple(item) for item in resumo['lentas']],
+                                    key=lambda item: item[0], reverse=True)[:MAX_INSTRUCOES_LENTAS]
+    return total.values()
+
+
+# --- 4. CONSULTA DO RESUMO ---
+def resumo_por_endpoint():
+    """Retorna (linhas, processos): o resumo somado de todos os workers por endpoint, do mais caro
+    para o mais barato em tempo de banco, e quantos processos entraram na soma.
+
+    Os números dos outros workers podem estar até SQL_RESUMO_INTERVALO segundos atrasados.
+    """
+    outros = _resumos_dos_outros_processos()
+    with _lock:
+        proprio = [dict(resumo, suspeitas=dict(resumo['suspeitas']), lentas=list(resumo['lentas']))
+                   for resumo in _resumo_por_endpoint.values()]
+    linhas = []
+    for resumo in _somar([proprio] + outros):
+            requisicoes = resumo['requisicoes'] or 1
+            linhas.append({
+                'endpoint': resumo['endpoint'],
+                'requisicoes': resumo['requisicoes'],
+                'media_consultas': resumo['consultas'] / requisicoes,
+                'max_consultas': resumo['max_consultas'],
+                'media_db_ms': resumo['tempo_db'] * 1000 / requisicoes,
+                'media_total_ms': resumo['tempo_total'] * 1000 / requisicoes,
+                'requisicoes_n_mais_um': resumo['requisicoes_n_mais_um'],
+                'suspeitas': [(_encurtar(instrucao), vezes) for instrucao, vezes in
+                              sorted(resumo['suspeitas'].items(), key=lambda item: item[1], reverse=True)],
+                'lentas': [(duracao * 1000, _encurtar(instrucao)) for duracao, instrucao in resumo['lentas']],
+            })
+    linhas.sort(key=lambda linha: linha['media_db_ms'] * linha['requisicoes'], reverse=True)
+    return linhas, len(outros) + 1
+
+
+def limpar_resumo():
+    """Zera o resumo de todos os workers: apaga os arquivos e invalida o cache de cada processo. Faz commit."""
+    with _lock:
+        _resumo_por_endpoint.clear()
+    shutil.rmtree(_pasta(), ignore_errors=True)
+    invalidacao.invalidar(NOME_CACHE)
+
+
+def init_app(app):
+    """Liga os hooks ao engine da aplicação e registra os de requisição que abrem e fecham a contagem de SQL."""
+    if not app.config.get('SQL_INSTRUMENTACAO', True):
+        return
+    app.config.setdefault('SQL_RESUMO_PASTA', os.path.join(app.instance_path, 'resumo_sql'))
+    app.config.setdefault('SQL_RESUMO_INTERVALO', 1.0)
+    # Com preload_app o gunicorn chama isto uma vez, no mestre: arquivos de uma execução
+    # anterior somariam requisições de workers que já não existem.
+    shutil.rmtree(app.config['SQL_RESUMO_PASTA'], ignore_errors=True)
+    with app.app_context():
+        engine = db.engine
+    for nome, funcao in (('before_cursor_execute', _antes_de_executar), ('after_cursor_execute', _depois_de_executar),
+                         ('handle_error', _erro_ao_executar)):
+        if not event.contains(engine, nome, funcao):
+            event.listen(engine, nome, funcao)
+    app.before_request(_iniciar_requisicao)
+    app.after_request(_finalizar_requisicao)
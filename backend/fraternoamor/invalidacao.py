@@ -0,0 +1,203 @@
+import fcntl
+import json
+import os
+import time
+from itertools import chain
+
+from flask import current_app
+from sqlalchemy import event, func, update
+from sqlalchemy.dialects.sqlite import insert
+
+from .extensoes import db
+from .modelos import VersaoCache
+
+# Invalidação dos caches em memória entre os workers, sem Redis. Cada tabela com algum cache
+# registrado (veja `cache`) tem uma versão em versao_cache, trocada na mesma transação que
+# grava nela (pelo ORM ou por db.session.execute); as demais tabelas não pagam nada. Depois
+# do commit as versões vão para instance/versoes_cache.json, e cada worker confere esse
+# arquivo uma vez por requisição com um stat: se mudou, os caches das tabelas com versão
+# nova são esvaziados. SQL cru (text()) não é visto aqui. A versão do catálogo, o status
+# da lanchonete e os fragmentos de template usam este mesmo mecanismo.
+
+GLOBAL = '*'
+
+# Tabela -> dicionários de cache que dependem dela (neste processo).
+_caches = {}
+_estado = {'assinatura': None, 'versoes': {}, 'sincronizado_em': 0.0}
+
+
+def cache(*tabelas):
+    """Dicionário do processo esvaziado sempre que alguma das `tabelas` muda, em qualquer worker.
+
+    Ex.: `_paginas = invalidacao.cache('configuracao')` no módulo, e depois
+    `_paginas.get(chave)` / `_paginas[chave] = valor` nas rotas. Um nome que não é tabela
+    serve de chave para invalidar só com `invalidar(nome)`.
+    """
+    memo = {}
+    for tabela in tabelas:
+        _caches.setdefault(tabela, []).append(memo)
+    return memo
+
+
+def _arquivo():
+    return os.path.join(current_app.instance_path, 'versoes_cache.json')
+
+
+def _ler():
+    try:
+        with open(_arquivo()) as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _assinatura():
+    try:
+        info = os.stat(_arquivo())
+    except FileNotFoundError:
+        return None
+    return info.st_ino, info.st_mtime_ns, info.st_size
+
+
+def _aplicar(versoes):
+    anteriores = _estado['versoes']
+    for tabela, memos in _caches.items():
+        if versoes.get(tabela) != anteriores.get(tabela):
+            for memo in memos:
+                memo.clear()
+    _estado['versoes'] = versoes
+
+
+def _publicar(alteradas):
+    """Junta as versões `alteradas` às do arquivo. O flock evita que dois workers percam a do outro."""
+    caminho = _arquivo()
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(f'{caminho}.lock', 'a') as trava:
+        fcntl.flock(trava, fcntl.LOCK_EX)
+        try:
+            versoes = _ler()
+            novas = {tabela: versao for tabela, versao in alteradas.items() if versao > versoes.get(tabela, 0)}
+            if novas:
+                versoes.update(novas)
+                temporario = f'{caminho}.{os.getpid()}.tmp'
+                with open(temporario, 'w') as arquivo:
+                    json.dump(versoes, arquivo)
+                os.replace(temporario, caminho)
+            _estado['assinatura'] = _assinatura()
+        finally:
+            fcntl.flock(trava, fcntl.LOCK_UN)
+    _aplicar(versoes)
+
+
+def _ressincronizar():
+    # Um worker que morre entre o commit e a publicação deixaria o arquivo para trás;
+    # de tempos em tempos as versões do banco são conferidas com as do arquivo.
+    _estado['sincronizado_em'] = time.monotonic()
+    do_banco = dict(db.session.query(VersaoCache.nome, VersaoCache.versao))
+    do_banco.pop(GLOBAL, None)
+    if any(versao > _estado['versoes'].get(tabela, 0) for tabela, versao in do_banco.items()):
+        _publicar(do_banco)
+
+
+def verificar():
+    """Esvazia os caches das tabelas alteradas por outros workers. Custa um stat por chamada."""
+    assinatura = _assinatura()
+    if assinatura != _estado['assinatura']:
+        _estado['assinatura'] = assinatura
+        _aplicar(_ler())
+    if time.monotonic() - _estado['sincronizado_em'] > current_app.config['CACHE_RESSINCRONIZAR']:
+        _ressincronizar()
+
+
+def _marcar(sessao, tabelas):
+    # Tabela sem cache registrado não ganha versão: check-ins, movimentos de estoque e o
+    # sinal de vida das tarefas gravam sem tocar em versao_cache nem no arquivo.
+    novas = set(tabelas) & _caches.keys()
+    if not novas:
+        return
+    pendentes = sessao.info.setdefault('versoes_cache', {})
+    novas -= pendentes.keys()
+    if not novas:
+        return
+    tabela = VersaoCache.__table__
+    versao = sessao.info.get('versao_cache')
+    if versao is None:
+        # Uma versão por transação, tirada do contador global: como o SQLite tem um escritor
+        # por vez, versões maiores são sempre de commits posteriores.
+        versao = sessao.execute(update(tabela).where(tabela.c.nome == GLOBAL)
+                                .values(versao=tabela.c.versao + 1).returning(tabela.c.versao)).scalar()
+        if versao is None:
+            versao = 1
+            sessao.execute(insert(tabela).values(nome=GLOBAL, versao=versao))
+        sessao.info['versao_cache'] = versao
+    comando = insert(tabela).values([{'nome': nome, 'versao': versao} for nome in sorted(novas)])
+    sessao.execute(comando.on_conflict_do_update(index_elements=['nome'], set_={'versao': comando.excluded.versao}))
+    pendentes.update(dict.fromkeys(novas, versao))
+
+
+@event.listens_for(db.session, 'before_flush')
+def _marcar_alteracoes(sessao, contexto, instancias):
+    objetos = chain(sessao.new, sessao.deleted, (objeto for objeto in sessao.dirty if sessao.is_modified(objeto)))
+    tabelas = {objeto.__table__.name for objeto in objetos}
+    if tabelas:
+        _marcar(sessao, tabelas)
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _marcar_comando(estado):
+    # Inserts, updates e deletes em lote (db.session.execute) não passam pelo flush.
+    if not (estado.is_insert or estado.is_update or estado.is_delete):
+        return
+    nome = getattr(getattr(estado.statement, 'table', None), 'name', None)
+    if nome and nome != VersaoCache.__tablename__:
+        _marcar(estado.session, [nome])
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publicar_versoes(sessao):
+    sessao.info.pop('versao_cache', None)
+    alteradas = sessao.info.pop('versoes_cache', None)
+    if alteradas:
+        _publicar(alteradas)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _descartar_versoes(sessao):
+    sessao.info.pop('versao_cache', None)
+    sessao.info.pop('versoes_cache', None)
+
+
+def versao(nome):
+    """Última versão de `nome` que este processo já aplicou (0 se nunca mudou)."""
+    return _estado['versoes'].get(nome, 0)
+
+
+def invalidar(*nomes):
+    """Versão nova para `nomes` (tabelas ou caches nomeados), em todos os workers. Faz commit."""
+    _marcar(db.session, nomes)
+    db.session.commit()
+
+
+def invalidar_tudo():
+    """Versão nova para todos os caches registrados, em todos os workers (ex.: depois de restaurar um backup).
+
+    O contador global pula para acima do que já foi publicado, porque o banco restaurado
+    pode ter versões menores que as do arquivo.
+    """
+    publicadas = _ler()
+    maior = max(max(publicadas.values(), default=0), db.session.query(func.max(VersaoCache.versao)).scalar() or 0)
+    comando = insert(VersaoCache.__table__).values(nome=GLOBAL, versao=maior)
+    db.session.execute(comando.on_conflict_do_update(index_elements=['nome'], set_={'versao': maior}))
+    # Versões já tiradas nesta transação vieram do contador antigo; todas saem do novo.
+    _descartar_versoes(db.session)
+    _marcar(db.session, list(_caches))
+    db.session.commit()
+
+
+def init_app(app):
+    app.config.setdefault('CACHE_RESSINCRONIZAR', 60)
+    # Uma aplicação nova (ex.: cada teste, com seu banco) começa sem nada em cache.
+    _estado.update(assinatura=None, versoes={}, sincronizado_em=0.0)
+    for memo in chain.from_iterable(_caches.values()):
+        memo.clear()
+    app.before_request(verificar)
@@ -0,0 +1,82 @@
+import os
+import time
+import hmac
+
+from flask import g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                               Histogram, generate_latest, multiprocess)
+
+# Com vários workers do gunicorn, o gunicorn.conf.py define PROMETHEUS_MULTIPROC_DIR
+# antes de importar a aplicação: cada processo grava seus valores em arquivos mmap
+# nesse diretório e o /metrics soma tudo na hora da coleta.
+MULTIPROCESSO = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+# Faixas em segundos pensadas para páginas renderizadas e gravações no SQLite.
+FAIXAS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LATENCIA = Histogram('fraternoamor_requisicao_duracao_segundos', 'Tempo de resposta por rota',
+                     ['endpoint', 'metodo'], buckets=FAIXAS_LATENCIA)
+REQUISICOES = Counter('fraternoamor_requisicoes', 'Requisições atendidas por rota e status',
+                      ['endpoint', 'metodo', 'status'])
+EM_ANDAMENTO = Gauge('fraternoamor_requisicoes_em_andamento', 'Requisições sendo atendidas agora',
+                     ['endpoint'], multiprocess_mode='livesum')
+
+# --- Eventos de negócio ---
+PEDIDOS = Counter('fraternoamor_pedidos', 'Pedidos registrados pela lanchonete')
+PEDIDOS_RECUSADOS = Counter('fraternoamor_pedidos_recusados', 'Pedidos recusados pelo controle de admissão',
+                            ['motivo'])
+LOGINS = Counter('fraternoamor_logins', 'Logins bem-sucedidos')
+LOGINS_FALHOS = Counter('fraternoamor_logins_falhos', 'Tentativas de login recusadas')
+
+
+def _endpoint():
+    # O nome do endpoint mantém a cardinalidade fixa; URLs inexistentes viram um rótulo só.
+    return request.endpoint or 'nao_encontrado'
+
+
+def _iniciar_requisicao():
+    g._metricas_inicio = time.perf_counter()
+    g._metricas_endpoint = _endpoint()
+    EM_ANDAMENTO.labels(g._metricas_endpoint).inc()
+
+
+def _registrar_resposta(response):
+    inicio = g.get('_metricas_inicio')
+    if inicio is not None:
+        endpoint = g._metricas_endpoint
+        LATENCIA.labels(endpoint, request.method).observe(time.perf_counter() - inicio)
+        REQUISICOES.labels(endpoint, request.method, str(response.status_code)).inc()
+    return response
+
+
+def _finalizar_requisicao(exc):
+    endpoint = g.pop('_metricas_endpoint', None)
+    if endpoint is not None:
+        EM_ANDAMENTO.labels(endpoint).dec()
+
+
+def autorizado(usuario):
+    """Aceita o token de METRICAS_TOKEN (para o coletor) ou, sem token configurado, um admin logado."""
+    token = os.environ.get('METRICAS_TOKEN')
+    if token:
+        enviado = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        # Em bytes: com str, compare_digest levanta TypeError se o cabeçalho tiver caractere não ASCII.
+        return hmac.compare_digest(enviado.encode(), token.encode())
+    return usuario.is_authenticated and usuario.is_admin
+
+
+def gerar_metricas():
+    """Retorna o corpo e o content-type no formato texto do Prometheus."""
+    if MULTIPROCESSO:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def init_app(app):
+    """Registra os hooks que alimentam as métricas de cada requisição."""
+    app.before_request(_iniciar_requisicao)
+    app.after_request(_registrar_resposta)
+    app.teardown_request(_finalizar_requisicao)
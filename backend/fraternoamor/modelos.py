@@ -0,0 +1,238 @@
+import datetime
+from flask_login import UserMixin
+
+from .extensoes import db, login_manager
+from .videos import url_embed
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return Usuario.query.get(int(user_id))
+
+user_category_association = db.Table('user_category',
+    db.Column('usuario_id', db.Integer, db.ForeignKey('usuario.id'), primary_key=True),
+    db.Column('categoria_usuario_id', db.Integer, db.ForeignKey('categoria_usuario.id'), primary_key=True)
+)
+
+class CategoriaUsuario(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False)
+    nivel = db.Column(db.Integer, nullable=False, default=0) # Nível hierárquico
+    usuarios = db.relationship('Usuario', secondary=user_category_association, back_populates='categorias')
+
+class Usuario(db.Model, UserMixin):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(100), unique=True, nullable=False)
+    password_hash = db.Column(db.String(60), nullable=False)
+    is_admin = db.Column(db.Boolean, nullable=False, default=False, server_default='False')
+    categorias = db.relationship('CategoriaUsuario', secondary=user_category_association, back_populates='usuarios')
+
+class Produto(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False)
+    categoria = db.Column(db.String(50), nullable=False)
+    preco_centavos = db.Column(db.Integer, nullable=False)  # valores em centavos (veja dinheiro.py)
+    imagem_url = db.Column(db.String(200), nullable=True)
+    # Versão do catálogo em que o produto mudou pela última vez (veja catalogo.py).
+    versao = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+
+# O estoque não fica no produto: é a soma dos movimentos, lida por estoque.saldos().
+class MovimentoEstoque(db.Model):
+    # Livro só de acréscimos: toda entrada ou saída de um produto vira uma linha, nunca alterada.
+    __table_args__ = (
+        # Movimentos de um produto, em ordem (e os posteriores a uma foto do saldo).
+        db.Index('ix_movimento_estoque_produto', 'produto_id', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    # Sem chaves estrangeiras: o histórico continua valendo depois que o produto ou o pedido somem.
+    produto_id = db.Column(db.Integer, nullable=False)
+    quantidade = db.Column(db.Integer, nullable=False)  # positiva entra, negativa sai
+    motivo = db.Column(db.String(20), nullable=False)
+    pedido_id = db.Column(db.Integer, nullable=True)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow, index=True)
+
+class SaldoEstoque(db.Model):
+    # Foto do estoque de um produto somando todos os movimentos até movimento_id (veja estoque.compactar).
+    produto_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    movimento_id = db.Column(db.Integer, primary_key=True, autoincrement=False, index=True)
+    estoque = db.Column(db.Integer, nullable=False)
+
+class VersaoCatalogo(db.Model):
+    # Linha única com o contador de versões do catálogo da lanchonete.
+    id = db.Column(db.Integer, primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+
+class VersaoCache(db.Model):
+    # Versão de cada tabela para os caches em memória dos workers (veja invalidacao.py).
+    # A linha '*' guarda o contador global de onde as versões saem.
+    nome = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False)
+
+class Configuracao(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    chave = db.Column(db.String(50), unique=True, nullable=False)
+    valor = db.Column(db.Text, nullable=True)
+
+class Cliente(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False)
+    contato = db.Column(db.String(50), nullable=True)
+
+class Pedido(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    cliente_id = db.Column(db.Integer, db.ForeignKey('cliente.id'), nullable=False)
+    data_pedido = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    valor_total_centavos = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='Recebido')
+    # Gerada no navegador a cada envio: o reenvio da fila offline não duplica o pedido.
+    chave_idempotencia = db.Column(db.String(64), nullable=True, unique=True, index=True)
+    itens = db.relationship('ItemPedido', backref='pedido', lazy=True, cascade="all, delete-orphan")
+    cliente = db.relationship('Cliente', backref='pedidos')
+
+    __table_args__ = (
+        # Seleção dos pedidos a arquivar: concluídos e mais antigos que a retenção.
+        db.Index('ix_pedido_status_data', 'status', 'data_pedido'),
+    )
+
+class ItemPedido(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedido.id'), nullable=False)
+    produto_id = db.Column(db.Integer, db.ForeignKey('produto.id'), nullable=False)
+    quantidade = db.Column(db.Integer, nullable=False)
+    preco_unitario_centavos = db.Column(db.Integer, nullable=False)
+    produto = db.relationship('Produto')
+
+# Pedidos concluídos antigos saem das tabelas acima para estas (veja arquivamento.py).
+# O pedido mantém o id original; os itens ganham ids novos.
+class PedidoArquivado(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    cliente_id = db.Column(db.Integer, db.ForeignKey('cliente.id'), nullable=False)
+    data_pedido = db.Column(db.DateTime, nullable=False, index=True)
+    valor_total_centavos = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    arquivado_em = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    itens = db.relationship('ItemPedidoArquivado', backref='pedido', lazy=True, cascade="all, delete-orphan")
+    cliente = db.relationship('Cliente')
+
+class ItemPedidoArquivado(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedido_arquivado.id'), nullable=False, index=True)
+    # Sem chave estrangeira: o histórico continua valendo depois que o produto é excluído.
+    produto_id = db.Column(db.Integer, nullable=False)
+    quantidade = db.Column(db.Integer, nullable=False)
+    preco_unitario_centavos = db.Column(db.Integer, nullable=False)
+
+class CategoriaCurso(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), unique=True, nullable=False)
+    cursos = db.relationship('Curso', backref='categoria', lazy=True)
+
+class Curso(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(100), nullable=False)
+    link_video = db.Column(db.String(200), nullable=False)
+    imagem_thumbnail = db.Column(db.String(200), nullable=True)
+    categoria_id = db.Column(db.Integer, db.ForeignKey('categoria_curso.id'), nullable=False)
+    arquivo_anexo = db.Column(db.String(200), nullable=True)
+    descricao = db.Column(db.Text, nullable=True)
+    categoria_permissao_id = db.Column(db.Integer, db.ForeignKey('categoria_usuario.id'), nullable=True)
+    # Extraídos de link_video ao salvar (fraternoamor.videos), para não reprocessar o link a cada visualização.
+    video_provedor = db.Column(db.String(20), nullable=True)
+    video_id = db.Column(db.String(50), nullable=True)
+    video_poster = db.Column(db.String(200), nullable=True)
+    progressos = db.relationship('ProgressoCurso', lazy=True, cascade="all, delete-orphan")
+
+    @property
+    def embed_url(self):
+        return url_embed(self.video_provedor, self.video_id)
+
+class ProgressoCurso(db.Model):
+    # Uma linha por membro e curso, gravada em lote por fraternoamor.progresso.
+    # A chave começa por curso_id para o resumo por curso ler só o índice primário.
+    curso_id = db.Column(db.Integer, db.ForeignKey('curso.id'), primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), primary_key=True)
+    posicao = db.Column(db.Integer, nullable=False, default=0)
+    duracao = db.Column(db.Integer, nullable=False, default=0)
+    percentual = db.Column(db.SmallInteger, nullable=False, default=0)  # maior percentual já assistido
+    concluido_em = db.Column(db.DateTime, nullable=True)
+    atualizado_em = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+class Aviso(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    mensagem = db.Column(db.Text, nullable=False)
+    data_criacao = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    # Chave estrangeira para a categoria de usuário. Pode ser nulo (aviso geral).
+    categoria_permissao_id = db.Column(db.Integer, db.ForeignKey('categoria_usuario.id'), nullable=True)
+    categoria_permissao = db.relationship('CategoriaUsuario')
+
+class Reuniao(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(200), nullable=False)
+    data_reuniao = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    sala_jitsi = db.Column(db.String(100), unique=True, nullable=False)
+    presencas = db.relationship('Presenca', backref='reuniao', lazy=True, cascade="all, delete-orphan")
+    resumos_categoria = db.relationship('ResumoPresencaCategoria', lazy=True, cascade="all, delete-orphan")
+
+class Presenca(db.Model):
+    # O índice único impede presença duplicada e, começando por reuniao_id, atende a lista de presença.
+    __table_args__ = (
+        db.Index('ix_presenca_reuniao_usuario', 'reuniao_id', 'usuario_id', unique=True),
+        db.Index('ix_presenca_usuario_id', 'usuario_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    reuniao_id = db.Column(db.Integer, db.ForeignKey('reuniao.id'), nullable=False)
+    data_presenca = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    usuario = db.relationship('Usuario')
+
+# --- Agregados de frequência, mantidos por fraternoamor.frequencia ---
+class ResumoPresencaMembro(db.Model):
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), primary_key=True)
+    total_presencas = db.Column(db.Integer, nullable=False, default=0)
+    ultima_reuniao_data = db.Column(db.DateTime, nullable=True, index=True)
+
+class ResumoPresencaCategoria(db.Model):
+    # Uma linha por reunião e categoria; "membros" é o tamanho da categoria quando a reunião foi registrada.
+    reuniao_id = db.Column(db.Integer, db.ForeignKey('reuniao.id'), primary_key=True)
+    categoria_id = db.Column(db.Integer, db.ForeignKey('categoria_usuario.id'), primary_key=True)
+    data_reuniao = db.Column(db.DateTime, nullable=False, index=True)
+    presentes = db.Column(db.Integer, nullable=False, default=0)
+    membros = db.Column(db.Integer, nullable=False, default=0)
+
+class CategoriaMaterial(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), unique=True, nullable=False)
+    materiais = db.relationship('MaterialDigital', backref='categoria', lazy=True)
+
+class MaterialDigital(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(100), nullable=False)
+    descricao = db.Column(db.Text, nullable=True)
+    imagem_capa = db.Column(db.String(200), nullable=True) # Arquivo da imagem de capa
+    arquivo_pdf = db.Column(db.String(200), nullable=False) # O arquivo do livro/material
+    categoria_id = db.Column(db.Integer, db.ForeignKey('categoria_material.id'), nullable=False)
+    categoria_permissao_id = db.Column(db.Integer, db.ForeignKey('categoria_usuario.id'), nullable=True)
+
+class Tarefa(db.Model):
+    # Fila de tarefas em segundo plano, executadas pelo `flask trabalhar-tarefas` (veja tarefas.py).
+    __table_args__ = (
+        # A próxima tarefa pendente da fila.
+        db.Index('ix_tarefa_fila', 'status', 'executar_em'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    parametros = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    status = db.Column(db.String(20), nullable=False, default='pendente')
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    max_tentativas = db.Column(db.Integer, nullable=False, default=3)
+    progresso = db.Column(db.SmallInteger, nullable=False, default=0)  # percentual
+    mensagem = db.Column(db.String(200), nullable=True)
+    erro = db.Column(db.Text, nullable=True)
+    arquivo_resultado = db.Column(db.String(200), nullable=True)
+    trabalhador = db.Column(db.String(50), nullable=True)
+    usuario_id = db.Column(db.Integer, nullable=True)
+    criada_em = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    executar_em = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    # Atualizada a cada progresso: tarefa "executando" parada há muito tempo é de um trabalhador que morreu.
+    atualizada_em = db.Column(db.DateTime, nullable=True)
+    concluida_em = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,271 @@
+import os
+import sys
+import json
+import time
+import random
+import threading
+import tracemalloc
+import datetime
+from collections import Counter
+
+from flask import current_app, g, request
+from itsdangerous import BadSignature, TimestampSigner
+
+# Intervalo entre amostras da pilha e validade do cabeçalho assinado.
+INTERVALO_AMOSTRA = 0.005
+VALIDADE_CABECALHO = 3600
+CABECALHO = 'X-Perfil'
+MAX_PERFIS_GUARDADOS = 200
+
+
+# --- 1. AMOSTRADOR DE PILHA ---
+class Amostrador:
+    """Tira fotos periódicas da pilha das threads marcadas, numa thread à parte.
+
+    O custo para a requisição perfilada é só o de ceder o GIL a cada amostra;
+    as demais requisições não pagam nada, ao contrário do cProfile.
+    """
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRA):
+        self.intervalo = intervalo
+        self._alvos = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def iniciar(self, thread_id):
+        with self._lock:
+            self._alvos[thread_id] = Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name='amostrador-perfil', daemon=True)
+                self._thread.start()
+
+    def parar(self, thread_id):
+        with self._lock:
+            return self._alvos.pop(thread_id, Counter())
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                if not self._alvos:
+                    self._thread = None
+                    return
+                quadros = sys._current_frames()
+                for thread_id, pilhas in self._alvos.items():
+                    quadro = quadros.get(thread_id)
+                    if quadro is not None:
+                        pilhas[_pilha_compactada(quadro)] += 1
+            time.sleep(self.intervalo)
+
+
+def _pilha_compactada(quadro):
+    """Converte um frame no formato 'raiz;...;folha' usado pelos flame graphs."""
+    partes = []
+    while quadro is not None:
+        codigo = quadro.f_code
+        partes.append(f'{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})')
+        quadro = quadro.f_back
+    return ';'.join(reversed(partes))
+
+
+_amostrador = Amostrador()
+
+
+# --- 2. MODO DE PERFILAMENTO (compartilhado entre workers por arquivo) ---
+def _pasta():
+    pasta = current_app.config['PERFIS_FOLDER']
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def _arquivo_modo():
+    return os.path.join(_pasta(), 'modo.json')
+
+
+_cache_modo = {'mtime': None, 'modo': None}
+
+
+def modo_atual():
+    """Lê o modo ativo (fração e validade), relendo o arquivo só quando ele muda."""
+    try:
+        mtime = os.stat(_arquivo_modo()).st_mtime
+    except FileNotFoundError:
+        return None
+    if mtime != _cache_modo['mtime']:
+        with open(_arquivo_modo(), encoding='utf-8') as f:
+            _cache_modo['modo'] = json.load(f)
+        _cache_modo['mtime'] = mtime
+    modo = _cache_modo['modo']
+    if not modo or modo['ate'] < time.time():
+        return None
+    return modo
+
+
+def ativar_modo(fracao, minutos):
+    modo = {'fracao': max(0.0, min(1.0, fracao)), 'ate': time.time() + minutos * 60}
+    with open(_arquivo_modo(), 'w', encoding='utf-8') as f:
+        json.dump(modo, f)
+    return modo
+
+
+def desativar_modo():
+    try:
+        os.remove(_arquivo_modo())
+    except FileNotFoundError:
+        pass
+
+
+def gerar_token():
+    """Token para o cabeçalho X-Perfil, que força o perfilamento de uma requisição específica."""
+    return TimestampSigner(current_app.config['SECRET_KEY'], salt='perfil').sign('perfil').decode()
+
+
+def _cabecalho_valido():
+    token = request.headers.get(CABECALHO)
+    if not token:
+        return False
+    try:
+        TimestampSigner(current_app.config['SECRET_KEY'], salt='perfil').unsign(token, max_age=VALIDADE_CABECALHO)
+        return True
+    except BadSignature:
+        return False
+
+
+# --- 3. HOOKS DA REQUISIÇÃO ---
+def _iniciar_requisicao():
+    if request.path.startswith('/static/'):
+        return
+    modo = modo_atual()
+    sorteado = modo is not None and random.random() < modo['fracao']
+    if sorteado or _cabecalho_valido():
+        g._perfil_inicio = time.perf_counter()
+        _amostrador.iniciar(threading.get_ident())
+
+
+def _finalizar_requisicao(exc):
+    inicio = g.pop('_perfil_inicio', None)
+    if inicio is None:
+        return
+    pilhas = _amostrador.parar(threading.get_ident())
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    if pilhas:
+        _salvar_perfil(request.endpoint or 'nao_encontrado', duracao_ms, pilhas)
+
+
+def _salvar_perfil(endpoint, duracao_ms, pilhas):
+    momento = datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')
+    nome = f'{momento}_{endpoint}_{int(duracao_ms)}ms_{os.getpid()}.folded'
+    with open(os.path.join(_pasta(), nome), 'w', encoding='utf-8') as f:
+        for pilha, amostras in pilhas.most_common():
+            f.write(f'{pilha} {amostras}\n')
+    _rotacionar()
+
+
+def _rotacionar():
+    perfis = sorted(n for n in os.listdir(_pasta()) if n.endswith('.folded'))
+    for nome in perfis[:-MAX_PERFIS_GUARDADOS]:
+        os.remove(os.path.join(_pasta(), nome))
+
+
+# --- 4. LEITURA DOS PERFIS ---
+def listar_perfis():
+    perfis = []
+    for nome in sorted(os.listdir(_pasta()), reverse=True):
+        if not nome.endswith('.folded'):
+            continue
+        momento, resto = nome[:-len('.folded')].split('_', 1)
+        endpoint, duracao, pid = resto.rsplit('_', 2)
+        perfis.append({'nome': nome, 'endpoint': endpoint, 'duracao': duracao, 'pid': pid,
+                       'data': datetime.datetime.strptime(momento, '%Y%m%d%H%M%S%f')})
+    return perfis
+
+
+def carregar_perfil(nome):
+    """Lê um perfil salvo e devolve as pilhas no formato {pilha: amostras}."""
+    caminho = os.path.join(_pasta(), os.path.basename(nome))
+    pilhas = Counter()
+    with open(caminho, encoding='utf-8') as f:
+        for linha in f:
+            pilha, _, amostras = linha.rstrip('\n').rpartition(' ')
+            pilhas[pilha] += int(amostras)
+    return pilhas
+
+
+def resumo_funcoes(pilhas, limite=25):
+    """Top-N funções por amostras próprias (no topo da pilha) e totais (em qualquer ponto)."""
+    proprias, totais = Counter(), Counter()
+    for pilha, amostras in pilhas.items():
+        funcoes = pilha.split(';')
+        proprias[funcoes[-1]] += amostras
+        for funcao in set(funcoes):
+            totais[funcao] += amostras
+    total = sum(pilhas.values()) or 1
+    return [{'funcao': funcao, 'proprias': proprias[funcao], 'totais': amostras,
+             'percentual': amostras * 100 / total}
+            for funcao, amostras in totais.most_common(limite)]
+
+
+def arvore_flame_graph(pilhas, minimo_percentual=0.5):
+    """Monta a árvore usada pelo template para desenhar o flame graph em HTML."""
+    raiz = {'nome': 'total', 'amostras': 0, 'filhos': {}}
+    for pilha, amostras in pilhas.items():
+        raiz['amostras'] += amostras
+        no = raiz
+        for funcao in pilha.split(';'):
+            no = no['filhos'].setdefault(funcao, {'nome': funcao, 'amostras': 0, 'filhos': {}})
+            no['amostras'] += amostras
+    total = raiz['amostras'] or 1
+
+    def converter(no, amostras_pai):
+        filhos = [converter(filho, no['amostras']) for filho in no['filhos'].values()
+                  if filho['amostras'] * 100 / total >= minimo_percentual]
+        return {'nome': no['nome'], 'amostras': no['amostras'],
+                'percentual': no['amostras'] * 100 / total,
+                'largura': no['amostras'] * 100 / (amostras_pai or 1),
+                'filhos': sorted(filhos, key=lambda f: f['amostras'], reverse=True)}
+
+    return converter(raiz, raiz['amostras'])
+
+
+# --- 5. SNAPSHOTS DE MEMÓRIA (tracemalloc, por worker) ---
+_snapshots = []
+
+
+def estado_memoria():
+    return {'ativo': tracemalloc.is_tracing(), 'pid': os.getpid(), 'snapshots': len(_snapshots),
+            'memoria_rastreada': tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None}
+
+
+def iniciar_memoria(quadros=10):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(quadros)
+    _snapshots.clear()
+
+
+def parar_memoria():
+    tracemalloc.stop()
+    _snapshots.clear()
+
+
+def tirar_snapshot(limite=25):
+    """Tira um snapshot e compara com o anterior deste worker (ou lista o maior consumo, se for o primeiro)."""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    anterior = _snapshots[-1] if _snapshots else None
+    _snapshots.append(snapshot)
+    del _snapshots[:-2]
+    if anterior is None:
+        estatisticas = snapshot.statistics('traceback')[:limite]
+        return [{'local': str(e.traceback[0]), 'tamanho': e.size, 'diferenca': None, 'blocos': e.count,
+                 'pilha': e.traceback.format()} for e in estatisticas]
+    estatisticas = snapshot.compare_to(anterior, 'traceback')[:limite]
+    return [{'local': str(e.traceback[0]), 'tamanho': e.size, 'diferenca': e.size_diff, 'blocos': e.count,
+             'pilha': e.traceback.format()} for e in estatisticas]
+
+
+def init_app(app):
+    """Registra os hooks que ligam o amostrador nas requisições sorteadas ou assinadas."""
+    app.config.setdefault('PERFIS_FOLDER', os.path.join(app.instance_path, 'perfis'))
+    app.before_request(_iniciar_requisicao)
+    app.teardown_request(_finalizar_requisicao)
@@ -0,0 +1,83 @@
+import gzip
+import os
+
+from flask import current_app, url_for
+
+# Páginas públicas que não dependem de quem está acessando. Cada uma vira um HTML
+# em PAGINAS_ESTATICAS_FOLDER, no caminho da própria URL (/historia -> historia/index.html),
+# para o proxy da frente servir sem passar pelo gunicorn. Exemplo para o nginx:
+#
+#     location / {
+#         root /caminho/para/backend/paginas_estaticas;
+#         gzip_static on;
+#         try_files $uri/index.html @flask;
+#     }
+#
+# Sem o arquivo (ou com cookie de sessão, se o proxy for configurado assim), a requisição
+# cai na rota dinâmica de sempre.
+PAGINAS = ['publico.home', 'publico.historia', 'publico.identidade', 'publico.contato',
+           'publico.itinerario', 'publico.projetos']
+
+# Chave de Configuracao -> páginas que exibem esse valor.
+DEPENDENCIAS = {
+    'itinerario': ['publico.itinerario'],
+    'projets': ['publico.projetos'],
+}
+
+
+def _caminho_arquivo(pasta, caminho_url):
+    return os.path.join(pasta, caminho_url.strip('/'), 'index.html')
+
+
+def _gravar(caminho, conteudo):
+    # Escreve num temporário e troca de uma vez: o proxy nunca lê um arquivo pela metade.
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    for destino, dados in ((caminho, conteudo), (caminho + '.gz', gzip.compress(conteudo, mtime=0))):
+        temporario = f'{destino}.{os.getpid()}.tmp'
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(dados)
+        os.replace(temporario, destino)
+
+
+def renderizar(endpoints=None):
+    """Gera os HTML das páginas indicadas (todas, por padrão). Retorna os caminhos gravados.
+
+    A página é obtida por uma requisição anônima interna, passando pelo mesmo caminho
+    de um visitante: o arquivo é exatamente o que a rota dinâmica devolveria.
+    """
+    app = current_app._get_current_object()
+    pasta = app.config['PAGINAS_ESTATICAS_FOLDER']
+    cliente = app.test_client(use_cookies=False)
+    gravados = []
+    for endpoint in endpoints or PAGINAS:
+        # Contexto de aplicação próprio: chamada de dentro de uma rota do admin, a requisição
+        # interna não pode compartilhar o `g` nem a sessão do banco da requisição externa.
+        with app.app_context():
+            with app.test_request_context():
+                caminho_url = url_for(endpoint)
+            resposta = cliente.get(caminho_url, headers={'Accept-Encoding': 'identity'})
+        if resposta.status_code != 200:
+            app.logger.warning('Pré-renderização de %s falhou com status %s.', caminho_url, resposta.status_code)
+            continue
+        destino = _caminho_arquivo(pasta, caminho_url)
+        _gravar(destino, resposta.get_data())
+        gravados.append(destino)
+    return gravados
+
+
+def atualizar_por_chave(chave):
+    """Refaz as páginas que exibem a Configuracao `chave`, se houver alguma pré-renderizada."""
+    paginas = DEPENDENCIAS.get(chave)
+    # Só reescreve se as páginas já foram geradas alguma vez (`flask prerenderizar-paginas`).
+    if not paginas or not os.path.isdir(current_app.config['PAGINAS_ESTATICAS_FOLDER']):
+        return []
+    try:
+        return renderizar(paginas)
+    except OSError:
+        # Falhar aqui não pode desfazer o que o admin acabou de salvar.
+        current_app.logger.exception('Não foi possível pré-renderizar %s.', ', '.join(paginas))
+        return []
+
+
+def init_app(app):
+    app.config.setdefault('PAGINAS_ESTATICAS_FOLDER', os.path.join(app.root_path, 'paginas_estaticas'))
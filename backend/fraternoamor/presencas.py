@@ -0,0 +1,60 @@
+import atexit
+import datetime
+
+from sqlalchemy.dialects.sqlite import insert
+
+from . import frequencia
+from .buffers import BufferEmLote
+from .extensoes import db
+from .modelos import Presenca
+
+# Intervalo máximo entre gravações e tamanho de lote que força uma gravação imediata.
+INTERVALO_GRAVACAO = 0.5
+LOTE_MAXIMO = 200
+
+# Janela de check-in, em torno do horário (local) da reunião: abre um pouco antes do início
+# e fecha quando a reunião termina. Fora dela o check-in é recusado.
+ANTECEDENCIA_CHECKIN = datetime.timedelta(minutes=15)
+DURACAO_REUNIAO = datetime.timedelta(hours=3)
+
+
+def aceita_checkin(reuniao, agora=None):
+    agora = agora or datetime.datetime.now()
+    return reuniao.data_reuniao - ANTECEDENCIA_CHECKIN <= agora <= reuniao.data_reuniao + DURACAO_REUNIAO
+
+
+class BufferPresencas(BufferEmLote):
+    """Acumula check-ins e grava em lote num único INSERT ... ON CONFLICT DO NOTHING.
+
+    Quando uma reunião começa, todos os membros fazem check-in no mesmo minuto. Gravar
+    cada um numa transação própria enfileiraria os workers no lock de escrita do SQLite;
+    aqui cada worker faz no máximo uma gravação por intervalo. O índice único
+    (reuniao_id, usuario_id) torna o check-in idempotente, mesmo entre workers.
+    """
+
+    nome = 'buffer-presencas'
+
+    def __init__(self, intervalo=INTERVALO_GRAVACAO, lote_maximo=LOTE_MAXIMO):
+        super().__init__(intervalo, lote_maximo)
+
+    def combinar(self, antigo, novo):
+        # A primeira marcação vale: repetir o check-in não muda o horário registrado.
+        return antigo
+
+    def registrar(self, usuario_id, reuniao_id):
+        self.adicionar((usuario_id, reuniao_id), datetime.datetime.utcnow())
+
+    def gravar_lote(self, lote):
+        linhas = [{'usuario_id': usuario_id, 'reuniao_id': reuniao_id, 'data_presenca': momento}
+                  for (usuario_id, reuniao_id), momento in lote.items()]
+        instrucao = insert(Presenca).on_conflict_do_nothing(index_elements=['reuniao_id', 'usuario_id'])\
+            .returning(Presenca.usuario_id, Presenca.reuniao_id)
+        # Só as linhas realmente inseridas voltam no RETURNING: repetidas não contam duas vezes.
+        novas = db.session.execute(instrucao, linhas).all()
+        # Quem entra antes do início já conta a reunião como a última em que esteve.
+        frequencia.acumular(novas, ate=datetime.datetime.now() + ANTECEDENCIA_CHECKIN)
+        db.session.commit()
+
+
+buffer_presencas = BufferPresencas()
+atexit.register(buffer_presencas.gravar)
@@ -0,0 +1,95 @@
+import atexit
+import datetime
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects.sqlite import insert
+
+from .buffers import BufferEmLote
+from .extensoes import db
+from .modelos import Curso, ProgressoCurso
+
+# O player manda um heartbeat a cada ~15 s; no banco entra no máximo uma linha por
+# (membro, curso) a cada INTERVALO_GRAVACAO segundos.
+INTERVALO_GRAVACAO = 30
+LOTE_MAXIMO = 500
+# Percentual assistido a partir do qual o curso conta como concluído.
+LIMITE_CONCLUSAO = 90
+
+
+class BufferProgresso(BufferEmLote):
+    """Funde os heartbeats de cada (membro, curso) e grava só o estado mais recente."""
+
+    nome = 'buffer-progresso'
+
+    def __init__(self, intervalo=INTERVALO_GRAVACAO, lote_maximo=LOTE_MAXIMO):
+        super().__init__(intervalo, lote_maximo)
+
+    def combinar(self, antigo, novo):
+        return {
+            'posicao': novo['posicao'],
+            'duracao': novo['duracao'] or antigo['duracao'],
+            'percentual': max(antigo['percentual'], novo['percentual']),
+            'concluido_em': antigo['concluido_em'] or novo['concluido_em'],
+            'atualizado_em': novo['atualizado_em'],
+        }
+
+    def registrar(self, usuario_id, curso_id, posicao, duracao):
+        agora = datetime.datetime.utcnow()
+        percentual = min(100, int(posicao * 100 / duracao)) if duracao else 0
+        self.adicionar((usuario_id, curso_id), {
+            'posicao': int(posicao),
+            'duracao': int(duracao),
+            'percentual': percentual,
+            'concluido_em': agora if percentual >= LIMITE_CONCLUSAO else None,
+            'atualizado_em': agora,
+        })
+
+    def gravar_lote(self, lote):
+        instrucao = insert(ProgressoCurso)
+        tabela = ProgressoCurso.__table__.c
+        novo = instrucao.excluded
+        db.session.execute(
+            instrucao.on_conflict_do_update(
+                index_elements=['curso_id', 'usuario_id'],
+                set_={
+                    'posicao': novo.posicao,
+                    'duracao': novo.duracao,
+                    'percentual': case((tabela.percentual > novo.percentual, tabela.percentual), else_=novo.percentual),
+                    'concluido_em': func.coalesce(tabela.concluido_em, novo.concluido_em),
+                    'atualizado_em': novo.atualizado_em,
+                }),
+            [dict(valores, usuario_id=usuario_id, curso_id=curso_id)
+             for (usuario_id, curso_id), valores in lote.items()]
+        )
+        db.session.commit()
+
+
+buffer_progresso = BufferProgresso()
+atexit.register(buffer_progresso.gravar)
+
+
+def progresso_do_membro(usuario_id, curso_id):
+    """Estado mais recente do membro no curso, incluindo o que ainda está no buffer deste worker."""
+    pendente = buffer_progresso.pendente((usuario_id, curso_id))
+    if pendente:
+        return pendente
+    progresso = db.session.get(ProgressoCurso, (curso_id, usuario_id))
+    if progresso:
+        return {'posicao': progresso.posicao, 'duracao': progresso.duracao,
+                'percentual': progresso.percentual, 'concluido_em': progresso.concluido_em}
+    return None
+
+
+def resumo_por_curso():
+    """Para cada curso: quantos membros começaram, quantos concluíram e o percentual médio assistido."""
+    linhas = db.session.query(
+        Curso,
+        func.count(ProgressoCurso.usuario_id),
+        func.count(ProgressoCurso.concluido_em),
+        func.avg(ProgressoCurso.percentual),
+    ).outerjoin(ProgressoCurso, ProgressoCurso.curso_id == Curso.id)\
+        .group_by(Curso.id).order_by(Curso.titulo).all()
+    return [{'curso': curso, 'iniciaram': iniciaram, 'concluiram': concluiram,
+             'taxa_conclusao': (concluiram / iniciaram * 100) if iniciaram else 0.0,
+             'media_percentual': media or 0.0}
+            for curso, iniciaram, concluiram, media in linhas]
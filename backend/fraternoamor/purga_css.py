@@ -0,0 +1,328 @@
+import gzip
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+# Classes que nenhum template nem JS escreve por extenso e que a análise não tem como
+# descobrir (ex.: nomes montados por concatenação em JavaScript). Tudo o que o
+# scripts.js põe via classList ou em strings com class="..." já é detectado sozinho.
+SAFELIST = {
+    # Modificadores do .action-button, que mudam com o status do pedido (admin/_linhas.html).
+    'edit', 'available', 'complete', 'delete',
+    # status-badge status-{{ pedido.status.lower().replace(' ', '-') }} (admin/_linhas.html).
+    'status-recebido', 'status-em-produção', 'status-disponível-para-retirada', 'status-concluído',
+    # Categorias do flash e do X-Categoria das ações em lote (static/js/admin_lote.js).
+    'alert-success', 'alert-danger', 'alert-info',
+    # Escolhidas num ternário em scripts.js, fora do alcance de classes_de_js.
+    'stock-available', 'stock-unavailable',
+}
+# Prefixos sempre mantidos, além dos detectados em classes dinâmicas como `alert-{{ category }}`.
+PREFIXOS_SAFELIST = {'alert-', 'status-'}
+
+_JINJA_EXPRESSAO = re.compile(r'\{\{.*?\}\}', re.S)
+_JINJA_BLOCO = re.compile(r'\{%.*?%\}|\{#.*?#\}', re.S)
+_LITERAL = re.compile(r'''(['"])(.*?)\1''', re.S)
+_NOME_CLASSE = re.compile(r'^-?[^\W\d][\w-]*$')
+
+_CLASSLIST_JS = re.compile(r'classList\.(?:add|remove|toggle|replace|contains)\(([^)]*)\)')
+_CLASS_EM_STRING_JS = re.compile(r'''class(?:Name)?\s*=\s*\\?(["'`])(.*?)\\?\1''')
+
+_COMENTARIO_CSS = re.compile(r'/\*.*?\*/', re.S)
+_AGRUPADOR_CSS = re.compile(r'@(?:-\w+-)?(?:media|supports|layer|container|document|keyframes|scope)\b')
+_KEYFRAMES_CSS = re.compile(r'@(?:-\w+-)?keyframes\s+(\S+)')
+_CLASSE_CSS = re.compile(r'\.(-?[^\W\d][\w-]*)')
+_IGNORAR_NO_SELETOR = re.compile(r':not\([^)]*\)|\[[^\]]*\]')
+
+
+def _tokens_de_classe(texto):
+    return {token for token in texto.split() if _NOME_CLASSE.match(token)}
+
+
+def _classes_do_atributo(valor):
+    """Classes e prefixos de um atributo class com Jinja.
+
+    `alert alert-{{ category }}` dá a classe `alert` e o prefixo `alert-`; strings literais
+    dentro de `{{ }}`/`{% %}` e o texto entre blocos `{% if %}` contam como classes.
+    """
+    classes, prefixos = set(), set()
+    for trecho in _JINJA_EXPRESSAO.findall(valor) + _JINJA_BLOCO.findall(valor):
+        for literal in _LITERAL.findall(trecho):
+            classes |= _tokens_de_classe(literal[1])
+    # Um bloco {% %} separa classes; uma expressão {{ }} completa a classe em que está colada.
+    texto = _JINJA_EXPRESSAO.sub('\0', _JINJA_BLOCO.sub(' ', valor))
+    for token in texto.split():
+        if '\0' not in token:
+            classes |= _tokens_de_classe(token)
+        elif not token.startswith('\0'):
+            prefixos.add(token.split('\0', 1)[0])
+    return classes, prefixos
+
+
+def classes_de_js(codigo):
+    """Classes que um trecho de JavaScript liga ou desliga nos elementos."""
+    classes = set()
+    for argumentos in _CLASSLIST_JS.findall(codigo):
+        for literal in _LITERAL.findall(argumentos):
+            classes |= _tokens_de_classe(literal[1])
+    for _, valor in _CLASS_EM_STRING_JS.findall(codigo):
+        classes |= _tokens_de_classe(re.sub(r'\$\{.*?\}', ' ', valor))
+    return classes
+
+
+def extrair_classes_template(caminho):
+    """Classes e prefixos dinâmicos usados num template: atributos class e scripts embutidos."""
+    with open(caminho, encoding='utf-8') as arquivo:
+        # Sem multi_valued_attributes o atributo chega inteiro, com o Jinja intacto.
+        soup = BeautifulSoup(arquivo, 'html.parser', multi_valued_attributes=None)
+    classes, prefixos = set(), set()
+    for tag in soup.find_all(True, class_=True):
+        novas, novos_prefixos = _classes_do_atributo(tag['class'])
+        classes |= novas
+        prefixos |= novos_prefixos
+    for script in soup.find_all('script'):
+        classes |= classes_de_js(script.get_text())
+    return sorted(classes), sorted(prefixos)
+
+
+def _carregar_cache(arquivo_cache):
+    if not arquivo_cache:
+        return {}
+    try:
+        with open(arquivo_cache) as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _gravar_cache(arquivo_cache, cache):
+    os.makedirs(os.path.dirname(arquivo_cache), exist_ok=True)
+    temporario = f'{arquivo_cache}.{os.getpid()}.tmp'
+    with open(temporario, 'w') as arquivo:
+        json.dump(cache, arquivo)
+    os.replace(temporario, arquivo_cache)
+
+
+def classes_por_template(pasta_templates, arquivo_cache=None, processos=None):
+    """{caminho relativo: (classes, prefixos)} de todos os .html da pasta.
+
+    Só os templates alterados desde a última execução (mtime diferente do guardado em
+    `arquivo_cache`) são analisados de novo, e em paralelo.
+    """
+    cache = _carregar_cache(arquivo_cache)
+    atuais, pendentes = {}, []
+    for raiz, _, nomes in os.walk(pasta_templates):
+        for nome in nomes:
+            if not nome.endswith('.html'):
+                continue
+            caminho = os.path.join(raiz, nome)
+            relativo = os.path.relpath(caminho, pasta_templates)
+            mtime = os.stat(caminho).st_mtime_ns
+            guardado = cache.get(relativo)
+            if guardado and guardado['mtime'] == mtime:
+                atuais[relativo] = guardado
+            else:
+                pendentes.append((relativo, caminho, mtime))
+
+    if pendentes:
+        caminhos = [caminho for _, caminho, _ in pendentes]
+        if len(pendentes) > 1:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                resultados = list(executor.map(extrair_classes_template, caminhos, chunksize=4))
+        else:
+            resultados = [extrair_classes_template(caminhos[0])]
+        for (relativo, _, mtime), (classes, prefixos) in zip(pendentes, resultados):
+            atuais[relativo] = {'mtime': mtime, 'classes': classes, 'prefixos': prefixos}
+
+    # Regrava só se algo mudou, incluindo templates apagados (que saem do cache).
+    if arquivo_cache and (pendentes or len(atuais) != len(cache)):
+        _gravar_cache(arquivo_cache, atuais)
+    return {relativo: (set(dados['classes']), set(dados['prefixos'])) for relativo, dados in atuais.items()}
+
+
+def classes_usadas(pasta_templates, arquivos_js=(), arquivo_cache=None, processos=None):
+    """Todas as classes (e prefixos) que podem aparecer numa página, somando a safelist."""
+    classes, prefixos = set(SAFELIST), set(PREFIXOS_SAFELIST)
+    for novas, novos_prefixos in classes_por_template(pasta_templates, arquivo_cache, processos).values():
+        classes |= novas
+        prefixos |= novos_prefixos
+    for caminho in arquivos_js:
+        with open(caminho, encoding='utf-8') as arquivo:
+            classes |= classes_de_js(arquivo.read())
+    return classes, prefixos
+
+
+def classes_definidas(css):
+    """Classes que aparecem em seletores do CSS."""
+    classes = set()
+    for no in _percorrer_regras(_analisar(_COMENTARIO_CSS.sub('', css))[0]):
+        classes |= set(_CLASSE_CSS.findall(_IGNORAR_NO_SELETOR.sub('', no[1])))
+    return classes
+
+
+# --- Leitura e escrita do CSS ---------------------------------------------------------
+
+def _proximo(css, inicio, alvos):
+    # Primeiro caractere de `alvos` fora de strings e parênteses.
+    profundidade = 0
+    i = inicio
+    while i < len(css):
+        c = css[i]
+        if c in '"\'':
+            fim = css.find(c, i + 1)
+            i = len(css) if fim == -1 else fim + 1
+            continue
+        if c == '(':
+            profundidade += 1
+        elif c == ')':
+            profundidade = max(0, profundidade - 1)
+        elif c in alvos and not profundidade:
+            return i
+        i += 1
+    return -1
+
+
+def _analisar(css, inicio=0):
+    """Nós até o '}' que fecha o bloco atual: ('instrucao', texto), ('regra', seletor, corpo)
+    ou ('grupo', cabecalho, filhos). Retorna (nós, posição após o bloco)."""
+    nos = []
+    i = inicio
+    while True:
+        j = _proximo(css, i, '{;}')
+        if j == -1:
+            return nos, len(css)
+        cabecalho = css[i:j].strip()
+        if css[j] == '}':
+            return nos, j + 1
+        if css[j] == ';':
+            if cabecalho:
+                nos.append(('instrucao', cabecalho))
+            i = j + 1
+        elif _AGRUPADOR_CSS.match(cabecalho):
+            filhos, i = _analisar(css, j + 1)
+            nos.append(('grupo', cabecalho, filhos))
+        else:
+            fim = _proximo(css, j + 1, '}')
+            fim = len(css) if fim == -1 else fim
+            nos.append(('regra', cabecalho, css[j + 1:fim]))
+            i = fim + 1
+
+
+def _percorrer_regras(nos):
+    for no in nos:
+        if no[0] == 'regra' and not no[1].startswith('@'):
+            yield no
+        elif no[0] == 'grupo' and not _KEYFRAMES_CSS.match(no[1]):
+            yield from _percorrer_regras(no[2])
+
+
+def _dividir(texto, separador):
+    partes = []
+    while True:
+        j = _proximo(texto, 0, separador)
+        if j == -1:
+            partes.append(texto)
+            return partes
+        partes.append(texto[:j])
+        texto = texto[j + 1:]
+
+
+def _seletor_usado(seletor, classes, prefixos):
+    # Classes dentro de :not() e de [atributo] não precisam existir na página.
+    for classe in _CLASSE_CSS.findall(_IGNORAR_NO_SELETOR.sub('', seletor)):
+        if classe not in classes and not classe.startswith(tuple(prefixos)):
+            return False
+    return True
+
+
+def _purgar_nos(nos, classes, prefixos, estatisticas):
+    resultado = []
+    for no in nos:
+        if no[0] == 'grupo' and not _KEYFRAMES_CSS.match(no[1]):
+            filhos = _purgar_nos(no[2], classes, prefixos, estatisticas)
+            if filhos:
+                resultado.append(('grupo', no[1], filhos))
+        elif no[0] == 'regra' and not no[1].startswith('@'):
+            seletores = [s for s in _dividir(no[1], ',') if s.strip()]
+            mantidos = [s for s in seletores if _seletor_usado(s, classes, prefixos)]
+            estatisticas['seletores_removidos'] += len(seletores) - len(mantidos)
+            if mantidos:
+                resultado.append(('regra', ','.join(mantidos), no[2]))
+            else:
+                estatisticas['regras_removidas'] += 1
+        else:
+            resultado.append(no)
+    return resultado
+
+
+def _compactar(texto):
+    # Espaços repetidos viram um, fora das strings.
+    partes = re.split(r'''("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')''', texto)
+    for i in range(0, len(partes), 2):
+        partes[i] = re.sub(r'\s+', ' ', partes[i])
+    return ''.join(partes).strip()
+
+
+def _minificar_seletor(seletor):
+    return re.sub(r'\s*([>+~,])\s*', r'\1', _compactar(seletor))
+
+
+def _minificar_declaracoes(corpo):
+    declaracoes = []
+    for declaracao in _dividir(corpo, ';'):
+        propriedade, separador, valor = declaracao.partition(':')
+        if not separador or not propriedade.strip():
+            continue
+        valor = _compactar(valor)
+        valor = re.sub(r'\s*!\s*important$', '!important', valor, flags=re.I)
+        partes = re.split(r'''("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')''', valor)
+        for i in range(0, len(partes), 2):
+            partes[i] = re.sub(r'\s*,\s*', ',', partes[i])
+        declaracoes.append(f'{propriedade.strip()}:{"".join(partes)}')
+    return ';'.join(declaracoes)
+
+
+def _emitir(nos):
+    saida = []
+    for no in nos:
+        if no[0] == 'instrucao':
+            saida.append(_compactar(no[1]) + ';')
+        elif no[0] == 'grupo':
+            saida.append(f'{_compactar(no[1])}{{{_emitir(no[2])}}}')
+        else:
+            declaracoes = _minificar_declaracoes(no[2])
+            if declaracoes:
+                saida.append(f'{_minificar_seletor(no[1])}{{{declaracoes}}}')
+    return ''.join(saida)
+
+
+def minificar(css):
+    """CSS sem comentários nem espaços desnecessários."""
+    return _emitir(_analisar(_COMENTARIO_CSS.sub('', css))[0])
+
+
+def purgar(css, classes, prefixos=()):
+    """Remove os seletores com classes que nenhuma página usa e minifica o resto.
+
+    Um seletor só sai se tiver alguma classe fora de `classes` (e de `prefixos`); regras
+    sem classe (elementos, ids, :root) e @keyframes ficam sempre. Retorna (css, estatísticas).
+    """
+    estatisticas = {'seletores_removidos': 0, 'regras_removidas': 0}
+    nos = _analisar(_COMENTARIO_CSS.sub('', css))[0]
+    nos = _purgar_nos(nos, classes, prefixos, estatisticas)
+    return _emitir(nos), estatisticas
+
+
+def relatorio(nome, original, final, estatisticas=None):
+    """Linha de tamanhos (bruto e gzip) antes e depois, para a saída dos comandos."""
+    def kb(dados):
+        return f'{len(dados) / 1024:.1f} KB'
+
+    linha = (f'{nome}: {kb(original)} -> {kb(final)} '
+             f'(gzip {kb(gzip.compress(original))} -> {kb(gzip.compress(final))})')
+    if estatisticas:
+        linha += (f'; {estatisticas["seletores_removidos"]} seletor(es) e '
+                  f'{estatisticas["regras_removidas"]} regra(s) removidos')
+    return linha
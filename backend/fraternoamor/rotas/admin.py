@@ -0,0 +1,1220 @@
+import os
+import io
+import secrets
+import csv
+import datetime
+import urllib.parse
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, Response,
+                   send_from_directory, abort, current_app, stream_with_context, get_template_attribute)
+from markupsafe import Markup
+from flask_login import login_required, current_user
+from werkzeug.utils import secure_filename
+from sqlalchemy import delete, func, update
+from sqlalchemy.orm import joinedload, selectinload
+
+from .. import (arquivamento, catalogo, dinheiro, estoque, frequencia, importacao_produtos, instrumentacao_sql,
+               metricas, perfilador, prerenderizacao, progresso, tarefas, uploads, videos)
+from ..extensoes import db, bcrypt
+from ..modelos import (Aviso, CategoriaCurso, CategoriaMaterial, CategoriaUsuario, Cliente, Configuracao,
+                       Curso, ItemPedido, MaterialDigital, Pedido, PedidoArquivado, Presenca, Produto, Reuniao,
+                       Tarefa, Usuario)
+from ..utils import allowed_file
+
+bp = Blueprint('admin', __name__)
+
+@bp.route('/admin/avisos', methods=['GET', 'POST'])
+@login_required
+def gerenciar_avisos():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+
+    if request.method == 'POST':
+        mensagem = request.form.get('mensagem')
+        categoria_id = request.form.get('categoria_permissao_id')
+
+        if not mensagem:
+            flash('A mensagem do aviso не pode estar vazia.', 'danger')
+        else:
+            # Se categoria_id for uma string vazia (""), converte para None
+            categoria_alvo_id = int(categoria_id) if categoria_id else None
+            novo_aviso = Aviso(mensagem=mensagem, categoria_permissao_id=categoria_alvo_id)
+            db.session.add(novo_aviso)
+            db.session.commit()
+            flash('Aviso criado com sucesso!', 'success')
+        
+        return redirect(url_for('admin.gerenciar_avisos'))
+
+    avisos = Aviso.query.order_by(Aviso.data_criacao.desc()).all()
+    categorias_usuario = CategoriaUsuario.query.order_by(CategoriaUsuario.nome).all()
+    return render_template('admin/gerenciar_avisos.html', avisos=avisos, categorias_usuario=categorias_usuario)
+
+@bp.route('/admin/avisos/excluir/<int:aviso_id>', methods=['POST'])
+@login_required
+def excluir_aviso(aviso_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    
+    aviso = Aviso.query.get_or_404(aviso_id)
+    db.session.delete(aviso)
+    db.session.commit()
+    flash('Aviso excluído com sucesso.', 'success')
+    return redirect(url_for('admin.gerenciar_avisos'))
+
+@bp.route('/admin')
+@login_required
+def admin_dashboard():
+    if not current_user.is_admin:
+        flash('Você não tem permissão para acessar esta página.', 'danger')
+        return redirect(url_for('membro.dashboard'))
+    
+    total_produtos = Produto.query.count()
+    total_clientes = Cliente.query.count()
+    total_pedidos = arquivamento.total_de_pedidos()
+    total_usuarios = Usuario.query.count()
+    
+    # Query corrigida - LEFT JOIN para incluir categorias sem cursos
+    dados_grafico = db.session.query(
+        CategoriaCurso.nome, 
+        func.count(Curso.id)
+    ).outerjoin(Curso, CategoriaCurso.id == Curso.categoria_id)\
+     .group_by(CategoriaCurso.id, CategoriaCurso.nome)\
+     .order_by(CategoriaCurso.nome).all()
+    
+    chart_labels = [dado[0] for dado in dados_grafico]
+    chart_data = [dado[1] for dado in dados_grafico]
+    
+    return render_template('admin/admin_dashboard.html', 
+                         total_produtos=total_produtos, 
+                         total_clientes=total_clientes, 
+                         total_pedidos=total_pedidos, 
+                         total_usuarios=total_usuarios, 
+                         chart_labels=chart_labels, 
+                         chart_data=chart_data)
+
+@bp.route('/admin/desempenho/sql')
+@login_required
+def desempenho_sql():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    resumo, processos = instrumentacao_sql.resumo_por_endpoint()
+    return render_template('admin/desempenho_sql.html', resumo=resumo, processos=processos)
+
+@bp.route('/admin/armazenamento')
+@login_required
+def armazenamento():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    return render_template('admin/armazenamento.html', uso=uploads.uso_por_modelo())
+
+@bp.route('/admin/tarefas')
+@login_required
+def listar_tarefas():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    lista = Tarefa.query.order_by(Tarefa.id.desc()).limit(100).all()
+    return render_template('admin/tarefas.html', tarefas=lista, tipos=tarefas.TIPOS, nomes_status=tarefas.NOMES_STATUS,
+                           ativas=any(t.status in (tarefas.PENDENTE, tarefas.EXECUTANDO) for t in lista))
+
+@bp.route('/admin/tarefas/enfileirar', methods=['POST'])
+@login_required
+def enfileirar_tarefa():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    tipo = request.form.get('tipo')
+    if tipo not in tarefas.TIPOS:
+        abort(400)
+    registro = tarefas.enfileirar(tipo, usuario_id=current_user.id)
+    flash(f'Tarefa #{registro.id} na fila. Acompanhe o andamento nesta página.', 'success')
+    return redirect(url_for('admin.listar_tarefas'))
+
+@bp.route('/admin/tarefas/<int:tarefa_id>/resultado')
+@login_required
+def baixar_resultado_tarefa(tarefa_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    registro = Tarefa.query.get_or_404(tarefa_id)
+    if not registro.arquivo_resultado:
+        abort(404)
+    return send_from_directory(tarefas.pasta_resultados(), registro.arquivo_resultado, as_attachment=True,
+                               download_name=registro.arquivo_resultado.split('_', 1)[1])
+
+@bp.route('/admin/desempenho/sql/limpar', methods=['POST'])
+@login_required
+def limpar_desempenho_sql():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    instrumentacao_sql.limpar_resumo()
+    flash('Estatísticas de SQL zeradas.', 'success')
+    return redirect(url_for('admin.desempenho_sql'))
+
+@bp.route('/metrics')
+def exportar_metricas():
+    if not metricas.autorizado(current_user):
+        return Response('Acesso negado.', status=403, mimetype='text/plain')
+    corpo, content_type = metricas.gerar_metricas()
+    return Response(corpo, content_type=content_type)
+
+def _renderizar_perfis(estatisticas=None):
+    modo = perfilador.modo_atual()
+    if modo:
+        modo = dict(modo, ate_formatado=datetime.datetime.fromtimestamp(modo['ate']).strftime('%d/%m/%Y %H:%M'))
+    return render_template('admin/perfis.html', modo=modo, perfis=perfilador.listar_perfis(),
+                           cabecalho=perfilador.CABECALHO, token=perfilador.gerar_token(),
+                           memoria=perfilador.estado_memoria(), estatisticas=estatisticas)
+
+@bp.route('/admin/perfis')
+@login_required
+def listar_perfis():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    return _renderizar_perfis()
+
+@bp.route('/admin/perfis/ativar', methods=['POST'])
+@login_required
+def ativar_perfilamento():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    percentual = request.form.get('percentual', type=float)
+    minutos = request.form.get('minutos', type=int)
+    if percentual is None or not 0 < percentual <= 100 or minutos is None or not 1 <= minutos <= 240:
+        flash('Informe um percentual entre 1 e 100 e uma duração entre 1 e 240 minutos.', 'danger')
+        return redirect(url_for('admin.listar_perfis'))
+    perfilador.ativar_modo(percentual / 100, minutos)
+    flash(f'Perfilamento ativado para {percentual:.0f}% das requisições por {minutos} minutos.', 'success')
+    return redirect(url_for('admin.listar_perfis'))
+
+@bp.route('/admin/perfis/desativar', methods=['POST'])
+@login_required
+def desativar_perfilamento():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    perfilador.desativar_modo()
+    flash('Perfilamento desativado.', 'success')
+    return redirect(url_for('admin.listar_perfis'))
+
+@bp.route('/admin/perfis/<string:nome>')
+@login_required
+def ver_perfil(nome):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    perfil = next((p for p in perfilador.listar_perfis() if p['nome'] == nome), None)
+    if perfil is None:
+        abort(404)
+    pilhas = perfilador.carregar_perfil(nome)
+    return render_template('admin/ver_perfil.html', perfil=perfil,
+                           arvore=perfilador.arvore_flame_graph(pilhas),
+                           resumo=perfilador.resumo_funcoes(pilhas),
+                           intervalo_ms=perfilador.INTERVALO_AMOSTRA * 1000)
+
+@bp.route('/admin/perfis/<string:nome>/baixar')
+@login_required
+def baixar_perfil(nome):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    return send_from_directory(current_app.config['PERFIS_FOLDER'], nome, as_attachment=True, mimetype='text/plain')
+
+@bp.route('/admin/memoria/iniciar', methods=['POST'])
+@login_required
+def iniciar_memoria():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    perfilador.iniciar_memoria()
+    flash('tracemalloc iniciado neste worker.', 'success')
+    return redirect(url_for('admin.listar_perfis'))
+
+@bp.route('/admin/memoria/parar', methods=['POST'])
+@login_required
+def parar_memoria():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    perfilador.parar_memoria()
+    flash('tracemalloc parado.', 'success')
+    return redirect(url_for('admin.listar_perfis'))
+
+@bp.route('/admin/memoria/snapshot', methods=['POST'])
+@login_required
+def snapshot_memoria():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    if not perfilador.estado_memoria()['ativo']:
+        flash('O tracemalloc não está ativo neste worker. Inicie-o antes de tirar um snapshot.', 'danger')
+        return redirect(url_for('admin.listar_perfis'))
+    return _renderizar_perfis(estatisticas=perfilador.tirar_snapshot())
+
+@bp.route('/registrar', methods=['GET', 'POST'])
+@login_required
+def registrar():
+    if not current_user.is_admin:
+        flash('Você não tem permissão para acessar esta página.', 'danger')
+        return redirect(url_for('membro.dashboard'))
+    categorias_usuario = CategoriaUsuario.query.order_by(CategoriaUsuario.nome).all()
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        confirm_password = request.form['confirm_password']
+        if password != confirm_password:
+            flash('As senhas não coincidem!', 'danger')
+            return redirect(url_for('admin.registrar'))
+        usuario_existente = Usuario.query.filter_by(username=username).first()
+        if usuario_existente:
+            flash('Este nome de usuário já está em uso.', 'danger')
+            return redirect(url_for('admin.registrar'))
+        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        novo_usuario = Usuario(username=username, password_hash=hashed_password)
+        ids_categorias_selecionadas = request.form.getlist('categorias')
+        categorias_selecionadas = CategoriaUsuario.query.filter(CategoriaUsuario.id.in_(ids_categorias_selecionadas)).all()
+        novo_usuario.categorias = categorias_selecionadas
+        db.session.add(novo_usuario)
+        db.session.commit()
+        flash('Usuário criado com sucesso!', 'success')
+        return redirect(url_for('admin.listar_usuarios_admin'))
+    return render_template('admin/registrar.html', categorias_usuario=categorias_usuario)
+
+@bp.route('/configuracoes', methods=['GET', 'POST'])
+@login_required
+def configuracoes():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    aviso = Configuracao.query.filter_by(chave='aviso_lanchonete').first()
+    status_lanchonete = Configuracao.query.filter_by(chave='lanchonete_status').first()
+    if request.method == 'POST':
+        valor_aviso = request.form.get('aviso')
+        if aviso:
+            aviso.valor = valor_aviso
+        else:
+            aviso = Configuracao(chave='aviso_lanchonete', valor=valor_aviso)
+            db.session.add(aviso)
+        db.session.commit()
+        prerenderizacao.atualizar_por_chave('aviso_lanchonete')
+        flash('Aviso da lanchonete atualizado com sucesso!', 'success')
+        return redirect(url_for('admin.configuracoes'))
+    return render_template('admin/configuracoes.html', aviso=aviso, status_lanchonete=status_lanchonete)
+
+@bp.route('/mudar-status-lanchonete', methods=['POST'])
+@login_required
+def mudar_status_lanchonete():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    novo_status = request.form.get('novo_status')
+    status_atual = Configuracao.query.filter_by(chave='lanchonete_status').first()
+    if status_atual:
+        status_atual.valor = novo_status
+    else:
+        status_atual = Configuracao(chave='lanchonete_status', valor=novo_status)
+        db.session.add(status_atual)
+    db.session.commit()
+    prerenderizacao.atualizar_por_chave('lanchonete_status')
+    flash(f'Lanchonete marcada como "{novo_status}"!', 'success')
+    return redirect(url_for('admin.configuracoes'))
+
+@bp.route('/admin/comunicacoes', methods=['GET', 'POST'])
+@login_required
+def enviar_comunicacao():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    links_whatsapp = []
+    if request.method == 'POST':
+        mensagem = request.form['mensagem']
+        clientes = Cliente.query.filter(Cliente.contato != None, Cliente.contato != '').all()
+        for cliente in clientes:
+            numero_limpo = ''.join(filter(str.isdigit, cliente.contato))
+            if not numero_limpo.startswith('55'):
+                numero_limpo = '55' + numero_limpo
+            mensagem_codificada = urllib.parse.quote(mensagem)
+            link = f"https://wa.me/{numero_limpo}?text={mensagem_codificada}"
+            links_whatsapp.append({'nome': cliente.nome, 'contato': cliente.contato, 'url': link})
+    return render_template('admin/enviar_comunicacao.html', links_whatsapp=links_whatsapp)
+
+@bp.route('/admin/relatorio/usuarios.csv')
+@login_required
+def exportar_usuarios_csv():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+
+    # Busca os usuários no banco
+    usuarios = Usuario.query.all()
+    # Cria um arquivo de texto em memória
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    # Escreve o cabeçalho do CSV
+    writer.writerow(['ID', 'Username', 'Is Admin'])
+    # Escreve os dados de cada usuário
+    for usuario in usuarios:
+        writer.writerow([usuario.id, usuario.username, usuario.is_admin])
+
+    # Prepara o arquivo para ser enviado
+    output.seek(0)
+    return Response(
+        output,
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment;filename=relatorio_usuarios.csv"}
+    )
+
+@bp.route('/admin/relatorio/produtos.csv')
+@login_required
+def exportar_produtos_csv():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+
+    produtos = Produto.query.all()
+    saldos = estoque.saldos()
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    writer.writerow(['ID', 'Nome', 'Categoria', 'Preco', 'Estoque'])
+    for produto in produtos:
+        writer.writerow([produto.id, produto.nome, produto.categoria, dinheiro.reais(produto.preco_centavos),
+                         saldos.get(produto.id, 0)])
+
+    output.seek(0)
+    return Response(output, mimetype="text/csv", headers={"Content-Disposition":"attachment;filename=relatorio_produtos.csv"})
+
+@bp.route('/admin/relatorio/vendas_diarias.csv')
+@login_required
+def exportar_vendas_csv():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+
+    # Pedidos ativos e arquivados: o relatório cobre o histórico inteiro.
+    pedidos = arquivamento.pedidos_todos()
+    vendas_por_dia = db.session.query(
+        func.date(pedidos.c.data_pedido).label('dia'),
+        func.sum(pedidos.c.valor_total_centavos).label('total_vendido'),
+        func.count(pedidos.c.id).label('numero_pedidos')
+    ).group_by(func.date(pedidos.c.data_pedido)).order_by(func.date(pedidos.c.data_pedido).desc()).all()
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    writer.writerow(['Data', 'Total Vendido (R$)', 'Numero de Pedidos'])
+    for venda in vendas_por_dia:
+        writer.writerow([venda.dia, dinheiro.reais(venda.total_vendido), venda.numero_pedidos])
+
+    output.seek(0)
+    return Response(output, mimetype="text/csv", headers={"Content-Disposition":"attachment;filename=relatorio_vendas_diarias.csv"})
+
+@bp.route('/admin/usuarios')
+@login_required
+def listar_usuarios_admin():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    usuarios = Usuario.query.all()
+    return render_template('admin/listar_usuarios.html', usuarios=usuarios)
+
+@bp.route('/admin/pagina/<string:page_key>', methods=['GET', 'POST'])
+@login_required
+def gerenciar_pagina(page_key):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+
+    pagina = Configuracao.query.filter_by(chave=page_key).first()
+
+    if request.method == 'POST':
+        conteudo = request.form['conteudo']
+        if pagina:
+            pagina.valor = conteudo
+        else:
+            pagina = Configuracao(chave=page_key, valor=conteudo)
+            db.session.add(pagina)
+        db.session.commit()
+        prerenderizacao.atualizar_por_chave(page_key)
+        flash(f'Página "{page_key.replace("_", " ").title()}" atualizada com sucesso!', 'success')
+        return redirect(url_for('admin.gerenciar_pagina', page_key=page_key))
+
+    return render_template('admin/gerenciar_pagina.html', pagina=pagina, page_key=page_key)
+
+@bp.route('/admin/usuario/<int:usuario_id>', methods=['GET', 'POST'])
+@login_required
+def gerenciar_usuario(usuario_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    
+    usuario = Usuario.query.get_or_404(usuario_id)
+    todas_categorias = CategoriaUsuario.query.all()
+    
+    if request.method == 'POST':
+        ids_selecionados = [int(id) for id in request.form.getlist('categorias')]
+        categorias_selecionadas = CategoriaUsuario.query.filter(CategoriaUsuario.id.in_(ids_selecionados)).all()
+        usuario.categorias = categorias_selecionadas
+        db.session.commit()
+        flash(f'Permissões do usuário {usuario.username} atualizadas!', 'success')
+        return redirect(url_for('admin.listar_usuarios_admin'))
+    
+    return render_template('admin/gerenciar_usuario.html', usuario=usuario, todas_categorias=todas_categorias)
+
+@bp.route('/admin/usuario/alternar-admin/<int:id>', methods=['POST'])
+@login_required
+def alternar_status_admin(id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    usuario = Usuario.query.get_or_404(id)
+    if usuario.id == current_user.id:
+        flash('Você não pode alterar seu próprio status de administrador.', 'danger')
+        return redirect(url_for('admin.listar_usuarios_admin'))
+    usuario.is_admin = not usuario.is_admin
+    db.session.commit()
+    flash(f'Status de administrador do usuário {usuario.username} foi alterado.', 'success')
+    return redirect(url_for('admin.listar_usuarios_admin'))
+
+@bp.route('/admin/usuario/excluir/<int:id>', methods=['POST'])
+@login_required
+def excluir_usuario(id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    usuario_para_excluir = Usuario.query.get_or_404(id)
+    if usuario_para_excluir.id == current_user.id:
+        flash('Você não pode excluir sua própria conta.', 'danger')
+        return redirect(url_for('admin.listar_usuarios_admin'))
+    db.session.delete(usuario_para_excluir)
+    db.session.commit()
+    flash(f'Usuário {usuario_para_excluir.username} foi excluído com sucesso.', 'success')
+    return redirect(url_for('admin.listar_usuarios_admin'))
+
+@bp.route('/admin/categorias')
+@login_required
+def listar_categorias():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    categorias = CategoriaCurso.query.all()
+    return render_template('admin/listar_categorias.html', categorias=categorias)
+
+@bp.route('/admin/categorias/adicionar', methods=['GET', 'POST'])
+@login_required
+def adicionar_categoria():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    if request.method == 'POST':
+        nome = request.form['nome']
+        nova_categoria = CategoriaCurso(nome=nome)
+        db.session.add(nova_categoria)
+        db.session.commit()
+        flash('Categoria criada com sucesso!', 'success')
+        return redirect(url_for('admin.listar_categorias'))
+    return render_template('admin/adicionar_categoria.html')
+
+@bp.route('/admin/categorias/excluir/<int:categoria_id>', methods=['POST'])
+@login_required
+def excluir_categoria(categoria_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    categoria_para_excluir = CategoriaCurso.query.get_or_404(categoria_id)
+    if categoria_para_excluir.cursos:
+        flash('Não é possível excluir esta categoria, pois existem cursos associados a ela.', 'danger')
+        return redirect(url_for('admin.listar_categorias'))
+    db.session.delete(categoria_para_excluir)
+    db.session.commit()
+    flash('Categoria de curso excluída com sucesso!', 'success')
+    return redirect(url_for('admin.listar_categorias'))
+
+@bp.route('/admin/permissoes')
+@login_required
+def listar_categorias_usuario():
+    if not current_user.is_admin:
+        flash('Você não tem permissão para acessar esta página.', 'danger')
+        return redirect(url_for('membro.dashboard'))
+    
+    categorias = CategoriaUsuario.query.order_by(CategoriaUsuario.nivel).all()
+    return render_template('admin/listar_categorias_usuario.html', categorias=categorias)
+
+@bp.route('/admin/permissoes/adicionar', methods=['GET', 'POST'])
+@login_required
+def adicionar_categoria_usuario():
+    if not current_user.is_admin:
+        flash('Você não tem permissão para acessar esta página.', 'danger')
+        return redirect(url_for('membro.dashboard'))
+    
+    if request.method == 'POST':
+        nome = request.form['nome']
+        nivel = int(request.form['nivel'])
+        
+        nova_categoria = CategoriaUsuario(nome=nome, nivel=nivel)
+        db.session.add(nova_categoria)
+        db.session.commit()
+        
+        flash('Categoria de permissão criada com sucesso!', 'success')
+        return redirect(url_for('admin.listar_categorias_usuario'))
+    
+    return render_template('admin/adicionar_categoria_usuario.html')
+
+@bp.route('/admin/materiais/categorias')
+@login_required
+def listar_categorias_material():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    categorias = CategoriaMaterial.query.all()
+    return render_template('admin/listar_categorias_material.html', categorias=categorias)
+
+@bp.route('/admin/materiais/categorias/adicionar', methods=['GET', 'POST'])
+@login_required
+def adicionar_categoria_material():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    if request.method == 'POST':
+        nome = request.form['nome']
+        if not CategoriaMaterial.query.filter_by(nome=nome).first():
+            nova_categoria = CategoriaMaterial(nome=nome)
+            db.session.add(nova_categoria)
+            db.session.commit()
+            flash('Categoria de material criada com sucesso!', 'success')
+        else:
+            flash('Essa categoria já existe.', 'warning')
+        return redirect(url_for('admin.listar_categorias_material'))
+    return render_template('admin/adicionar_categoria_material.html')
+
+@bp.route('/admin/materiais/categorias/excluir/<int:categoria_id>', methods=['POST'])
+@login_required
+def excluir_categoria_material(categoria_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    categoria_para_excluir = CategoriaMaterial.query.get_or_404(categoria_id)
+    if categoria_para_excluir.materiais:
+        flash('Não é possível excluir esta categoria, pois existem materiais associados a ela.', 'danger')
+        return redirect(url_for('admin.listar_categorias_material'))
+    db.session.delete(categoria_para_excluir)
+    db.session.commit()
+    flash('Categoria de material excluída com sucesso!', 'success')
+    return redirect(url_for('admin.listar_categorias_material'))
+
+@bp.route('/admin/permissoes/editar/<int:id>', methods=['GET', 'POST'])
+@login_required
+def editar_categoria_usuario(id):
+    if not current_user.is_admin:
+        flash('Você não tem permissão para acessar esta página.', 'danger')
+        return redirect(url_for('membro.dashboard'))
+    
+    categoria = CategoriaUsuario.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        categoria.nome = request.form['nome']
+        categoria.nivel = int(request.form['nivel'])
+        db.session.commit()
+        flash('Categoria de permissão atualizada com sucesso!', 'success')
+        return redirect(url_for('admin.listar_categorias_usuario'))
+    
+    return render_template('admin/editar_categoria_usuario.html', categoria=categoria)
+
+@bp.route('/admin/permissoes/excluir/<int:id>', methods=['POST'])
+@login_required
+def excluir_categoria_usuario(id):
+    if not current_user.is_admin:
+        flash('Você não tem permissão para acessar esta página.', 'danger')
+        return redirect(url_for('membro.dashboard'))
+    
+    categoria = CategoriaUsuario.query.get_or_404(id)
+    
+    if categoria.usuarios:
+        flash('Não é possível excluir esta categoria, pois existem usuários associados a ela.', 'danger')
+    else:
+        db.session.delete(categoria)
+        db.session.commit()
+        flash('Categoria de permissão excluída com sucesso.', 'success')
+    
+    return redirect(url_for('admin.listar_categorias_usuario'))
+
+@bp.route('/admin/cursos')
+@login_required
+def listar_cursos():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    cursos = Curso.query.all()
+    return render_template('admin/listar_cursos.html', cursos=cursos)
+
+@bp.route('/admin/cursos/adicionar', methods=['GET', 'POST'])
+@login_required
+def adicionar_curso():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    categorias = CategoriaCurso.query.order_by(CategoriaCurso.nome).all()
+    categorias_usuario = CategoriaUsuario.query.all()
+    if request.method == 'POST':
+        titulo = request.form['titulo']
+        link_video = request.form['link_video']
+        categoria_id = request.form['categoria_id']
+        descricao = request.form.get('descricao')
+        categoria_permissao_id = request.form.get('categoria_permissao_id')
+        nome_arquivo_thumb = None
+        if 'imagem_thumbnail' in request.files:
+            file_thumb = request.files['imagem_thumbnail']
+            if file_thumb and file_thumb.filename != '' and allowed_file(file_thumb.filename):
+                secure_name = secure_filename(file_thumb.filename)
+                timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+                nome_arquivo_thumb = f"thumb_{timestamp}_{secure_name}"
+                file_thumb.save(os.path.join(current_app.config['UPLOAD_FOLDER'], nome_arquivo_thumb))
+        nome_arquivo_anexo = None
+        if 'arquivo_anexo' in request.files:
+            file_anexo = request.files['arquivo_anexo']
+            if file_anexo and file_anexo.filename != '':
+                secure_name = secure_filename(file_anexo.filename)
+                timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+                nome_arquivo_anexo = f"anexo_{timestamp}_{secure_name}"
+                file_anexo.save(os.path.join(current_app.config['UPLOAD_FOLDER'], nome_arquivo_anexo))
+        novo_curso = Curso(titulo=titulo, link_video=link_video, categoria_id=categoria_id, imagem_thumbnail=nome_arquivo_thumb, arquivo_anexo=nome_arquivo_anexo, descricao=descricao, categoria_permissao_id=categoria_permissao_id if categoria_permissao_id else None)
+        videos.atualizar_video(novo_curso)
+        db.session.add(novo_curso)
+        db.session.commit()
+        flash('Curso adicionado com sucesso!', 'success')
+        return redirect(url_for('admin.listar_cursos'))
+    return render_template('admin/adicionar_curso.html', categorias=categorias, categorias_usuario=categorias_usuario)
+
+@bp.route('/admin/cursos/progresso')
+@login_required
+def progresso_cursos():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    return render_template('admin/progresso_cursos.html', resumo=progresso.resumo_por_curso(),
+                           limite_conclusao=progresso.LIMITE_CONCLUSAO)
+
+@bp.route('/admin/cursos/editar/<int:curso_id>', methods=['GET', 'POST'])
+@login_required
+def editar_curso(curso_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    curso = Curso.query.get_or_404(curso_id)
+    categorias = CategoriaCurso.query.order_by(CategoriaCurso.nome).all()
+    categorias_usuario = CategoriaUsuario.query.all()
+    if request.method == 'POST':
+        curso.titulo = request.form['titulo']
+        curso.link_video = request.form['link_video']
+        curso.categoria_id = request.form['categoria_id']
+        curso.descricao = request.form['descricao']
+        categoria_permissao_id = request.form.get('categoria_permissao_id')
+        curso.categoria_permissao_id = categoria_permissao_id if categoria_permissao_id else None
+        videos.atualizar_video(curso)
+        db.session.commit()
+        flash('Curso atualizado com sucesso!', 'success')
+        return redirect(url_for('admin.listar_cursos'))
+    return render_template('admin/editar_curso.html', curso=curso, categorias=categorias, categorias_usuario=categorias_usuario)
+
+@bp.route('/admin/cursos/excluir/<int:curso_id>', methods=['POST'])
+@login_required
+def excluir_curso(curso_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    curso = Curso.query.get_or_404(curso_id)
+    if curso.imagem_thumbnail:
+        path = os.path.join(current_app.config['UPLOAD_FOLDER'], curso.imagem_thumbnail)
+        if os.path.exists(path):
+            os.remove(path)
+    if curso.arquivo_anexo:
+        path = os.path.join(current_app.config['UPLOAD_FOLDER'], curso.arquivo_anexo)
+        if os.path.exists(path):
+            os.remove(path)
+    db.session.delete(curso)
+    db.session.commit()
+    flash('Curso excluído com sucesso!', 'success')
+    return redirect(url_for('admin.listar_cursos'))
+
+# --- Ações em lote ---
+# Os formulários com data-lote (static/js/admin_lote.js) mandam o cabeçalho X-Fragmento e
+# recebem só as linhas alteradas, que a página troca no lugar. Sem JavaScript, o mesmo POST
+# termina em flash e redirect, como as demais rotas.
+
+def _ids_do_formulario():
+    return sorted({int(valor) for valor in request.form.getlist('ids') if valor.isdigit()})
+
+def _linha(nome):
+    return get_template_attribute('admin/_linhas.html', nome)
+
+def _resposta_lote(mensagem, voltar, linhas=(), removidos=(), categoria='success'):
+    if request.headers.get('X-Fragmento') != '1':
+        flash(mensagem, categoria)
+        return redirect(voltar)
+    resposta = current_app.response_class(Markup('').join(linhas), mimetype='text/html')
+    # Cabeçalhos só aceitam latin-1: a mensagem vai codificada e o JS decodifica.
+    resposta.headers['X-Mensagem'] = urllib.parse.quote(mensagem)
+    resposta.headers['X-Categoria'] = categoria
+    resposta.headers['X-Removidos'] = ' '.join(removidos)
+    return resposta
+
+@bp.route('/produtos/lote', methods=['POST'])
+@login_required
+def produtos_em_lote():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    voltar = url_for('admin.listar_produtos')
+    ids = _ids_do_formulario()
+    if request.form.get('acao') != 'excluir' or not ids:
+        return _resposta_lote('Selecione ao menos um produto e uma ação.', voltar, categoria='danger')
+    produtos = db.session.query(Produto.id, Produto.imagem_url).filter(Produto.id.in_(ids)).all()
+    ids = [produto_id for produto_id, _ in produtos]
+    db.session.execute(delete(Produto.__table__).where(Produto.id.in_(ids)))
+    # Exclusão sem o ORM: a versão nova do catálogo avisa as páginas abertas.
+    catalogo.marcar_alterados([])
+    db.session.commit()
+    for _, imagem_url in produtos:
+        if imagem_url:
+            path = os.path.join(current_app.config['UPLOAD_FOLDER'], imagem_url)
+            if os.path.exists(path):
+                os.remove(path)
+    return _resposta_lote(f'{len(ids)} produto(s) excluído(s).', voltar,
+                          removidos=[f'produto-{produto_id}' for produto_id in ids])
+
+@bp.route('/produtos')
+@login_required
+def listar_produtos():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    todos_produtos = Produto.query.order_by(Produto.id.desc()).all()
+    return render_template('admin/listar_produtos.html', produtos=todos_produtos, saldos=estoque.saldos())
+
+@bp.route('/produtos/importar', methods=['GET', 'POST'])
+@login_required
+def importar_produtos():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    if request.method == 'GET':
+        return render_template('admin/importar_produtos.html')
+    excluir_ausentes = 'excluir_ausentes' in request.form
+    if request.form.get('acao') == 'aplicar':
+        # O CSV volta da pré-visualização num campo oculto e é conferido de novo ao gravar.
+        conteudo = request.form.get('conteudo', '')
+        try:
+            plano = importacao_produtos.aplicar(conteudo, excluir_ausentes)
+        except importacao_produtos.PlanilhaInvalida:
+            flash('A planilha não foi aplicada: o catálogo mudou e ela ficou com erros. Confira abaixo.', 'danger')
+            return render_template('admin/importar_produtos.html', conteudo=conteudo, excluir_ausentes=excluir_ausentes,
+                                   plano=importacao_produtos.planejar(conteudo, excluir_ausentes))
+        flash(f'Catálogo atualizado: {len(plano["inserir"])} produto(s) novo(s), {len(plano["atualizar"])} '
+              f'alterado(s) e {len(plano["excluir"])} excluído(s).', 'success')
+        return redirect(url_for('admin.listar_produtos'))
+    arquivo = request.files.get('planilha')
+    if not arquivo or not arquivo.filename:
+        flash('Escolha o arquivo CSV com os produtos.', 'danger')
+        return redirect(url_for('admin.importar_produtos'))
+    conteudo = importacao_produtos.decodificar(arquivo.read())
+    return render_template('admin/importar_produtos.html', conteudo=conteudo, excluir_ausentes=excluir_ausentes,
+                           plano=importacao_produtos.planejar(conteudo, excluir_ausentes))
+
+@bp.route('/adicionar-produto', methods=['GET', 'POST'])
+@login_required
+def adicionar_produto():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    if request.method == 'POST':
+        nome = request.form['nome']
+        categoria = request.form['categoria']
+        try:
+            preco_centavos = dinheiro.para_centavos(request.form['preco'])
+        except ValueError:
+            flash('Preço inválido. Use o formato 5.50.', 'danger')
+            return redirect(url_for('admin.adicionar_produto'))
+        estoque_inicial = int(request.form['estoque'])
+        filename = None
+        if 'imagem_file' in request.files:
+            file = request.files['imagem_file']
+            if file and file.filename != '' and allowed_file(file.filename):
+                secure_name = secure_filename(file.filename)
+                timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+                filename = f"{timestamp}_{secure_name}"
+                file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+        novo_produto = Produto(nome=nome, categoria=categoria, preco_centavos=preco_centavos, imagem_url=filename)
+        db.session.add(novo_produto)
+        if estoque_inicial:
+            db.session.flush()
+            estoque.movimentar(novo_produto.id, estoque_inicial, estoque.REPOSICAO)
+        db.session.commit()
+        flash('Produto adicionado com sucesso!', 'success')
+        return redirect(url_for('admin.listar_produtos'))
+    return render_template('admin/adicionar_produto.html')
+
+@bp.route('/editar-produto/<int:produto_id>', methods=['GET', 'POST'])
+@login_required
+def editar_produto(produto_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    produto = Produto.query.get_or_404(produto_id)
+    if request.method == 'POST':
+        try:
+            preco_centavos = dinheiro.para_centavos(request.form['preco'])
+        except ValueError:
+            flash('Preço inválido. Use o formato 5.50.', 'danger')
+            return redirect(url_for('admin.editar_produto', produto_id=produto.id))
+        produto.nome = request.form['nome']
+        produto.categoria = request.form['categoria']
+        produto.preco_centavos = preco_centavos
+        # O campo traz a contagem real; a diferença para o saldo vira um ajuste no livro.
+        diferenca = int(request.form['estoque']) - estoque.saldos([produto.id]).get(produto.id, 0)
+        if diferenca:
+            estoque.movimentar(produto.id, diferenca, estoque.AJUSTE)
+        if 'imagem_file' in request.files:
+            file = request.files['imagem_file']
+            if file and file.filename != '' and allowed_file(file.filename):
+                if produto.imagem_url:
+                    old_path = os.path.join(current_app.config['UPLOAD_FOLDER'], produto.imagem_url)
+                    if os.path.exists(old_path):
+                        os.remove(old_path)
+                secure_name = secure_filename(file.filename)
+                timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+                filename = f"{timestamp}_{secure_name}"
+                file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+                produto.imagem_url = filename
+        db.session.commit()
+        flash('Produto atualizado com sucesso!', 'success')
+        return redirect(url_for('admin.listar_produtos'))
+    return render_template('admin/editar_produto.html', produto=produto,
+                           estoque_atual=estoque.saldos([produto.id]).get(produto.id, 0))
+
+@bp.route('/repor-estoque/<int:produto_id>', methods=['POST'])
+@login_required
+def repor_estoque(produto_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    produto = Produto.query.get_or_404(produto_id)
+    quantidade = request.form.get('quantidade', type=int)
+    if quantidade is None or quantidade <= 0:
+        flash('Informe quantas unidades chegaram.', 'danger')
+    else:
+        estoque.movimentar(produto.id, quantidade, estoque.REPOSICAO)
+        db.session.commit()
+        saldo = estoque.saldos([produto.id]).get(produto.id, 0)
+        return _resposta_lote(f'{quantidade} unidade(s) de "{produto.nome}" adicionada(s) ao estoque.',
+                              url_for('admin.listar_produtos'), linhas=[_linha('linha_produto')(produto, saldo)])
+    return redirect(url_for('admin.listar_produtos'))
+
+@bp.route('/movimentos-estoque/<int:produto_id>')
+@login_required
+def movimentos_estoque(produto_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    produto = Produto.query.get_or_404(produto_id)
+    # ?em=AAAA-MM-DD mostra também o estoque no fim daquele dia (UTC).
+    data = request.args.get('em', type=datetime.date.fromisoformat)
+    estoque_na_data = None
+    if data:
+        fim_do_dia = datetime.datetime.combine(data, datetime.time.max)
+        estoque_na_data = estoque.saldos([produto.id], em=fim_do_dia).get(produto.id, 0)
+    return render_template('admin/movimentos_estoque.html', produto=produto,
+                           movimentos=estoque.movimentos_do_produto(produto.id), nomes_motivo=estoque.NOMES_MOTIVO,
+                           estoque_atual=estoque.saldos([produto.id]).get(produto.id, 0),
+                           data=data, estoque_na_data=estoque_na_data)
+
+@bp.route('/excluir-produto/<int:produto_id>', methods=['POST'])
+@login_required
+def excluir_produto(produto_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    produto = Produto.query.get_or_404(produto_id)
+    if produto.imagem_url:
+        path = os.path.join(current_app.config['UPLOAD_FOLDER'], produto.imagem_url)
+        if os.path.exists(path):
+            os.remove(path)
+    db.session.delete(produto)
+    db.session.commit()
+    flash('Produto excluído com sucesso!', 'success')
+    return redirect(url_for('admin.listar_produtos'))
+
+@bp.route('/clientes')
+@login_required
+def listar_clientes():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    todos_clientes = Cliente.query.order_by(Cliente.nome).all()
+    return render_template('admin/listar_clientes.html', clientes=todos_clientes)
+
+@bp.route('/clientes/lote', methods=['POST'])
+@login_required
+def clientes_em_lote():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    voltar = url_for('admin.listar_clientes')
+    ids = _ids_do_formulario()
+    if request.form.get('acao') != 'excluir' or not ids:
+        return _resposta_lote('Selecione ao menos um cliente e uma ação.', voltar, categoria='danger')
+    # Clientes com pedidos (ativos ou arquivados) ficam: os pedidos dependem deles.
+    com_pedidos = {cliente_id for modelo in (Pedido, PedidoArquivado) for cliente_id, in
+                   db.session.query(modelo.cliente_id).filter(modelo.cliente_id.in_(ids)).distinct()}
+    ids = [cliente_id for cliente_id, in db.session.query(Cliente.id).filter(Cliente.id.in_(ids))
+           if cliente_id not in com_pedidos]
+    db.session.execute(delete(Cliente.__table__).where(Cliente.id.in_(ids)))
+    db.session.commit()
+    mensagem = f'{len(ids)} cliente(s) excluído(s).'
+    if com_pedidos:
+        mensagem += f' {len(com_pedidos)} com pedidos foram mantidos.'
+    return _resposta_lote(mensagem, voltar, removidos=[f'cliente-{cliente_id}' for cliente_id in ids],
+                          categoria='warning' if com_pedidos else 'success')
+
+@bp.route('/adicionar-cliente', methods=['GET', 'POST'])
+@login_required
+def adicionar_cliente():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    if request.method == 'POST':
+        nome = request.form['nome']
+        contato = request.form.get('contato')
+        novo_cliente = Cliente(nome=nome, contato=contato)
+        db.session.add(novo_cliente)
+        db.session.commit()
+        flash('Cliente adicionado com sucesso!', 'success')
+        return redirect(url_for('admin.listar_clientes'))
+    return render_template('admin/adicionar_cliente.html')
+
+@bp.route('/editar-cliente/<int:cliente_id>', methods=['GET', 'POST'])
+@login_required
+def editar_cliente(cliente_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    cliente = Cliente.query.get_or_404(cliente_id)
+    if request.method == 'POST':
+        cliente.nome = request.form['nome']
+        cliente.contato = request.form.get('contato')
+        db.session.commit()
+        flash('Cliente atualizado com sucesso!', 'success')
+        return redirect(url_for('admin.listar_clientes'))
+    return render_template('admin/editar_cliente.html', cliente=cliente)
+
+@bp.route('/excluir-cliente/<int:cliente_id>', methods=['POST'])
+@login_required
+def excluir_cliente(cliente_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    cliente = Cliente.query.get_or_404(cliente_id)
+    db.session.delete(cliente)
+    db.session.commit()
+    flash('Cliente excluído com sucesso!', 'success')
+    return redirect(url_for('admin.listar_clientes'))
+
+# Status que o admin pode dar a um pedido (todo pedido nasce 'Recebido').
+STATUS_ALTERAVEIS = ['Em Produção', 'Disponível para Retirada', 'Concluído']
+
+@bp.route('/pedidos')
+@login_required
+def listar_pedidos():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    todos_pedidos = _consulta_pedidos().order_by(Pedido.data_pedido.asc()).all()
+    return render_template('admin/listar_pedidos.html', pedidos=todos_pedidos, status_alteraveis=STATUS_ALTERAVEIS)
+
+def _consulta_pedidos():
+    # Cliente, itens e produtos em três consultas, em vez de uma por pedido e por item.
+    return Pedido.query.options(joinedload(Pedido.cliente),
+                                selectinload(Pedido.itens).joinedload(ItemPedido.produto))
+
+@bp.route('/pedidos/lote', methods=['POST'])
+@login_required
+def pedidos_em_lote():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    voltar = url_for('admin.listar_pedidos')
+    ids = _ids_do_formulario()
+    acao = request.form.get('acao')
+    if not ids:
+        return _resposta_lote('Selecione ao menos um pedido.', voltar, categoria='danger')
+    if acao == 'status':
+        novo_status = request.form.get('novo_status')
+        if novo_status not in STATUS_ALTERAVEIS:
+            return _resposta_lote('Status inválido.', voltar, categoria='danger')
+        db.session.execute(update(Pedido.__table__).where(Pedido.id.in_(ids)).values(status=novo_status))
+        db.session.commit()
+        pedidos = _consulta_pedidos().filter(Pedido.id.in_(ids)).all()
+        return _resposta_lote(f'{len(pedidos)} pedido(s) alterado(s) para "{novo_status}".', voltar,
+                              linhas=[_linha('linha_pedido')(pedido) for pedido in pedidos])
+    if acao == 'excluir':
+        # Pedidos concluídos não são excluídos (a lista nem mostra o botão para eles).
+        ids = [pedido_id for pedido_id, in db.session.query(Pedido.id)
+               .filter(Pedido.id.in_(ids), Pedido.status != 'Concluído')]
+        itens = db.session.query(ItemPedido.pedido_id, ItemPedido.produto_id, ItemPedido.quantidade)\
+            .filter(ItemPedido.pedido_id.in_(ids)).all()
+        for pedido_id, produto_id, quantidade in itens:
+            estoque.movimentar(produto_id, quantidade, estoque.ESTORNO, pedido_id=pedido_id)
+        db.session.execute(delete(ItemPedido.__table__).where(ItemPedido.pedido_id.in_(ids)))
+        db.session.execute(delete(Pedido.__table__).where(Pedido.id.in_(ids)))
+        db.session.commit()
+        return _resposta_lote(f'{len(ids)} pedido(s) excluído(s).', voltar,
+                              removidos=[f'pedido-{pedido_id}' for pedido_id in ids])
+    return _resposta_lote('Ação inválida.', voltar, categoria='danger')
+
+@bp.route('/mudar-status-pedido/<int:pedido_id>', methods=['POST'])
+@login_required
+def mudar_status_pedido(pedido_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    pedido = Pedido.query.get_or_404(pedido_id)
+    novo_status = request.form['novo_status']
+    if novo_status in STATUS_ALTERAVEIS:
+        pedido.status = novo_status
+        db.session.commit()
+        flash(f'Status do Pedido #{pedido.id} alterado para "{novo_status}".', 'success')
+    else:
+        flash('Status inválido.', 'danger')
+    return redirect(url_for('admin.listar_pedidos'))
+
+@bp.route('/excluir-pedido/<int:pedido_id>', methods=['POST'])
+@login_required
+def excluir_pedido(pedido_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    pedido = Pedido.query.get_or_404(pedido_id)
+    # As unidades do pedido excluído voltam para o estoque.
+    for item in pedido.itens:
+        estoque.movimentar(item.produto_id, item.quantidade, estoque.ESTORNO, pedido_id=pedido.id)
+    db.session.delete(pedido)
+    db.session.commit()
+    flash(f'Pedido #{pedido.id} foi excluído com sucesso.', 'success')
+    return redirect(url_for('admin.listar_pedidos'))
+
+@bp.route('/admin/reunioes')
+@login_required
+def listar_reunioes():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    # A contagem usa só o índice (reuniao_id, usuario_id), sem carregar as presenças.
+    contagem = db.session.query(Presenca.reuniao_id, func.count(Presenca.id))\
+        .group_by(Presenca.reuniao_id).subquery()
+    reunioes = db.session.query(Reuniao, func.coalesce(contagem.c[1], 0))\
+        .outerjoin(contagem, contagem.c.reuniao_id == Reuniao.id)\
+        .order_by(Reuniao.data_reuniao.desc()).all()
+    return render_template('admin/listar_reunioes.html', reunioes=reunioes)
+
+@bp.route('/admin/reunioes/adicionar', methods=['GET', 'POST'])
+@login_required
+def adicionar_reuniao():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    if request.method == 'POST':
+        titulo = request.form['titulo']
+        data_reuniao = datetime.datetime.strptime(request.form['data_reuniao'], '%Y-%m-%dT%H:%M')
+        sala_jitsi = f"fraternoamor-{secure_filename(titulo).lower()[:40]}-{secrets.token_hex(4)}"
+        nova_reuniao = Reuniao(titulo=titulo, data_reuniao=data_reuniao, sala_jitsi=sala_jitsi)
+        db.session.add(nova_reuniao)
+        db.session.flush()
+        frequencia.garantir_resumos_reunioes([nova_reuniao.id])
+        db.session.commit()
+        flash('Reunião agendada com sucesso!', 'success')
+        return redirect(url_for('admin.listar_reunioes'))
+    return render_template('admin/adicionar_reuniao.html')
+
+def _data_do_formulario(texto):
+    return datetime.datetime.strptime(texto, '%Y-%m-%d')
+
+def _periodo_frequencia():
+    # Datas do formulário (AAAA-MM-DD); "até" inclui o dia inteiro. Data inválida vale como não preenchida.
+    inicio = request.args.get('de', None, type=_data_do_formulario)
+    fim = request.args.get('ate', None, type=_data_do_formulario)
+    de = inicio.strftime('%Y-%m-%d') if inicio else ''
+    ate = fim.strftime('%Y-%m-%d') if fim else ''
+    if fim:
+        fim += datetime.timedelta(days=1)
+    return de, ate, inicio, fim
+
+@bp.route('/admin/reunioes/frequencia')
+@login_required
+def relatorio_frequencia():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    de, ate, inicio, fim = _periodo_frequencia()
+    # Com 0 ou negativo, datas[-seguidas] pegaria a primeira reunião em vez da N-ésima mais recente.
+    ultimas = max(request.args.get('ultimas', 12, type=int), 1)
+    seguidas = max(request.args.get('seguidas', 3, type=int), 1)
+    return render_template('admin/relatorio_frequencia.html',
+                           de=de, ate=ate, ultimas=ultimas, seguidas=seguidas,
+                           categorias=frequencia.taxa_por_categoria(inicio, fim, ultimas),
+                           ausentes=frequencia.ausentes_seguidos(seguidas, fim))
+
+@bp.route('/admin/reunioes/frequencia.csv')
+@login_required
+def exportar_frequencia_csv():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    _, _, inicio, fim = _periodo_frequencia()
+
+    def gerar():
+        # Uma linha por vez: o período pode ter milhares de reuniões.
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['Data', 'Reunião', 'Categoria', 'Presentes', 'Membros', 'Frequência (%)'])
+        for data, titulo, categoria, presentes, membros in frequencia.linhas_por_reuniao(inicio, fim):
+            writer.writerow([data.strftime('%Y-%m-%d %H:%M'), titulo, categoria, presentes, membros,
+                             f'{presentes / membros * 100:.1f}' if membros else ''])
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+        yield output.getvalue()
+
+    return Response(stream_with_context(gerar()), mimetype="text/csv",
+                    headers={"Content-Disposition": "attachment;filename=frequencia_reunioes.csv"})
+
+@bp.route('/admin/reunioes/<int:reuniao_id>/presencas')
+@login_required
+def ver_presencas(reuniao_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    reuniao = Reuniao.query.get_or_404(reuniao_id)
+    presencas = Presenca.query.options(joinedload(Presenca.usuario))\
+        .filter(Presenca.reuniao_id == reuniao.id)\
+        .order_by(Presenca.data_presenca).all()
+    return render_template('admin/ver_presencas.html', reuniao=reuniao, presencas=presencas)
+
+@bp.route('/admin/materiais')
+@login_required
+def listar_materiais():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    materiais = MaterialDigital.query.order_by(MaterialDigital.id.desc()).all()
+    return render_template('admin/listar_materiais.html', materiais=materiais)
+
+@bp.route('/admin/materiais/excluir/<int:material_id>', methods=['POST'])
+@login_required
+def excluir_material(material_id):
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    material = MaterialDigital.query.get_or_404(material_id)
+    # A capa e o PDF ficam órfãos e saem na próxima `flask limpar-uploads`, depois da quarentena.
+    db.session.delete(material)
+    db.session.commit()
+    flash('Material excluído com sucesso!', 'success')
+    return redirect(url_for('admin.listar_materiais'))
+
+@bp.route('/admin/materiais/adicionar', methods=['GET', 'POST'])
+@login_required
+def adicionar_material():
+    if not current_user.is_admin:
+        return redirect(url_for('membro.dashboard'))
+    
+    # Busca as categorias para preencher os menus do formulário
+    categorias_material = CategoriaMaterial.query.order_by(CategoriaMaterial.nome).all()
+    categorias_usuario = CategoriaUsuario.query.all()
+
+    if request.method == 'POST':
+        titulo = request.form['titulo']
+        descricao = request.form.get('descricao')
+        categoria_id = request.form['categoria_id']
+        categoria_permissao_id = request.form.get('categoria_permissao_id')
+        
+        # --- Lógica de Upload de Arquivos ---
+        imagem_capa = request.files.get('imagem_capa')
+        arquivo_pdf = request.files.get('arquivo_pdf')
+
+        if not arquivo_pdf or arquivo_pdf.filename == '':
+            flash('O arquivo PDF é obrigatório!', 'danger')
+            return redirect(request.url)
+
+        nome_arquivo_capa = None
+        if imagem_capa and allowed_file(imagem_capa.filename):
+            secure_name = secure_filename(imagem_capa.filename)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+            nome_arquivo_capa = f"capa_{timestamp}_{secure_name}"
+            imagem_capa.save(os.path.join(current_app.config['UPLOAD_FOLDER'], nome_arquivo_capa))
+
+        secure_name_pdf = secure_filename(arquivo_pdf.filename)
+        timestamp_pdf = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        nome_arquivo_pdf = f"pdf_{timestamp_pdf}_{secure_name_pdf}"
+        arquivo_pdf.save(os.path.join(current_app.config['UPLOAD_FOLDER'], nome_arquivo_pdf))
+        # --- Fim da Lógica de Upload ---
+
+        novo_material = MaterialDigital(
+            titulo=titulo,
+            descricao=descricao,
+            categoria_id=categoria_id,
+            imagem_capa=nome_arquivo_capa,
+            arquivo_pdf=nome_arquivo_pdf,
+            categoria_permissao_id=categoria_permissao_id if categoria_permissao_id else None
+        )
+
+        db.session.add(novo_material)
+        db.session.commit()
+
+        flash('Material adicionado com sucesso!', 'success')
+        return redirect(url_for('admin.listar_materiais'))
+
+    return render_template('admin/adicionar_material.html', categorias_material=categorias_material, categorias_usuario=categorias_usuario)
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+
+from flask import Blueprint, current_app, jsonify, render_template, request, url_for
+from sqlalchemy.exc import IntegrityError
+
+from .. import admissao, catalogo, estoque, metricas
+from ..extensoes import db
+from ..modelos import Cliente, ItemPedido, Pedido, Produto
+
+bp = Blueprint('lanchonete', __name__)
+
+# Arquivos de static/ que o service worker guarda na instalação, junto com a página do cardápio.
+ARQUIVOS_OFFLINE = ['css/estilos.css', 'js/scripts.js', 'imagens/logo-branco.png', 'lanchonete.webmanifest']
+
+@bp.route('/lanchonete')
+def lanchonete():
+    # Os mesmos dados da API vão embutidos na página: o carrinho não precisa ler o HTML.
+    return render_template('lanchonete.html', catalogo=catalogo.montar())
+
+@bp.route('/lanchonete/catalogo')
+def catalogo_json():
+    """Produtos, estoque, status e aviso da lanchonete.
+
+    `?since=<versao>` devolve só os produtos alterados depois dela. Se nada mudou (mesma
+    versão em `since` ou no If-None-Match), responde 304 sem consultar o banco.
+    """
+    versao = catalogo.versao_atual()
+    desde = request.args.get('since', type=int)
+    if desde == versao or request.if_none_match.contains_weak(str(versao)):
+        resposta = current_app.response_class(status=304)
+    else:
+        dados = catalogo.montar(desde)
+        resposta = jsonify(dados)
+        versao = dados['versao']
+    resposta.set_etag(str(versao))
+    resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta
+
+@bp.route('/finalizar-pedido', methods=['POST'])
+def finalizar_pedido():
+    # Recusa antes de ler o corpo: o status vem do cache, sem tocar no banco.
+    if not admissao.lanchonete_aberta():
+        metricas.PEDIDOS_RECUSADOS.labels('fechada').inc()
+        return {'message': 'A lanchonete está fechada e não está aceitando pedidos no momento.'}, 409
+    dados = request.get_json()
+    nome_cliente = dados['nome_cliente']
+    carrinho = dados['carrinho']
+    chave = dados.get('chave_pedido')
+    try:
+        # Conferido antes de ocupar uma vaga: um carrinho inválido não espera na fila.
+        _validar_carrinho(carrinho)
+        if chave is not None and not (isinstance(chave, str) and 0 < len(chave) <= 64):
+            raise PedidoInvalido('Chave do pedido inválida.')
+        with admissao.vaga_para_pedido():
+            _, novo = _gravar_pedido(nome_cliente, carrinho, chave)
+    except PedidoInvalido as erro:
+        return {'message': str(erro)}, 400
+    except admissao.Sobrecarga:
+        metricas.PEDIDOS_RECUSADOS.labels('sobrecarga').inc()
+        resposta = jsonify(message='Estamos recebendo muitos pedidos agora. Tente novamente em instantes.')
+        resposta.status_code = 503
+        resposta.headers['Retry-After'] = str(current_app.config['PEDIDOS_RETRY_AFTER'])
+        return resposta
+    # Um reenvio do mesmo pedido recebe a mesma resposta, mas não conta de novo.
+    if novo:
+        metricas.PEDIDOS.inc()
+    return {'message': 'Pedido recebido com sucesso!'}
+
+class PedidoInvalido(ValueError):
+    pass
+
+def _quantidade_valida(valor):
+    # bool é subclasse de int no Python: `true` no JSON não pode virar uma unidade.
+    return isinstance(valor, int) and not isinstance(valor, bool) and valor >= 1
+
+def _validar_carrinho(carrinho):
+    """Levanta PedidoInvalido se algum item não tiver id de produto e quantidade inteira a partir de 1."""
+    if not isinstance(carrinho, list):
+        raise PedidoInvalido('Carrinho inválido.')
+    for item in carrinho:
+        if not isinstance(item, dict) or not _quantidade_valida(item.get('quantidade')):
+            raise PedidoInvalido('Cada item do carrinho precisa de uma quantidade inteira a partir de 1.')
+        try:
+            int(item.get('id'))
+        except (TypeError, ValueError):
+            raise PedidoInvalido('Produto inválido no carrinho.') from None
+
+def _gravar_pedido(nome_cliente, carrinho, chave=None):
+    """Grava o pedido e retorna (pedido, novo).
+
+    Se `chave` já foi usada (o navegador reenviou um pedido que chegou a ser gravado, por
+    exemplo pela fila offline), retorna o pedido existente com novo=False, sem gravar nada.
+    """
+    # Nada é gravado (nem cliente, nem estoque) se o carrinho tiver algum item inválido.
+    _validar_carrinho(carrinho)
+    if chave:
+        existente = Pedido.query.filter_by(chave_idempotencia=chave).first()
+        if existente:
+            return existente, False
+    # Um commit só: o lock de escrita do SQLite fica preso pelo menor tempo possível.
+    cliente = Cliente.query.filter_by(nome=nome_cliente).first()
+    if not cliente:
+        cliente = Cliente(nome=nome_cliente)
+        db.session.add(cliente)
+        db.session.flush()
+    novo_pedido = Pedido(cliente_id=cliente.id, valor_total_centavos=0, chave_idempotencia=chave or None)
+    db.session.add(novo_pedido)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # Outro worker gravou a mesma chave entre a conferência acima e este flush.
+        db.session.rollback()
+        return Pedido.query.filter_by(chave_idempotencia=chave).one(), False
+    # O estoque é lido depois do primeiro flush, com o lock de escrita já na mão: nenhum
+    # outro pedido consegue vender as mesmas unidades entre a leitura e a gravação.
+    ids = [int(item['id']) for item in carrinho]
+    produtos = {produto.id: produto for produto in Produto.query.filter(Produto.id.in_(ids))}
+    disponivel = estoque.saldos(ids)
+    # O total sai dos preços do banco, em centavos, e só dos itens aceitos: o preço que
+    # o navegador mandou (ou que ficou numa fila offline) é ignorado.
+    for produto_id, item in zip(ids, carrinho):
+        produto = produtos.get(produto_id)
+        # Já passou por _quantidade_valida: o int() só garante que o total continue em centavos inteiros.
+        quantidade = int(item['quantidade'])
+        if produto and disponivel.get(produto_id, 0) >= quantidade:
+            novo_item = ItemPedido(pedido_id=novo_pedido.id, produto_id=produto.id, quantidade=quantidade, preco_unitario_centavos=produto.preco_centavos)
+            db.session.add(novo_item)
+            disponivel[produto_id] -= quantidade
+            estoque.movimentar(produto_id, -quantidade, estoque.VENDA, pedido_id=novo_pedido.id)
+            novo_pedido.valor_total_centavos += produto.preco_centavos * quantidade
+    db.session.commit()
+    return novo_pedido, True
+
+@bp.route('/sw-lanchonete.js')
+def service_worker():
+    # Servido na raiz (e não em /static) para poder controlar a página /lanchonete.
+    precache = [url_for('lanchonete.lanchonete')] + [url_for('static', filename=arquivo) for arquivo in ARQUIVOS_OFFLINE]
+    # A versão muda junto com qualquer arquivo guardado ou com o próprio service worker;
+    # a troca de versão descarta o cache antigo no navegador.
+    caminhos = [os.path.join(current_app.static_folder, arquivo) for arquivo in ARQUIVOS_OFFLINE]
+    caminhos.append(os.path.join(current_app.root_path, current_app.template_folder, 'sw_lanchonete.js'))
+    assinatura = json.dumps([precache, [os.stat(c).st_mtime_ns for c in caminhos if os.path.exists(c)]])
+    versao = hashlib.sha256(assinatura.encode()).hexdigest()[:10]
+    resposta = current_app.response_class(
+        render_template('sw_lanchonete.js', versao=versao, precache=precache), mimetype='text/javascript')
+    # O navegador precisa sempre conferir se há uma versão nova do service worker.
+    resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta
@@ -0,0 +1,165 @@
+import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_user, logout_user, login_required, current_user
+from sqlalchemy import or_
+
+from .. import metricas, videos
+from ..extensoes import db, bcrypt
+from ..modelos import Aviso, CategoriaUsuario, Curso, MaterialDigital, Presenca, Reuniao, Usuario
+from ..presencas import ANTECEDENCIA_CHECKIN, DURACAO_REUNIAO, aceita_checkin, buffer_presencas
+from ..progresso import buffer_progresso, progresso_do_membro
+
+bp = Blueprint('membro', __name__)
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('membro.dashboard'))
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        usuario = Usuario.query.filter_by(username=username).first()
+        if usuario and bcrypt.check_password_hash(usuario.password_hash, password):
+            login_user(usuario)
+            metricas.LOGINS.inc()
+            next_page = request.args.get('next')
+            return redirect(next_page or url_for('membro.dashboard'))
+        else:
+            metricas.LOGINS_FALHOS.inc()
+            flash('Login inválido. Verifique seu nome de usuário e senha.', 'danger')
+    return render_template('login.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('Você saiu com sucesso.', 'info')
+    return redirect(url_for('publico.home'))
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    # --- Lógica de Permissão (Buscando o nível e as categorias do usuário) ---
+    max_user_level = 0
+    user_category_ids = []
+    if current_user.categorias:
+        max_user_level = max(cat.nivel for cat in current_user.categorias)
+        user_category_ids = [cat.id for cat in current_user.categorias]
+
+    categorias_acessiveis_ids = [
+        cat.id for cat in CategoriaUsuario.query.filter(CategoriaUsuario.nivel <= max_user_level).all()
+    ]
+
+    # --- Busca de Cursos Permitidos ---
+    cursos_permitidos = Curso.query.filter(
+        or_(Curso.categoria_permissao_id == None, Curso.categoria_permissao_id.in_(categorias_acessiveis_ids))
+    ).all()
+    
+    cursos_por_categoria = {}
+    for curso in cursos_permitidos:
+        if curso.categoria.nome not in cursos_por_categoria:
+            cursos_por_categoria[curso.categoria.nome] = []
+        cursos_por_categoria[curso.categoria.nome].append(curso)
+
+    # --- Busca de Materiais Permitidos ---
+    materiais_permitidos = MaterialDigital.query.filter(
+        or_(MaterialDigital.categoria_permissao_id == None, MaterialDigital.categoria_permissao_id.in_(categorias_acessiveis_ids))
+    ).all()
+
+    materiais_por_categoria = {}
+    for material in materiais_permitidos:
+        if material.categoria.nome not in materiais_por_categoria:
+            materiais_por_categoria[material.categoria.nome] = []
+        materiais_por_categoria[material.categoria.nome].append(material)
+
+    # --- LÓGICA DE BUSCA DE AVISO ---
+    # Busca o aviso mais recente que seja para todos (NULL) ou para um dos grupos do usuário.
+    aviso = Aviso.query.filter(
+        or_(Aviso.categoria_permissao_id == None, Aviso.categoria_permissao_id.in_(user_category_ids))
+    ).order_by(Aviso.data_criacao.desc()).first()
+
+    # LINHA FALTANTE ADICIONADA AQUI
+    # Ela cria a variável 'aviso_final' com base no que foi encontrado no banco.
+    aviso_final = aviso.mensagem if aviso else "Nenhum aviso importante no momento."
+
+    # --- Reuniões em andamento ou próximas ---
+    agora = datetime.datetime.now()
+    reunioes = Reuniao.query.filter(Reuniao.data_reuniao >= agora - DURACAO_REUNIAO)\
+        .order_by(Reuniao.data_reuniao).limit(5).all()
+    ids_com_presenca = {
+        reuniao_id for (reuniao_id,) in db.session.query(Presenca.reuniao_id).filter(
+            Presenca.usuario_id == current_user.id, Presenca.reuniao_id.in_([r.id for r in reunioes]))
+    } if reunioes else set()
+    
+    return render_template('dashboard_membro.html', 
+                           cursos_por_categoria=cursos_por_categoria, 
+                           materiais_por_categoria=materiais_por_categoria, 
+                           aviso=aviso_final,
+                           reunioes=reunioes,
+                           ids_com_presenca=ids_com_presenca)
+
+@bp.route('/reuniao/<int:reuniao_id>/presenca', methods=['POST'])
+@login_required
+def registrar_presenca(reuniao_id):
+    reuniao = Reuniao.query.get_or_404(reuniao_id)
+    if not aceita_checkin(reuniao):
+        mensagem = (f'O check-in só é aceito de {ANTECEDENCIA_CHECKIN.seconds // 60} minutos antes do início '
+                    'até o fim da reunião.')
+        if request.is_json:
+            return {'message': mensagem, 'reuniao_id': reuniao.id}, 409
+        flash(mensagem, 'warning')
+        return redirect(url_for('membro.dashboard'))
+    # O check-in vai para o buffer e é gravado em lote; repetir é inofensivo.
+    buffer_presencas.registrar(current_user.id, reuniao.id)
+    if request.is_json:
+        return {'message': 'Presença registrada.', 'reuniao_id': reuniao.id}, 202
+    return redirect(f'https://meet.jit.si/{reuniao.sala_jitsi}')
+
+@bp.route('/curso/<int:curso_id>')
+@login_required
+def ver_curso(curso_id):
+    curso = Curso.query.get_or_404(curso_id)
+    progresso = progresso_do_membro(current_user.id, curso.id)
+    # Retoma de onde o membro parou, a menos que já tenha chegado ao fim.
+    inicio = 0
+    if progresso and progresso['posicao'] < progresso['duracao'] - 10:
+        inicio = progresso['posicao']
+    embed_url = videos.url_embed(curso.video_provedor, curso.video_id, inicio)
+    return render_template('ver_curso.html', curso=curso, embed_url=embed_url, progresso=progresso)
+
+@bp.route('/curso/<int:curso_id>/progresso', methods=['POST'])
+@login_required
+def registrar_progresso(curso_id):
+    dados = request.get_json(silent=True) or {}
+    try:
+        posicao = float(dados['posicao'])
+        duracao = float(dados['duracao'])
+    except (KeyError, TypeError, ValueError):
+        return {'message': 'Informe posicao e duracao em segundos.'}, 400
+    if not (0 <= posicao <= duracao + 5) or not (0 < duracao < 24 * 3600):
+        return {'message': 'Posição ou duração inválida.'}, 400
+    # Só leitura aqui (barata com WAL); a escrita vai para o buffer e sai em lote.
+    if not db.session.query(Curso.id).filter_by(id=curso_id).scalar():
+        return {'message': 'Curso não encontrado.'}, 404
+    buffer_progresso.registrar(current_user.id, curso_id, min(posicao, duracao), duracao)
+    return '', 204
+
+@bp.route('/alterar-senha', methods=['GET', 'POST'])
+@login_required
+def alterar_senha():
+    if request.method == 'POST':
+        senha_atual = request.form['senha_atual']
+        nova_senha = request.form['nova_senha']
+        confirmar_senha = request.form['confirmar_senha']
+        if not bcrypt.check_password_hash(current_user.password_hash, senha_atual):
+            flash('Sua senha atual está incorreta.', 'danger')
+            return redirect(url_for('membro.alterar_senha'))
+        if nova_senha != confirmar_senha:
+            flash('A nova senha e a confirmação não coincidem.', 'danger')
+            return redirect(url_for('membro.alterar_senha'))
+        hashed_password = bcrypt.generate_password_hash(nova_senha).decode('utf-8')
+        current_user.password_hash = hashed_password
+        db.session.commit()
+        flash('Sua senha foi alterada com sucesso!', 'success')
+        return redirect(url_for('membro.dashboard'))
+    return render_template('admin/alterar_senha.html')
@@ -0,0 +1,42 @@
+from flask import Blueprint, render_template
+
+from .. import invalidacao
+from ..modelos import Configuracao
+
+bp = Blueprint('publico', __name__)
+
+# Conteúdo das páginas editáveis, por processo; esvaziado quando a tabela configuracao muda.
+_paginas = invalidacao.cache('configuracao')
+
+
+def _pagina(chave):
+    if chave not in _paginas:
+        registro = Configuracao.query.filter_by(chave=chave).first()
+        _paginas[chave] = {'valor': registro.valor} if registro else None
+    return _paginas[chave]
+
+@bp.route('/')
+def home():
+    return render_template('index.html')
+
+@bp.route('/historia')
+def historia():
+    return render_template('nossa-historia.html')
+
+@bp.route('/identidade')
+def identidade():
+    return render_template('nossa-identidade.html')
+
+@bp.route('/contato')
+def contato():
+    return render_template('contato.html')
+
+@bp.route('/itinerario')
+def itinerario():
+    conteudo = _pagina('itinerario')
+    return render_template('pagina_generica.html', titulo="Itinerário de Vida Fraterna", conteudo=conteudo)
+
+@bp.route('/projetos')
+def projetos():
+    conteudo = _pagina('projets')
+    return render_template('pagina_generica.html', titulo="Projetos", conteudo=conteudo)
@@ -0,0 +1,306 @@
+import csv
+import datetime
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+
+from flask import current_app
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.exc import OperationalError
+from werkzeug.utils import secure_filename
+
+from . import arquivamento, dinheiro, frequencia
+from .extensoes import db
+from .modelos import Cliente, Tarefa
+
+# Tarefas demoradas do painel rodam fora do gunicorn: a rota só grava uma linha em `tarefa`
+# (enfileirar) e responde na hora; o `flask trabalhar-tarefas`, num processo à parte, pega
+# as pendentes, executa e grava o progresso e o resultado. Falhas voltam para a fila com
+# espera crescente (TAREFAS_ESPERA_BASE * 2^tentativa) até max_tentativas.
+#
+# O controle da fila usa conexões próprias (db.engine.begin()), separadas da sessão que a
+# função da tarefa usa para o trabalho em si.
+
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+FALHOU = 'falhou'
+NOMES_STATUS = {PENDENTE: 'Na fila', EXECUTANDO: 'Executando', CONCLUIDA: 'Concluída', FALHOU: 'Falhou'}
+
+# Tipo -> (função, descrição, tentativas). Preenchido pelo decorador `tarefa`.
+TIPOS = {}
+
+
+def tarefa(tipo, descricao, tentativas=3):
+    """Registra a função como tarefa `tipo`. Ela recebe uma Execucao e pode devolver uma mensagem."""
+    def registrar(funcao):
+        TIPOS[tipo] = (funcao, descricao, tentativas)
+        return funcao
+    return registrar
+
+
+def pasta_resultados():
+    pasta = current_app.config['TAREFAS_RESULTADOS_FOLDER']
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def enfileirar(tipo, usuario_id=None, **parametros):
+    """Põe uma tarefa na fila e retorna o registro. `parametros` precisa ser serializável em JSON."""
+    _, _, tentativas = TIPOS[tipo]
+    registro = Tarefa(tipo=tipo, parametros=json.dumps(parametros), max_tentativas=tentativas, usuario_id=usuario_id)
+    db.session.add(registro)
+    db.session.commit()
+    return registro
+
+
+def _agora():
+    return datetime.datetime.utcnow()
+
+
+def _atualizar(tarefa_id, **valores):
+    with db.engine.begin() as conexao:
+        conexao.execute(update(Tarefa.__table__).where(Tarefa.__table__.c.id == tarefa_id).values(**valores))
+
+
+class Execucao:
+    """O que a função da tarefa recebe: os parâmetros, o relato de progresso e o arquivo de resultado."""
+
+    def __init__(self, tarefa_id, parametros):
+        self.id = tarefa_id
+        self.parametros = parametros
+        self.resultado = None
+        self._ultimo_relato = 0.0
+
+    def progresso(self, percentual, mensagem=None):
+        """Grava o percentual (0 a 100) e uma mensagem, no máximo uma vez por TAREFAS_INTERVALO_PROGRESSO.
+
+        Serve também de sinal de vida do trabalhador. Chame fora de uma transação de escrita
+        da sessão: a gravação vai por outra conexão e esperaria o lock.
+        """
+        agora = time.monotonic()
+        if agora - self._ultimo_relato < current_app.config['TAREFAS_INTERVALO_PROGRESSO']:
+            return
+        self._ultimo_relato = agora
+        valores = {'progresso': max(0, min(100, int(percentual))), 'atualizada_em': _agora()}
+        if mensagem is not None:
+            valores['mensagem'] = mensagem[:200]
+        try:
+            _atualizar(self.id, **valores)
+        except OperationalError:
+            current_app.logger.warning('Progresso da tarefa %s não gravado (banco ocupado).', self.id)
+
+    def arquivo(self, nome):
+        """Caminho onde gravar o arquivo de resultado, que o painel oferece para download."""
+        self.resultado = f'{self.id}_{secure_filename(nome)}'
+        return os.path.join(pasta_resultados(), self.resultado)
+
+
+class _SinalDeVida(threading.Thread):
+    """Renova `atualizada_em` a cada TAREFAS_INTERVALO_SINAL segundos enquanto a tarefa roda.
+
+    Sem isso uma tarefa longa que não chama `progresso` seria tomada por perdida em _manutencao.
+    """
+
+    def __init__(self, tarefa_id):
+        super().__init__(name=f'sinal-tarefa-{tarefa_id}', daemon=True)
+        self.tarefa_id = tarefa_id
+        self.intervalo = current_app.config['TAREFAS_INTERVALO_SINAL']
+        # A thread não tem o contexto da aplicação: leva o engine e o logger prontos.
+        self.engine = db.engine
+        self.logger = current_app.logger
+        self.parar = threading.Event()
+
+    def run(self):
+        tabela = Tarefa.__table__
+        while not self.parar.wait(self.intervalo):
+            try:
+                with self.engine.begin() as conexao:
+                    # Se a manutenção já devolveu a tarefa à fila, o sinal não a ressuscita.
+                    conexao.execute(update(tabela).where(tabela.c.id == self.tarefa_id, tabela.c.status == EXECUTANDO)
+                                    .values(atualizada_em=_agora()))
+            except OperationalError:
+                self.logger.warning('Sinal de vida da tarefa %s não gravado (banco ocupado).', self.tarefa_id)
+
+    def encerrar(self):
+        self.parar.set()
+        self.join()
+
+
+def _reservar(trabalhador):
+    """Marca a próxima tarefa pendente como desta execução e a retorna (None se a fila estiver vazia)."""
+    tabela = Tarefa.__table__
+    agora = _agora()
+    disponivel = (tabela.c.status == PENDENTE) & (tabela.c.executar_em <= agora)
+    # Fila vazia é o caso comum: confere com uma leitura antes de pedir o lock de escrita.
+    with db.engine.connect() as conexao:
+        if not conexao.execute(select(exists().where(disponivel))).scalar():
+            return None
+    proxima = select(tabela.c.id).where(disponivel).order_by(tabela.c.executar_em, tabela.c.id).limit(1)
+    with db.engine.begin() as conexao:
+        # Um UPDATE só: dois trabalhadores nunca pegam a mesma tarefa.
+        return conexao.execute(
+            update(tabela).where(tabela.c.id == proxima.scalar_subquery())
+            .values(status=EXECUTANDO, trabalhador=trabalhador, tentativas=tabela.c.tentativas + 1,
+                    progresso=0, mensagem=None, atualizada_em=agora)
+            .returning(tabela.c.id, tabela.c.tipo, tabela.c.parametros, tabela.c.tentativas,
+                       tabela.c.max_tentativas)).first()
+
+
+def _executar(linha):
+    funcao, _, _ = TIPOS.get(linha.tipo, (None, None, None))
+    execucao = Execucao(linha.id, json.loads(linha.parametros))
+    sinal = _SinalDeVida(linha.id)
+    sinal.start()
+    try:
+        if funcao is None:
+            raise LookupError(f'Tipo de tarefa desconhecido: {linha.tipo}')
+        mensagem = funcao(execucao)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        erro = traceback.format_exc()
+        current_app.logger.exception('Tarefa %s (%s) falhou na tentativa %d.', linha.id, linha.tipo, linha.tentativas)
+        if linha.tentativas < linha.max_tentativas:
+            config = current_app.config
+            espera = min(config['TAREFAS_ESPERA_BASE'] * 2 ** (linha.tentativas - 1), config['TAREFAS_ESPERA_MAXIMA'])
+            _atualizar(linha.id, status=PENDENTE, erro=erro, executar_em=_agora() + datetime.timedelta(seconds=espera),
+                       mensagem=f'Tentativa {linha.tentativas} falhou; nova tentativa em {espera} s.')
+        else:
+            _atualizar(linha.id, status=FALHOU, erro=erro, concluida_em=_agora(),
+                       mensagem=f'Falhou após {linha.tentativas} tentativa(s).')
+        return False
+    finally:
+        sinal.encerrar()
+        db.session.remove()
+    _atualizar(linha.id, status=CONCLUIDA, progresso=100, erro=None, concluida_em=_agora(),
+               arquivo_resultado=execucao.resultado, mensagem=(mensagem or 'Concluída.')[:200])
+    return True
+
+
+def _manutencao():
+    """Devolve à fila as tarefas de trabalhadores que morreram e apaga as antigas e seus arquivos."""
+    config = current_app.config
+    tabela = Tarefa.__table__
+    agora = _agora()
+    travada = (tabela.c.status == EXECUTANDO) & (
+        tabela.c.atualizada_em < agora - datetime.timedelta(seconds=config['TAREFAS_PRAZO_SEM_SINAL']))
+    antiga = tabela.c.status.in_((CONCLUIDA, FALHOU)) & (
+        tabela.c.concluida_em < agora - datetime.timedelta(days=config['TAREFAS_RETENCAO_DIAS']))
+    with db.engine.begin() as conexao:
+        conexao.execute(update(tabela).where(travada, tabela.c.tentativas >= tabela.c.max_tentativas)
+                        .values(status=FALHOU, concluida_em=agora, mensagem='O trabalhador parou de responder.'))
+        conexao.execute(update(tabela).where(travada)
+                        .values(status=PENDENTE, executar_em=agora, mensagem='O trabalhador parou de responder; de volta à fila.'))
+        arquivos = [nome for nome, in conexao.execute(
+            select(tabela.c.arquivo_resultado).where(antiga, tabela.c.arquivo_resultado != None))]  # noqa: E711
+        conexao.execute(delete(tabela).where(antiga))
+    for nome in arquivos:
+        caminho = os.path.join(pasta_resultados(), nome)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+
+def trabalhar(uma_vez=False):
+    """Pega e executa tarefas até receber SIGTERM/SIGINT ou, com `uma_vez`, até a fila esvaziar.
+
+    O sinal não interrompe a tarefa em andamento: ela termina e o laço para em seguida.
+    Retorna quantas tarefas foram executadas.
+    """
+    config = current_app.config
+    nome = f'{socket.gethostname()}:{os.getpid()}'[:50]
+    parar = []
+    for sinal in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sinal, lambda *_: parar.append(True))
+    executadas, proxima_manutencao = 0, 0.0
+    while not parar:
+        if time.monotonic() >= proxima_manutencao:
+            _manutencao()
+            proxima_manutencao = time.monotonic() + 60
+        linha = _reservar(nome)
+        if linha is None:
+            if uma_vez:
+                break
+            time.sleep(config['TAREFAS_INTERVALO'])
+            continue
+        _executar(linha)
+        executadas += 1
+    return executadas
+
+
+def _trabalhador_filho(app, uma_vez):
+    with app.app_context():
+        # As conexões do processo pai não podem ser usadas depois do fork.
+        db.engine.dispose(close=False)
+        trabalhar(uma_vez)
+
+
+def iniciar(processos=1, uma_vez=False):
+    """Roda `processos` trabalhadores (processos filhos, se mais de um) até serem parados."""
+    if processos <= 1:
+        return trabalhar(uma_vez)
+    app = current_app._get_current_object()
+    db.engine.dispose()
+    contexto = multiprocessing.get_context('fork')
+    filhos = [contexto.Process(target=_trabalhador_filho, args=(app, uma_vez), name=f'tarefas-{numero}')
+              for numero in range(processos)]
+    for filho in filhos:
+        filho.start()
+
+    def repassar(*_):
+        for filho in filhos:
+            if filho.is_alive():
+                filho.terminate()
+    signal.signal(signal.SIGTERM, repassar)
+    signal.signal(signal.SIGINT, repassar)
+    for filho in filhos:
+        filho.join()
+
+
+# --- Tarefas disponíveis no painel ---
+
+@tarefa('exportar_pedidos', 'Exportar todos os pedidos, inclusive os arquivados (CSV)')
+def _exportar_pedidos(execucao):
+    pedidos = arquivamento.pedidos_todos()
+    total = db.session.query(func.count()).select_from(pedidos).scalar() or 0
+    consulta = db.session.query(pedidos.c.id, pedidos.c.data_pedido, Cliente.nome, pedidos.c.status,
+                                pedidos.c.valor_total_centavos)\
+        .outerjoin(Cliente, Cliente.id == pedidos.c.cliente_id).order_by(pedidos.c.id).yield_per(1000)
+    with open(execucao.arquivo('pedidos.csv'), 'w', newline='', encoding='utf-8') as arquivo:
+        writer = csv.writer(arquivo)
+        writer.writerow(['ID', 'Data', 'Cliente', 'Status', 'Valor (R$)'])
+        for numero, pedido in enumerate(consulta, start=1):
+            writer.writerow([pedido.id, pedido.data_pedido.strftime('%Y-%m-%d %H:%M'), pedido.nome or '',
+                             pedido.status, dinheiro.reais(pedido.valor_total_centavos)])
+            if numero % 1000 == 0:
+                execucao.progresso(numero * 100 / total, f'{numero} de {total} pedidos')
+    return f'{total} pedido(s) exportado(s).'
+
+
+@tarefa('recalcular_frequencia', 'Recalcular os resumos de frequência das reuniões')
+def _recalcular_frequencia(execucao):
+    quantidades = frequencia.recalcular()
+    return ', '.join(f'{nome}: {quantidade}' for nome, quantidade in quantidades.items())
+
+
+@tarefa('arquivar_pedidos', 'Arquivar os pedidos concluídos antigos', tentativas=1)
+def _arquivar_pedidos(execucao):
+    return f'{arquivamento.arquivar_pedidos()} pedido(s) arquivado(s).'
+
+
+def init_app(app):
+    app.config.setdefault('TAREFAS_RESULTADOS_FOLDER', os.path.join(app.instance_path, 'resultados_tarefas'))
+    app.config.setdefault('TAREFAS_INTERVALO', 1.0)
+    app.config.setdefault('TAREFAS_INTERVALO_PROGRESSO', 1.0)
+    app.config.setdefault('TAREFAS_ESPERA_BASE', 30)
+    app.config.setdefault('TAREFAS_ESPERA_MAXIMA', 3600)
+    # O trabalhador renova a tarefa em execução a cada TAREFAS_INTERVALO_SINAL segundos; uma
+    # "executando" sem sinal há mais que TAREFAS_PRAZO_SEM_SINAL é dada como perdida e volta para a fila.
+    app.config.setdefault('TAREFAS_INTERVALO_SINAL', 60)
+    app.config.setdefault('TAREFAS_PRAZO_SEM_SINAL', 900)
+    app.config.setdefault('TAREFAS_RETENCAO_DIAS', 7)
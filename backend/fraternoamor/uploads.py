@@ -0,0 +1,120 @@
+import os
+import shutil
+import time
+
+from flask import current_app
+
+from .extensoes import db
+from .modelos import Curso, MaterialDigital, Produto
+
+# Toda coluna que guarda o nome de um arquivo em static/uploads. Arquivo que nenhuma delas
+# cita é órfão: sobra de exclusão que falhou, de imagem trocada ou de formulário que deu
+# erro depois do upload.
+COLUNAS = (
+    ('Produtos', Produto.imagem_url),
+    ('Cursos', Curso.imagem_thumbnail),
+    ('Cursos', Curso.arquivo_anexo),
+    ('Cursos', Curso.video_poster),
+    ('Biblioteca', MaterialDigital.imagem_capa),
+    ('Biblioteca', MaterialDigital.arquivo_pdf),
+)
+
+
+def _pasta_uploads():
+    return current_app.config['UPLOAD_FOLDER']
+
+
+def _pasta_quarentena():
+    # Fora de static/, para os arquivos em quarentena não continuarem acessíveis pelo site.
+    pasta = current_app.config['UPLOADS_QUARENTENA_FOLDER']
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def _arquivos(pasta):
+    """Nome -> os.stat_result dos arquivos comuns da pasta (sem subpastas nem ocultos)."""
+    if not os.path.isdir(pasta):
+        return {}
+    return {entrada.name: entrada.stat() for entrada in os.scandir(pasta)
+            if entrada.is_file() and not entrada.name.startswith('.')}
+
+
+def referenciados():
+    """Nome do arquivo -> rótulo do modelo que o usa, para todas as COLUNAS."""
+    usados = {}
+    for rotulo, coluna in COLUNAS:
+        for nome, in db.session.query(coluna).filter(coluna != None, coluna != ''):  # noqa: E711
+            usados.setdefault(nome, rotulo)
+    return usados
+
+
+def coletar(dias=None, simular=False):
+    """Põe em quarentena os uploads órfãos e apaga os que estão lá há mais de `dias` dias.
+
+    Arquivos gravados há menos de UPLOADS_IDADE_MINIMA segundos são ignorados: podem ser de
+    um formulário que ainda não fez commit. Um arquivo em quarentena que voltou a ser
+    usado (ex.: depois de restaurar um backup) volta para uploads. Retorna os nomes de cada caso.
+    """
+    config = current_app.config
+    dias = config['UPLOADS_QUARENTENA_DIAS'] if dias is None else dias
+    agora = time.time()
+    usados = referenciados()
+    uploads, quarentena = _pasta_uploads(), _pasta_quarentena()
+    resultado = {'quarentena': [], 'restaurados': [], 'apagados': [], 'bytes_apagados': 0}
+
+    for nome, info in _arquivos(uploads).items():
+        if nome not in usados and agora - info.st_mtime > config['UPLOADS_IDADE_MINIMA']:
+            resultado['quarentena'].append(nome)
+            if not simular:
+                destino = os.path.join(quarentena, nome)
+                shutil.move(os.path.join(uploads, nome), destino)
+                # A data de modificação passa a marcar a entrada na quarentena.
+                os.utime(destino)
+
+    for nome, info in _arquivos(quarentena).items():
+        if nome in resultado['quarentena']:
+            continue
+        if nome in usados:
+            resultado['restaurados'].append(nome)
+            if not simular:
+                shutil.move(os.path.join(quarentena, nome), os.path.join(uploads, nome))
+        elif agora - info.st_mtime > dias * 86400:
+            resultado['apagados'].append(nome)
+            resultado['bytes_apagados'] += info.st_size
+            if not simular:
+                os.remove(os.path.join(quarentena, nome))
+    return resultado
+
+
+def uso_por_modelo():
+    """Espaço ocupado pelos uploads, por modelo, mais órfãos e quarentena.
+
+    Lista de dicts com rótulo, arquivos, bytes e `ausentes` (citados no banco mas sem arquivo).
+    """
+    arquivos = _arquivos(_pasta_uploads())
+    linhas = {}
+    vistos = set()
+    for rotulo, coluna in COLUNAS:
+        linha = linhas.setdefault(rotulo, {'rotulo': rotulo, 'arquivos': 0, 'bytes': 0, 'ausentes': 0})
+        for nome, in db.session.query(coluna).filter(coluna != None, coluna != ''):  # noqa: E711
+            if nome in vistos:
+                continue
+            vistos.add(nome)
+            if nome in arquivos:
+                linha['arquivos'] += 1
+                linha['bytes'] += arquivos[nome].st_size
+            else:
+                linha['ausentes'] += 1
+    orfaos = [info.st_size for nome, info in arquivos.items() if nome not in vistos]
+    em_quarentena = [info.st_size for info in _arquivos(_pasta_quarentena()).values()]
+    return list(linhas.values()) + [
+        {'rotulo': 'Órfãos (ainda em uploads)', 'arquivos': len(orfaos), 'bytes': sum(orfaos), 'ausentes': 0},
+        {'rotulo': 'Em quarentena', 'arquivos': len(em_quarentena), 'bytes': sum(em_quarentena), 'ausentes': 0},
+    ]
+
+
+def init_app(app):
+    app.config.setdefault('UPLOADS_QUARENTENA_FOLDER', os.path.join(app.instance_path, 'uploads_quarentena'))
+    app.config.setdefault('UPLOADS_QUARENTENA_DIAS', 7)
+    # Um upload mais novo que isso pode ser de uma requisição que ainda não gravou o registro.
+    app.config.setdefault('UPLOADS_IDADE_MINIMA', 3600)
@@ -0,0 +1,96 @@
+import json
+import os
+import re
+import urllib.parse
+import urllib.request
+
+from flask import current_app
+
+# Como montar o player de cada provedor a partir do ID do vídeo. O autoplay é
+# seguro porque o iframe só é criado depois do clique do membro (ver ver_curso.html);
+# enablejsapi deixa o YouTube enviar a posição do vídeo por postMessage.
+URLS_EMBED = {
+    'youtube': 'https://www.youtube-nocookie.com/embed/{id}?autoplay=1&rel=0&enablejsapi=1&start={inicio}',
+    'vimeo': 'https://player.vimeo.com/video/{id}?autoplay=1#t={inicio}s',
+}
+
+_ID_YOUTUBE = re.compile(r'^[A-Za-z0-9_-]{6,20}$')
+TEMPO_LIMITE_POSTER = 5
+
+
+def url_embed(provedor, video_id, inicio=0):
+    if provedor in URLS_EMBED:
+        return URLS_EMBED[provedor].format(id=video_id, inicio=int(inicio))
+    return None
+
+
+def extrair_video(link):
+    """Retorna (provedor, video_id) de um link do YouTube ou Vimeo, ou (None, None)."""
+    link = (link or '').strip()
+    if link and '://' not in link:
+        link = 'https://' + link
+    try:
+        url = urllib.parse.urlparse(link)
+    except ValueError:
+        return None, None
+    host = (url.hostname or '').lower().removeprefix('www.').removeprefix('m.')
+    partes = [p for p in url.path.split('/') if p]
+
+    video_id = None
+    if host in ('youtube.com', 'youtube-nocookie.com'):
+        if partes[:1] == ['watch']:
+            video_id = urllib.parse.parse_qs(url.query).get('v', [None])[0]
+        elif len(partes) >= 2 and partes[0] in ('embed', 'shorts', 'live', 'v'):
+            video_id = partes[1]
+    elif host == 'youtu.be' and partes:
+        video_id = partes[0]
+    if video_id:
+        return ('youtube', video_id) if _ID_YOUTUBE.match(video_id) else (None, None)
+
+    if host in ('vimeo.com', 'player.vimeo.com'):
+        numericos = [p for p in partes if p.isdigit()]
+        if numericos:
+            return 'vimeo', numericos[0]
+    return None, None
+
+
+def _url_poster(provedor, video_id):
+    if provedor == 'youtube':
+        return f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg'
+    if provedor == 'vimeo':
+        consulta = urllib.parse.urlencode({'url': f'https://vimeo.com/{video_id}'})
+        with urllib.request.urlopen(f'https://vimeo.com/api/oembed.json?{consulta}',
+                                    timeout=TEMPO_LIMITE_POSTER) as resposta:
+            return json.load(resposta).get('thumbnail_url')
+    return None
+
+
+def baixar_poster(provedor, video_id):
+    """Salva a miniatura do vídeo em uploads e retorna o nome do arquivo (None se falhar).
+
+    A página do curso mostra essa imagem local no lugar do player, sem contatar o provedor.
+    """
+    nome = f'poster_{provedor}_{video_id}.jpg'
+    caminho = os.path.join(current_app.config['UPLOAD_FOLDER'], nome)
+    if os.path.exists(caminho):
+        return nome
+    try:
+        url = _url_poster(provedor, video_id)
+        if not url:
+            return None
+        with urllib.request.urlopen(url, timeout=TEMPO_LIMITE_POSTER) as resposta:
+            conteudo = resposta.read()
+    except (OSError, ValueError) as erro:
+        current_app.logger.warning('Não foi possível baixar o poster de %s/%s: %s', provedor, video_id, erro)
+        return None
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(conteudo)
+    return nome
+
+
+def atualizar_video(curso, baixar=True):
+    """Preenche provedor, ID e poster do curso a partir de curso.link_video."""
+    provedor, video_id = extrair_video(curso.link_video)
+    if (provedor, video_id) != (curso.video_provedor, curso.video_id) or not curso.video_poster:
+        curso.video_provedor, curso.video_id = provedor, video_id
+        curso.video_poster = baixar_poster(provedor, video_id) if provedor and baixar else None
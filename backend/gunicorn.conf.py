@@ -0,0 +1,31 @@
+# Configuração lida automaticamente pelo gunicorn quando iniciado dentro de backend/.
+import os
+import shutil
+import tempfile
+
+# Precisa estar definido antes de a aplicação importar o prometheus_client.
+diretorio_metricas = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'fraternoamor-metricas'))
+
+# Carrega a aplicação uma vez no processo mestre: imports, templates e modelos ficam
+# em páginas compartilhadas (copy-on-write) com os workers, que sobem mais rápido.
+preload_app = True
+
+
+def on_starting(server):
+    # Arquivos de uma execução anterior somariam contadores de processos que já não existem.
+    shutil.rmtree(diretorio_metricas, ignore_errors=True)
+    os.makedirs(diretorio_metricas, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # Nenhuma conexão SQLite aberta no mestre pode ser reaproveitada depois do fork.
+    from app import app
+    from fraternoamor.extensoes import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,33 @@
+"""Indice unico e indices de consulta em presenca
+
+Revision ID: 5c2e91a7d3f4
+Revises: d4799c300a6f
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e91a7d3f4'
+down_revision = 'd4799c300a6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Remove presenças repetidas (mantém a primeira) antes de criar o índice único.
+    op.execute(
+        'DELETE FROM presenca WHERE id NOT IN '
+        '(SELECT MIN(id) FROM presenca GROUP BY reuniao_id, usuario_id)'
+    )
+    with op.batch_alter_table('presenca', schema=None) as batch_op:
+        batch_op.create_index('ix_presenca_reuniao_usuario', ['reuniao_id', 'usuario_id'], unique=True)
+        batch_op.create_index('ix_presenca_usuario_id', ['usuario_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('presenca', schema=None) as batch_op:
+        batch_op.drop_index('ix_presenca_usuario_id')
+        batch_op.drop_index('ix_presenca_reuniao_usuario')
@@ -0,0 +1,36 @@
+"""Versao do catalogo da lanchonete
+
+Revision ID: 6d0b9e4f2a17
+Revises: 3f8d2b6a41c7
+Create Date: 2026-10-19 18:12:40.518337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d0b9e4f2a17'
+down_revision = '3f8d2b6a41c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    versao_catalogo = op.create_table('versao_catalogo',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(versao_catalogo, [{'id': 1, 'versao': 0}])
+    with op.batch_alter_table('produto', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('versao', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_produto_versao'), ['versao'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('produto', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_produto_versao'))
+        batch_op.drop_column('versao')
+
+    op.drop_table('versao_catalogo')
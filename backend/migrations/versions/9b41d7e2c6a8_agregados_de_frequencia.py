@@ -0,0 +1,68 @@
+"""Agregados de frequencia por membro e por categoria
+
+Revision ID: 9b41d7e2c6a8
+Revises: 5c2e91a7d3f4
+Create Date: 2026-10-19 15:20:44.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b41d7e2c6a8'
+down_revision = '5c2e91a7d3f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resumo_presenca_membro',
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('total_presencas', sa.Integer(), nullable=False),
+    sa.Column('ultima_reuniao_data', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuario.id'], ),
+    sa.PrimaryKeyConstraint('usuario_id')
+    )
+    with op.batch_alter_table('resumo_presenca_membro', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_resumo_presenca_membro_ultima_reuniao_data'), ['ultima_reuniao_data'], unique=False)
+
+    op.create_table('resumo_presenca_categoria',
+    sa.Column('reuniao_id', sa.Integer(), nullable=False),
+    sa.Column('categoria_id', sa.Integer(), nullable=False),
+    sa.Column('data_reuniao', sa.DateTime(), nullable=False),
+    sa.Column('presentes', sa.Integer(), nullable=False),
+    sa.Column('membros', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['categoria_id'], ['categoria_usuario.id'], ),
+    sa.ForeignKeyConstraint(['reuniao_id'], ['reuniao.id'], ),
+    sa.PrimaryKeyConstraint('reuniao_id', 'categoria_id')
+    )
+    with op.batch_alter_table('resumo_presenca_categoria', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_resumo_presenca_categoria_data_reuniao'), ['data_reuniao'], unique=False)
+
+    # Os agregados começam preenchidos a partir das presenças já existentes
+    # (mesma lógica de `flask recalcular-frequencia`).
+    op.execute(
+        'INSERT INTO resumo_presenca_membro (usuario_id, total_presencas, ultima_reuniao_data) '
+        'SELECT p.usuario_id, COUNT(*), MAX(r.data_reuniao) FROM presenca p '
+        'JOIN reuniao r ON r.id = p.reuniao_id GROUP BY p.usuario_id'
+    )
+    op.execute(
+        'INSERT INTO resumo_presenca_categoria (reuniao_id, categoria_id, data_reuniao, presentes, membros) '
+        'SELECT r.id, c.id, r.data_reuniao, '
+        '(SELECT COUNT(*) FROM presenca p JOIN user_category uc ON uc.usuario_id = p.usuario_id '
+        ' WHERE p.reuniao_id = r.id AND uc.categoria_usuario_id = c.id), '
+        '(SELECT COUNT(*) FROM user_category uc WHERE uc.categoria_usuario_id = c.id) '
+        'FROM reuniao r, categoria_usuario c'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('resumo_presenca_categoria', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_resumo_presenca_categoria_data_reuniao'))
+
+    op.drop_table('resumo_presenca_categoria')
+    with op.batch_alter_table('resumo_presenca_membro', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_resumo_presenca_membro_ultima_reuniao_data'))
+
+    op.drop_table('resumo_presenca_membro')
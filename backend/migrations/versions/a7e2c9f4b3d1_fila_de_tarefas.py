@@ -0,0 +1,47 @@
+"""Fila de tarefas
+
+Revision ID: a7e2c9f4b3d1
+Revises: f4b9d2e7a1c6
+Create Date: 2026-10-19 22:15:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7e2c9f4b3d1'
+down_revision = 'f4b9d2e7a1c6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tarefa',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('parametros', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('tentativas', sa.Integer(), nullable=False),
+    sa.Column('max_tentativas', sa.Integer(), nullable=False),
+    sa.Column('progresso', sa.SmallInteger(), nullable=False),
+    sa.Column('mensagem', sa.String(length=200), nullable=True),
+    sa.Column('erro', sa.Text(), nullable=True),
+    sa.Column('arquivo_resultado', sa.String(length=200), nullable=True),
+    sa.Column('trabalhador', sa.String(length=50), nullable=True),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('criada_em', sa.DateTime(), nullable=False),
+    sa.Column('executar_em', sa.DateTime(), nullable=False),
+    sa.Column('atualizada_em', sa.DateTime(), nullable=True),
+    sa.Column('concluida_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tarefa', schema=None) as batch_op:
+        batch_op.create_index('ix_tarefa_fila', ['status', 'executar_em'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tarefa', schema=None) as batch_op:
+        batch_op.drop_index('ix_tarefa_fila')
+
+    op.drop_table('tarefa')
@@ -0,0 +1,28 @@
+"""Chave de idempotencia do pedido
+
+Revision ID: b3f8d1a6c4e2
+Revises: a7e2c9f4b3d1
+Create Date: 2026-10-20 10:12:48.215307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f8d1a6c4e2'
+down_revision = 'a7e2c9f4b3d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('pedido', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('chave_idempotencia', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_pedido_chave_idempotencia'), ['chave_idempotencia'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('pedido', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_pedido_chave_idempotencia'))
+        batch_op.drop_column('chave_idempotencia')
@@ -0,0 +1,42 @@
+"""Valores em centavos
+
+Revision ID: c51e8a3d7b92
+Revises: a2c7f0e85b39
+Create Date: 2026-10-19 20:12:41.318907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c51e8a3d7b92'
+down_revision = 'a2c7f0e85b39'
+branch_labels = None
+depends_on = None
+
+# (tabela, coluna em reais); a coluna nova ganha o sufixo _centavos.
+COLUNAS = [
+    ('produto', 'preco'),
+    ('pedido', 'valor_total'),
+    ('item_pedido', 'preco_unitario'),
+    ('pedido_arquivado', 'valor_total'),
+    ('item_pedido_arquivado', 'preco_unitario'),
+]
+
+
+def upgrade():
+    for tabela, coluna in COLUNAS:
+        # ROUND antes da troca de tipo: 5.5 * 100 pode dar 549.9999..., que o CAST truncaria.
+        op.execute(f'UPDATE {tabela} SET {coluna} = ROUND({coluna} * 100)')
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.alter_column(coluna, new_column_name=f'{coluna}_centavos',
+                                  existing_type=sa.Float(), type_=sa.Integer(), existing_nullable=False)
+
+
+def downgrade():
+    for tabela, coluna in COLUNAS:
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.alter_column(f'{coluna}_centavos', new_column_name=coluna,
+                                  existing_type=sa.Integer(), type_=sa.Float(), existing_nullable=False)
+        op.execute(f'UPDATE {tabela} SET {coluna} = {coluna} / 100.0')
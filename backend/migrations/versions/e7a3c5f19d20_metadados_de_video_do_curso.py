@@ -0,0 +1,43 @@
+"""Metadados de video do curso
+
+Revision ID: e7a3c5f19d20
+Revises: 9b41d7e2c6a8
+Create Date: 2026-10-19 16:02:17.903341
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from fraternoamor.videos import extrair_video
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3c5f19d20'
+down_revision = '9b41d7e2c6a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('curso', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('video_provedor', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('video_id', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('video_poster', sa.String(length=200), nullable=True))
+
+    # Preenche provedor e ID dos cursos existentes. Os posters não são baixados aqui
+    # (a migração não deve depender de rede): use `flask baixar-posters` em seguida.
+    conexao = op.get_bind()
+    curso = sa.table('curso', sa.column('id', sa.Integer), sa.column('link_video', sa.String),
+                     sa.column('video_provedor', sa.String), sa.column('video_id', sa.String))
+    for curso_id, link_video in conexao.execute(sa.select(curso.c.id, curso.c.link_video)).all():
+        provedor, video_id = extrair_video(link_video)
+        if provedor:
+            conexao.execute(curso.update().where(curso.c.id == curso_id)
+                            .values(video_provedor=provedor, video_id=video_id))
+
+
+def downgrade():
+    with op.batch_alter_table('curso', schema=None) as batch_op:
+        batch_op.drop_column('video_poster')
+        batch_op.drop_column('video_id')
+        batch_op.drop_column('video_provedor')
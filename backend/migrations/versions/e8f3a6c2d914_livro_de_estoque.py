@@ -0,0 +1,67 @@
+"""Livro de estoque
+
+Revision ID: e8f3a6c2d914
+Revises: c51e8a3d7b92
+Create Date: 2026-10-19 20:58:06.471235
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8f3a6c2d914'
+down_revision = 'c51e8a3d7b92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('movimento_estoque',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('produto_id', sa.Integer(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('motivo', sa.String(length=20), nullable=False),
+    sa.Column('pedido_id', sa.Integer(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('movimento_estoque', schema=None) as batch_op:
+        batch_op.create_index('ix_movimento_estoque_produto', ['produto_id', 'id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_movimento_estoque_criado_em'), ['criado_em'], unique=False)
+
+    op.create_table('saldo_estoque',
+    sa.Column('produto_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('movimento_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('estoque', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('produto_id', 'movimento_id')
+    )
+    with op.batch_alter_table('saldo_estoque', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_saldo_estoque_movimento_id'), ['movimento_id'], unique=False)
+
+    # O estoque atual de cada produto entra no livro como um ajuste inicial, já com a foto do saldo.
+    op.execute("INSERT INTO movimento_estoque (produto_id, quantidade, motivo, criado_em) "
+               "SELECT id, estoque, 'ajuste', CURRENT_TIMESTAMP FROM produto WHERE estoque <> 0")
+    op.execute("INSERT INTO saldo_estoque (produto_id, movimento_id, estoque) "
+               "SELECT produto_id, (SELECT MAX(id) FROM movimento_estoque), quantidade FROM movimento_estoque")
+
+    with op.batch_alter_table('produto', schema=None) as batch_op:
+        batch_op.drop_column('estoque')
+
+
+def downgrade():
+    with op.batch_alter_table('produto', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('estoque', sa.Integer(), nullable=True))
+
+    op.execute("UPDATE produto SET estoque = COALESCE((SELECT SUM(quantidade) FROM movimento_estoque "
+               "WHERE movimento_estoque.produto_id = produto.id), 0)")
+
+    with op.batch_alter_table('saldo_estoque', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_saldo_estoque_movimento_id'))
+
+    op.drop_table('saldo_estoque')
+    with op.batch_alter_table('movimento_estoque', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_movimento_estoque_criado_em'))
+        batch_op.drop_index('ix_movimento_estoque_produto')
+
+    op.drop_table('movimento_estoque')
@@ -0,0 +1,28 @@
+"""Versões de cache
+
+Revision ID: f4b9d2e7a1c6
+Revises: e8f3a6c2d914
+Create Date: 2026-10-19 21:40:12.318904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b9d2e7a1c6'
+down_revision = 'e8f3a6c2d914'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('versao_cache',
+    sa.Column('nome', sa.String(length=50), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('nome')
+    )
+
+
+def downgrade():
+    op.drop_table('versao_cache')
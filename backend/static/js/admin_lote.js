@@ -0,0 +1,45 @@
+// Ações em lote do painel: formulários com data-lote são enviados por fetch, e a resposta
+// traz só as linhas alteradas (veja _resposta_lote em rotas/admin.py), trocadas no lugar
+// pelo id. Sem JavaScript, os mesmos formulários fazem POST e redirect normalmente.
+document.addEventListener('submit', function(event) {
+    const form = event.target;
+    if (!form.matches('form[data-lote]')) return;
+    event.preventDefault();
+
+    // Inclui as caixas de seleção ligadas ao formulário pelo atributo form="...".
+    const dados = new FormData(form);
+    if (event.submitter && event.submitter.name) dados.append(event.submitter.name, event.submitter.value);
+    // As barras de ação em lote (com id) precisam de pelo menos uma linha marcada.
+    if (form.id && !dados.has('ids')) {
+        alert('Selecione ao menos um item.');
+        return;
+    }
+
+    const botoes = form.querySelectorAll('button');
+    botoes.forEach(botao => { botao.disabled = true; });
+    fetch(form.action, { method: 'POST', body: dados, headers: { 'X-Fragmento': '1' }, credentials: 'same-origin' })
+        .then(resposta => {
+            if (!resposta.ok) throw new Error(`Servidor respondeu ${resposta.status}`);
+            return resposta.text().then(html => aplicarFragmento(resposta.headers, html));
+        })
+        .catch(() => alert('Não foi possível concluir a ação. Recarregue a página e tente de novo.'))
+        .finally(() => botoes.forEach(botao => { botao.disabled = false; }));
+});
+
+function aplicarFragmento(cabecalhos, html) {
+    const modelo = document.createElement('template');
+    modelo.innerHTML = html;
+    Array.from(modelo.content.children).forEach(nova => {
+        const atual = nova.id && document.getElementById(nova.id);
+        if (atual) atual.replaceWith(nova);
+    });
+    (cabecalhos.get('X-Removidos') || '').split(' ').filter(Boolean).forEach(id => {
+        const linha = document.getElementById(id);
+        if (linha) linha.remove();
+    });
+    const mensagem = document.getElementById('mensagem-lote');
+    if (mensagem && cabecalhos.get('X-Mensagem')) {
+        mensagem.className = `alert alert-${cabecalhos.get('X-Categoria') || 'success'}`;
+        mensagem.textContent = decodeURIComponent(cabecalhos.get('X-Mensagem'));
+    }
+}
@@ -71,8 +71,24 @@ document.addEventListener('DOMContentLoaded', function() {
     // =======================================================
     const carrinhoSidebar = document.getElementById('carrinho-sidebar');
     if (carrinhoSidebar) {
+        // O carrinho fica salvo no navegador: recarregar a página ou perder a conexão não o apaga.
+        const CHAVE_CARRINHO = 'lanchonete-carrinho';
         let carrinho = [];
-        const botoesPedir = document.querySelectorAll('.btn-pedir');
+        try {
+            carrinho = JSON.parse(localStorage.getItem(CHAVE_CARRINHO)) || [];
+        } catch (e) {
+            carrinho = [];
+        }
+        // Carrinhos salvos antes dos preços em centavos guardavam o valor em reais.
+        carrinho.forEach(item => {
+            if (!Number.isInteger(item.precoCentavos)) item.precoCentavos = Math.round(item.preco * 100);
+            delete item.preco;
+        });
+
+        // Preços andam em centavos (inteiros) e só viram reais na exibição.
+        function formatarReais(centavos) {
+            return `R$ ${Math.floor(centavos / 100)}.${String(centavos % 100).padStart(2, '0')}`;
+        }
         const listaCarrinho = document.getElementById('carrinho-itens');
         const totalCarrinhoEl = document.getElementById('carrinho-total-preco');
         
@@ -82,16 +98,84 @@ document.addEventListener('DOMContentLoaded', function() {
         const inputNomeCliente = document.getElementById('input-nome-cliente');
         const closeButtonNome = document.querySelector('.close-button-nome');
 
-        botoesPedir.forEach(botao => {
-            botao.addEventListener('click', function() {
-                if(this.hasAttribute('disabled')) return;
-                const id = this.dataset.produtoId;
-                const nome = this.dataset.produtoNome;
-                const preco = parseFloat(this.dataset.produtoPreco);
-                adicionarAoCarrinho(id, nome, preco);
-            });
+        // Catálogo embutido na página e mantido em dia pela API (?since=<versão>, 304 se nada mudou).
+        const INTERVALO_CATALOGO_MS = 30000;
+        const catalogoUrl = carrinhoSidebar.dataset.catalogoUrl;
+        const gradeProdutos = document.querySelector('.product-grid');
+        const modeloProduto = document.getElementById('modelo-produto');
+        const produtos = new Map();
+        let versaoCatalogo = null;
+        let lanchoneteAberta = false;
+
+        gradeProdutos.addEventListener('click', function(event) {
+            const botao = event.target.closest('.btn-pedir');
+            if (!botao || botao.disabled) return;
+            const produto = produtos.get(botao.dataset.produtoId);
+            if (produto) {
+                adicionarAoCarrinho(String(produto.id), produto.nome, produto.preco_centavos);
+            }
         });
 
+        function preencherCard(card, produto) {
+            card.dataset.produtoId = produto.id;
+            const imagem = card.querySelector('.product-card-img');
+            if (imagem.getAttribute('src') !== produto.imagem) imagem.src = produto.imagem;
+            imagem.alt = produto.nome;
+            card.querySelector('h3').textContent = produto.nome;
+            card.querySelector('.product-card-category').textContent = produto.categoria;
+            const estoque = document.createElement('span');
+            estoque.className = produto.estoque > 0 ? 'stock-available' : 'stock-unavailable';
+            estoque.textContent = produto.estoque > 0 ? `Disponível: ${produto.estoque}` : 'Esgotado';
+            card.querySelector('.product-card-stock').replaceChildren(estoque);
+            card.querySelector('.product-card-price').textContent = formatarReais(produto.preco_centavos);
+            const botao = card.querySelector('.btn-pedir');
+            botao.dataset.produtoId = produto.id;
+            botao.disabled = !lanchoneteAberta || produto.estoque <= 0;
+        }
+
+        function aplicarCatalogo(dados) {
+            versaoCatalogo = dados.versao;
+            lanchoneteAberta = dados.aberta;
+            document.getElementById('status-aberta').hidden = !dados.aberta;
+            document.getElementById('status-fechada').hidden = dados.aberta;
+            const aviso = document.getElementById('aviso-lanchonete');
+            aviso.querySelector('p').textContent = dados.aviso;
+            aviso.hidden = !dados.aviso;
+
+            if (dados.completo) produtos.clear();
+            dados.produtos.forEach(produto => produtos.set(String(produto.id), produto));
+            if (dados.ids) {
+                // No modo delta, produto fora de `ids` foi excluído.
+                const existentes = new Set(dados.ids.map(String));
+                produtos.forEach((_, id) => { if (!existentes.has(id)) produtos.delete(id); });
+            }
+
+            gradeProdutos.querySelectorAll('.product-card').forEach(card => {
+                if (!produtos.has(card.dataset.produtoId)) card.remove();
+            });
+            produtos.forEach((produto, id) => {
+                let card = gradeProdutos.querySelector(`.product-card[data-produto-id="${id}"]`);
+                if (!card) {
+                    card = modeloProduto.content.firstElementChild.cloneNode(true);
+                    gradeProdutos.appendChild(card);
+                }
+                preencherCard(card, produto);
+            });
+        }
+
+        function atualizarCatalogo() {
+            if (document.hidden) return;
+            fetch(`${catalogoUrl}?since=${versaoCatalogo}`, { headers: { 'If-None-Match': `"${versaoCatalogo}"` } })
+                .then(response => response.status === 200 ? response.json().then(aplicarCatalogo) : null)
+                .catch(() => {}); // Sem conexão: tenta de novo no próximo ciclo.
+        }
+
+        aplicarCatalogo(JSON.parse(document.getElementById('catalogo-lanchonete').textContent));
+        // A página pode ter vindo do cache do service worker: confere logo se algo mudou.
+        atualizarCatalogo();
+        setInterval(atualizarCatalogo, INTERVALO_CATALOGO_MS);
+        document.addEventListener('visibilitychange', atualizarCatalogo);
+
         if (btnFinalizar) {
             btnFinalizar.addEventListener('click', function() {
                 if (carrinho.length === 0) {
@@ -102,7 +186,36 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         }
 
+        // Com o servidor sobrecarregado (503), tenta de novo depois do Retry-After, dobrando a
+        // espera a cada vez e com uma parte aleatória, para os clientes não voltarem todos juntos.
+        const MAX_TENTATIVAS_PEDIDO = 5;
+
+        // Uma chave por pedido, enviada junto com ele: se o mesmo corpo chegar de novo ao
+        // servidor (nova tentativa, fila offline do service worker), o pedido não é duplicado.
+        function novaChavePedido() {
+            if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+            return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+        }
+
+        function enviarPedido(corpo, tentativa = 0) {
+            return fetch('/finalizar-pedido', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: corpo
+            })
+            .then(response => {
+                if (response.status === 503 && tentativa < MAX_TENTATIVAS_PEDIDO) {
+                    const base = (parseFloat(response.headers.get('Retry-After')) || 1) * 1000 * 2 ** tentativa;
+                    const espera = base / 2 + Math.random() * base;
+                    return new Promise(resolve => setTimeout(resolve, espera))
+                        .then(() => enviarPedido(corpo, tentativa + 1));
+                }
+                return response.json().then(data => ({ ok: response.ok, data }));
+            });
+        }
+
         if (formNomeCliente) {
+            const botaoConfirmar = formNomeCliente.querySelector('button[type="submit"]');
             formNomeCliente.addEventListener('submit', function(event) {
                 event.preventDefault();
                 const nomeCliente = inputNomeCliente.value;
@@ -110,22 +223,32 @@ document.addEventListener('DOMContentLoaded', function() {
                     alert('Por favor, digite seu nome.');
                     return;
                 }
-                fetch('/finalizar-pedido', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ nome_cliente: nomeCliente, carrinho: carrinho })
-                })
-                .then(response => response.json())
-                .then(data => {
+                // Evita um segundo pedido igual enquanto o primeiro ainda está sendo enviado.
+                botaoConfirmar.disabled = true;
+                enviarPedido(JSON.stringify({ nome_cliente: nomeCliente, carrinho: carrinho, chave_pedido: novaChavePedido() }))
+                .then(({ ok, data }) => {
                     console.log('Sucesso:', data);
+                    if (!ok) {
+                        // Lanchonete fechada ou servidor ainda sobrecarregado: o carrinho continua salvo.
+                        alert(data.message);
+                        return;
+                    }
+                    if (data.enfileirado) {
+                        // Sem conexão: o service worker guardou o pedido e o envia depois.
+                        alert(data.message);
+                        carrinho = [];
+                        atualizarCarrinhoDisplay();
+                        nomeModal.style.display = 'none';
+                        return;
+                    }
                     const numeroWhatsapp = '5583998000756';
                     let mensagem = `Olá! Meu nome é *${nomeCliente}* e gostaria de fazer o seguinte pedido:\n\n`;
                     let total = 0;
                     carrinho.forEach(item => {
                         mensagem += `*${item.quantidade}x* - ${item.nome}\n`;
-                        total += item.preco * item.quantidade;
+                        total += item.precoCentavos * item.quantidade;
                     });
-                    mensagem += `\n*Total:* R$ ${total.toFixed(2)}`;
+                    mensagem += `\n*Total:* ${formatarReais(total)}`;
                     const mensagemCodificada = encodeURIComponent(mensagem);
                     const whatsappUrl = `https://wa.me/${numeroWhatsapp}?text=${mensagemCodificada}`;
                     window.open(whatsappUrl, '_blank');
@@ -138,7 +261,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 .catch((error) => {
                     console.error('Erro:', error);
                     alert('Ocorreu um erro ao enviar o pedido. Tente novamente.');
-                });
+                })
+                .finally(() => { botaoConfirmar.disabled = false; });
             });
         }
         
@@ -146,31 +270,56 @@ document.addEventListener('DOMContentLoaded', function() {
             closeButtonNome.addEventListener('click', () => nomeModal.style.display = 'none');
         }
 
-        function adicionarAoCarrinho(id, nome, preco) {
+        function adicionarAoCarrinho(id, nome, precoCentavos) {
             const itemExistente = carrinho.find(item => item.id === id);
             if (itemExistente) {
                 itemExistente.quantidade++;
             } else {
-                carrinho.push({ id, nome, preco, quantidade: 1 });
+                carrinho.push({ id, nome, precoCentavos, quantidade: 1 });
             }
             atualizarCarrinhoDisplay();
         }
 
         function atualizarCarrinhoDisplay() {
+            try {
+                localStorage.setItem(CHAVE_CARRINHO, JSON.stringify(carrinho));
+            } catch (e) {
+                // Navegação privada ou armazenamento cheio: o carrinho só vive nesta página.
+            }
             listaCarrinho.innerHTML = '';
             if (carrinho.length === 0) {
                 listaCarrinho.innerHTML = '<li class="carrinho-vazio">Seu carrinho está vazio.</li>';
-                totalCarrinhoEl.textContent = 'R$ 0.00';
+                totalCarrinhoEl.textContent = formatarReais(0);
                 return;
             }
             let total = 0;
             carrinho.forEach(item => {
                 const li = document.createElement('li');
-                li.innerHTML = `<span>${item.nome} (x${item.quantidade})</span><span>R$ ${(item.preco * item.quantidade).toFixed(2)}</span>`;
+                li.innerHTML = `<span>${item.nome} (x${item.quantidade})</span><span>${formatarReais(item.precoCentavos * item.quantidade)}</span>`;
                 listaCarrinho.appendChild(li);
-                total += item.preco * item.quantidade;
+                total += item.precoCentavos * item.quantidade;
+            });
+            totalCarrinhoEl.textContent = formatarReais(total);
+        }
+
+        atualizarCarrinhoDisplay();
+
+        // Service worker: cardápio disponível sem conexão e fila de pedidos offline.
+        if ('serviceWorker' in navigator) {
+            navigator.serviceWorker.register('/sw-lanchonete.js', { scope: '/lanchonete' });
+            // Onde não há Background Sync (Safari, Firefox), a própria página pede o reenvio.
+            window.addEventListener('online', () => {
+                if (navigator.serviceWorker.controller) {
+                    navigator.serviceWorker.controller.postMessage('reenviar-pedidos');
+                }
+            });
+            navigator.serviceWorker.addEventListener('message', event => {
+                if (event.data && event.data.tipo === 'pedido-enviado') {
+                    alert(event.data.ok
+                        ? 'Seu pedido guardado foi enviado com sucesso!'
+                        : 'Não foi possível enviar o pedido guardado. Por favor, faça o pedido novamente.');
+                }
             });
-            totalCarrinhoEl.textContent = `R$ ${total.toFixed(2)}`;
         }
     }
 
@@ -0,0 +1,151 @@
+// Service worker da lanchonete, gerado pela rota lanchonete.service_worker.
+// - Cardápio e imagens dos produtos abrem do cache; a rede só é consultada em segundo
+//   plano, e no máximo uma vez a cada REVALIDAR_APOS_MS.
+// - Pedidos feitos sem conexão vão para uma fila no IndexedDB e são reenviados quando
+//   a conexão volta (Background Sync, ou aviso da própria página onde não houver).
+//   Cada pedido leva uma chave_pedido: se a conexão caiu depois de o servidor gravá-lo,
+//   o reenvio devolve o pedido já gravado em vez de criar outro.
+const VERSAO = {{ versao|tojson }};
+const CACHE = `lanchonete-${VERSAO}`;
+const PRECACHE = {{ precache|tojson }};
+const URL_CARDAPIO = {{ url_for('lanchonete.lanchonete')|tojson }};
+const URL_PEDIDO = {{ url_for('lanchonete.finalizar_pedido')|tojson }};
+const PREFIXO_IMAGENS = {{ url_for('static', filename='uploads/')|tojson }};
+const REVALIDAR_APOS_MS = 60 * 1000;
+const FILA = 'pedidos-pendentes';
+
+self.addEventListener('install', event => {
+    // Sem cookies: a cópia guardada do cardápio não pode carregar mensagens de sessão.
+    const requisicoes = PRECACHE.map(url => new Request(url, { credentials: 'omit' }));
+    event.waitUntil(caches.open(CACHE).then(cache => cache.addAll(requisicoes)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(nomes => Promise.all(nomes
+                .filter(nome => nome.startsWith('lanchonete-') && nome !== CACHE)
+                .map(nome => caches.delete(nome))))
+            .then(() => self.clients.claim())
+            .then(() => reenviarPedidos().catch(() => {}))
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const requisicao = event.request;
+    const url = new URL(requisicao.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (requisicao.method === 'POST' && url.pathname === URL_PEDIDO) {
+        event.respondWith(enviarOuEnfileirar(requisicao));
+    } else if (requisicao.method !== 'GET') {
+        return;
+    } else if (url.pathname === URL_CARDAPIO) {
+        event.respondWith(doCache(event, new Request(URL_CARDAPIO, { credentials: 'omit' })));
+    } else if (url.pathname.startsWith(PREFIXO_IMAGENS) || PRECACHE.includes(url.pathname)) {
+        event.respondWith(doCache(event, requisicao));
+    }
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag === FILA) event.waitUntil(reenviarPedidos());
+});
+
+self.addEventListener('message', event => {
+    if (event.data === 'reenviar-pedidos') event.waitUntil(reenviarPedidos().catch(() => {}));
+});
+
+// Responde com a cópia guardada e, se ela já tiver mais de REVALIDAR_APOS_MS, atualiza
+// o cache em segundo plano. Sem cópia, vai à rede e guarda a resposta.
+async function doCache(event, requisicao) {
+    const cache = await caches.open(CACHE);
+    const guardada = await cache.match(requisicao);
+    const buscar = () => fetch(requisicao).then(resposta => {
+        if (resposta.ok) return cache.put(requisicao, resposta.clone()).then(() => resposta);
+        return resposta;
+    });
+    if (!guardada) return buscar();
+    const idade = Date.now() - new Date(guardada.headers.get('Date')).getTime();
+    if (!(idade < REVALIDAR_APOS_MS)) event.waitUntil(buscar().catch(() => {}));
+    return guardada;
+}
+
+async function enviarOuEnfileirar(requisicao) {
+    let corpo = await requisicao.clone().text();
+    let dados = null;
+    try {
+        dados = JSON.parse(corpo);
+    } catch (erro) {
+        // Corpo inválido: segue como veio, e o servidor responde com o erro.
+    }
+    if (dados && typeof dados === 'object' && !dados.chave_pedido) {
+        // Página antiga, ainda em cache, que não gera a chave: ela é criada aqui, antes do
+        // primeiro envio, e vai para a fila junto com o corpo.
+        dados.chave_pedido = crypto.randomUUID();
+        corpo = JSON.stringify(dados);
+    }
+    try {
+        return await fetch(URL_PEDIDO, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: corpo,
+        });
+    } catch (erro) {
+        await operarFila('readwrite', fila => fila.add(corpo));
+        if (self.registration.sync) {
+            await self.registration.sync.register(FILA).catch(() => {});
+        }
+        return new Response(JSON.stringify({
+            message: 'Sem conexão: seu pedido foi guardado e será enviado assim que a internet voltar.',
+            enfileirado: true,
+        }), { status: 202, headers: { 'Content-Type': 'application/json' } });
+    }
+}
+
+let reenvioEmAndamento = null;
+
+// Reenvia a fila em ordem. Falha de rede ou erro 5xx interrompe (o resto espera a próxima
+// tentativa); qualquer outra resposta do servidor tira o pedido da fila.
+function reenviarPedidos() {
+    reenvioEmAndamento = reenvioEmAndamento || (async () => {
+        try {
+            const pendentes = await operarFila('readonly', fila => [fila.getAllKeys(), fila.getAll()]);
+            const [chaves, corpos] = pendentes.map(pedido => pedido.result);
+            for (let i = 0; i < chaves.length; i++) {
+                const resposta = await fetch(URL_PEDIDO, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: corpos[i],
+                });
+                if (resposta.status >= 500) throw new Error(`Servidor respondeu ${resposta.status}`);
+                await operarFila('readwrite', fila => fila.delete(chaves[i]));
+                const paginas = await self.clients.matchAll({ type: 'window' });
+                paginas.forEach(pagina => pagina.postMessage({ tipo: 'pedido-enviado', ok: resposta.ok }));
+            }
+        } finally {
+            reenvioEmAndamento = null;
+        }
+    })();
+    return reenvioEmAndamento;
+}
+
+function abrirBanco() {
+    return new Promise((resolve, reject) => {
+        const abertura = indexedDB.open('lanchonete', 1);
+        abertura.onupgradeneeded = () => abertura.result.createObjectStore(FILA, { autoIncrement: true });
+        abertura.onsuccess = () => resolve(abertura.result);
+        abertura.onerror = () => reject(abertura.error);
+    });
+}
+
+// Executa `operacao` numa transação da fila e resolve quando ela termina, com o que
+// `operacao` devolveu (pedidos do IndexedDB já concluídos).
+async function operarFila(modo, operacao) {
+    const banco = await abrirBanco();
+    return new Promise((resolve, reject) => {
+        const transacao = banco.transaction(FILA, modo);
+        const resultado = operacao(transacao.objectStore(FILA));
+        transacao.oncomplete = () => resolve(resultado);
+        transacao.onerror = () => reject(transacao.error);
+    });
+}
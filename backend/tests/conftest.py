@@ -0,0 +1,41 @@
+import pytest
+
+from fraternoamor import create_app, estoque
+from fraternoamor.extensoes import db
+from fraternoamor.modelos import Configuracao, Produto
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicação com banco SQLite e pasta instance/ temporários, sem os extras de produção."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "teste.db"}',
+        'SQL_INSTRUMENTACAO': False,
+        'METRICAS_ATIVAS': False,
+        'PERFILADOR_ATIVO': False,
+        'TEMPLATES_PRECOMPILAR': False,
+        'COMPRESSAO_ATIVA': False,
+    }, instance_path=str(tmp_path))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def produto(app):
+    """Lanchonete aberta e um produto de R$ 4,50 com 10 unidades."""
+    db.session.add(Configuracao(chave='lanchonete_status', valor='Aberto'))
+    produto = Produto(nome='Pão de queijo', categoria='Salgados', preco_centavos=450)
+    db.session.add(produto)
+    db.session.flush()
+    estoque.movimentar(produto.id, 10, estoque.REPOSICAO)
+    db.session.commit()
+    return produto.id
@@ -0,0 +1,43 @@
+from fraternoamor import admissao, backup, catalogo
+from fraternoamor.extensoes import db
+from fraternoamor.modelos import Configuracao, Pedido
+
+
+def _mudar_aviso(texto):
+    registro = Configuracao.query.filter_by(chave='aviso_lanchonete').first()
+    if registro is None:
+        registro = Configuracao(chave='aviso_lanchonete')
+        db.session.add(registro)
+    registro.valor = texto
+    db.session.commit()
+
+
+def test_restaurar_publica_versao_nova_do_catalogo(app, client, produto):
+    copia = backup.fazer_backup(pausa=0)['caminho']
+    # Depois do backup o catálogo avança algumas versões, que os navegadores guardam.
+    for numero in range(5):
+        _mudar_aviso(f'Aviso {numero}')
+    versao_antiga = catalogo.versao_atual()
+    assert client.get('/lanchonete/catalogo').get_json()['versao'] == versao_antiga
+    assert admissao.lanchonete_aberta()
+
+    backup.restaurar(copia)
+    assert catalogo.versao_do_banco() > versao_antiga
+    assert catalogo.versao_atual() == catalogo.versao_do_banco()
+
+    status = Configuracao.query.filter_by(chave='lanchonete_status').one()
+    status.valor = 'Fechado'
+    db.session.commit()
+
+    assert not admissao.lanchonete_aberta()
+    resposta = client.post('/finalizar-pedido', json={
+        'nome_cliente': 'Maria', 'carrinho': [{'id': produto, 'quantidade': 1}]})
+    assert resposta.status_code == 409
+    assert Pedido.query.count() == 0
+
+    resposta = client.get('/lanchonete/catalogo', headers={'If-None-Match': f'"{versao_antiga}"'})
+    assert resposta.status_code == 200
+    assert resposta.get_json()['aberta'] is False
+    # Quem pede só as mudanças desde a versão antiga recebe o produto de novo.
+    delta = client.get(f'/lanchonete/catalogo?since={versao_antiga}').get_json()
+    assert [item['id'] for item in delta['produtos']] == [produto]
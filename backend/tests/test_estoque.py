@@ -0,0 +1,70 @@
+import datetime
+
+from fraternoamor import estoque
+from fraternoamor.extensoes import db
+from fraternoamor.modelos import MovimentoEstoque, SaldoEstoque
+
+INICIO = datetime.datetime(2026, 1, 5, 8, 0)
+
+# (produto_id, quantidade, motivo), um por minuto a partir de INICIO.
+MOVIMENTOS = [
+    (1, 10, estoque.REPOSICAO),
+    (2, 5, estoque.REPOSICAO),
+    (1, -3, estoque.VENDA),
+    (2, -5, estoque.VENDA),
+    (1, 2, estoque.ESTORNO),
+    (3, 7, estoque.AJUSTE),
+    (1, -9, estoque.VENDA),
+    (3, -1, estoque.VENDA),
+]
+
+
+def _gravar_movimentos(compactar_a_cada=None):
+    for numero, (produto_id, quantidade, motivo) in enumerate(MOVIMENTOS, start=1):
+        db.session.add(MovimentoEstoque(produto_id=produto_id, quantidade=quantidade, motivo=motivo,
+                                        criado_em=INICIO + datetime.timedelta(minutes=numero - 1)))
+        db.session.commit()
+        if compactar_a_cada and numero % compactar_a_cada == 0:
+            estoque.compactar()
+
+
+def _soma_do_livro(ate):
+    soma = {}
+    for produto_id, quantidade, _ in MOVIMENTOS[:ate]:
+        soma[produto_id] = soma.get(produto_id, 0) + quantidade
+    return soma
+
+
+def _confere_todos_os_momentos():
+    for quantos in range(len(MOVIMENTOS) + 1):
+        # Meio minuto depois do movimento `quantos`: entram exatamente os `quantos` primeiros.
+        momento = INICIO + datetime.timedelta(minutes=quantos - 1, seconds=30)
+        esperado = _soma_do_livro(quantos)
+        saldos = estoque.saldos(em=momento)
+        for produto_id in (1, 2, 3):
+            assert saldos.get(produto_id, 0) == esperado.get(produto_id, 0), (quantos, produto_id)
+    atual = estoque.saldos()
+    assert {produto_id: atual.get(produto_id, 0) for produto_id in (1, 2, 3)} == {1: 0, 2: 0, 3: 6}
+
+
+def test_saldos_sem_fotos_somam_o_livro(app):
+    _gravar_movimentos()
+    assert SaldoEstoque.query.count() == 0
+    _confere_todos_os_momentos()
+
+
+def test_saldos_com_fotos_intercaladas_continuam_iguais_ao_livro(app):
+    _gravar_movimentos(compactar_a_cada=3)
+    assert SaldoEstoque.query.count() > 0
+    _confere_todos_os_momentos()
+
+
+def test_compactar_grava_so_produtos_movimentados_desde_a_ultima_foto(app):
+    _gravar_movimentos()
+    assert estoque.compactar() == 3
+    assert estoque.compactar() == 0
+
+    estoque.movimentar(2, 4, estoque.REPOSICAO)
+    db.session.commit()
+    assert estoque.compactar() == 1
+    assert estoque.saldos([2]) == {2: 4}
@@ -0,0 +1,43 @@
+import datetime
+
+import pytest
+
+from fraternoamor import frequencia
+from fraternoamor.extensoes import bcrypt, db
+from fraternoamor.modelos import Presenca, Reuniao, Usuario
+
+
+@pytest.fixture
+def admin(client):
+    """Cliente logado como administrador."""
+    db.session.add(Usuario(username='admin', password_hash=bcrypt.generate_password_hash('senha').decode(),
+                           is_admin=True))
+    db.session.commit()
+    client.post('/login', data={'username': 'admin', 'password': 'senha'})
+    return client
+
+
+@pytest.fixture
+def faltou_a_ultima(app):
+    """Membro que foi à primeira de duas reuniões já realizadas."""
+    agora = datetime.datetime.now()
+    membro = Usuario(username='ausente', password_hash='x')
+    primeira = Reuniao(titulo='Primeira', sala_jitsi='sala-1', data_reuniao=agora - datetime.timedelta(days=14))
+    segunda = Reuniao(titulo='Segunda', sala_jitsi='sala-2', data_reuniao=agora - datetime.timedelta(days=7))
+    db.session.add_all([membro, primeira, segunda])
+    db.session.flush()
+    db.session.add(Presenca(usuario_id=membro.id, reuniao_id=primeira.id))
+    db.session.commit()
+    frequencia.recalcular()
+
+
+@pytest.mark.parametrize('url', ['/admin/reunioes/frequencia', '/admin/reunioes/frequencia.csv'])
+def test_data_malformada_vale_como_nao_preenchida(admin, url):
+    resposta = admin.get(url, query_string={'de': '2024-13-40', 'ate': 'ontem'})
+    assert resposta.status_code == 200
+
+
+def test_seguidas_zero_conta_como_uma(admin, faltou_a_ultima):
+    resposta = admin.get('/admin/reunioes/frequencia', query_string={'seguidas': 0, 'ultimas': -5})
+    assert resposta.status_code == 200
+    assert 'ausente' in resposta.get_data(as_text=True)
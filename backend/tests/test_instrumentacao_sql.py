@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from fraternoamor import create_app, instrumentacao_sql
+from fraternoamor.extensoes import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Como o app do conftest, mas com a instrumentação de SQL ligada e gravando a cada requisição."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "teste.db"}',
+        'SQL_INSTRUMENTACAO': True,
+        'SQL_RESUMO_INTERVALO': 0,
+        'METRICAS_ATIVAS': False,
+        'PERFILADOR_ATIVO': False,
+        'TEMPLATES_PRECOMPILAR': False,
+        'COMPRESSAO_ATIVA': False,
+    }, instance_path=str(tmp_path))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _outro_worker(app, requisicoes, versao=0):
+    os.makedirs(app.config['SQL_RESUMO_PASTA'], exist_ok=True)
+    with open(os.path.join(app.config['SQL_RESUMO_PASTA'], '1-1.json'), 'w') as arquivo:
+        json.dump({'versao': versao, 'endpoints': [{
+            'endpoint': 'publico.home', 'requisicoes': requisicoes, 'consultas': 3 * requisicoes,
+            'max_consultas': 9, 'tempo_db': 0.0, 'tempo_total': 0.0, 'requisicoes_n_mais_um': 0,
+            'suspeitas': {}, 'lentas': [[1.0, 'SELECT lento']],
+        }]}, arquivo)
+
+
+def _linha(app, endpoint):
+    with app.test_request_context():
+        linhas, processos = instrumentacao_sql.resumo_por_endpoint()
+    return next((linha for linha in linhas if linha['endpoint'] == endpoint), None), processos
+
+
+def test_resumo_soma_os_outros_workers(app):
+    client = app.test_client()
+    client.get('/')
+    _outro_worker(app, 4)
+    linha, processos = _linha(app, 'publico.home')
+    assert processos == 2
+    assert linha['requisicoes'] == 5
+    assert linha['max_consultas'] == 9
+    assert linha['lentas'][0] == (1000.0, 'SELECT lento')
+    # O próprio processo também deixa o seu arquivo para os outros.
+    assert len(os.listdir(app.config['SQL_RESUMO_PASTA'])) == 2
+
+
+def test_limpar_zera_todos_os_workers(app):
+    client = app.test_client()
+    client.get('/')
+    _outro_worker(app, 4)
+    with app.test_request_context():
+        instrumentacao_sql.limpar_resumo()
+    assert _linha(app, 'publico.home') == (None, 1)
+    # Worker que estava no meio de uma requisição grava números de antes da limpeza: ficam de fora.
+    _outro_worker(app, 4)
+    assert _linha(app, 'publico.home') == (None, 1)
+    client.get('/')
+    linha, _ = _linha(app, 'publico.home')
+    assert linha['requisicoes'] == 1
@@ -0,0 +1,44 @@
+import os
+
+from fraternoamor import admissao, cache_templates, catalogo, estoque, invalidacao
+from fraternoamor.extensoes import db
+from fraternoamor.modelos import Configuracao, Reuniao, VersaoCache
+
+
+def _versoes():
+    return dict(db.session.query(VersaoCache.nome, VersaoCache.versao))
+
+
+def test_tabela_sem_cache_nao_ganha_versao(app):
+    db.session.add(Reuniao(titulo='Estudo', sala_jitsi='sala-estudo'))
+    db.session.commit()
+    assert _versoes() == {}
+    assert not os.path.exists(os.path.join(app.instance_path, 'versoes_cache.json'))
+
+
+def test_movimento_de_estoque_so_versiona_o_catalogo(app, produto):
+    antes = _versoes()
+    versao = catalogo.versao_atual()
+    estoque.movimentar(produto, -1, estoque.VENDA)
+    db.session.commit()
+    depois = _versoes()
+    assert {nome for nome in depois if depois[nome] != antes.get(nome)} == {invalidacao.GLOBAL, 'versao_catalogo'}
+    assert catalogo.versao_atual() == versao + 1
+
+
+def test_mudar_configuracao_esvazia_status_e_fragmentos(app, produto):
+    assert admissao.lanchonete_aberta()
+    cache_templates._fragmentos['parte'] = (float('inf'), '<p>velho</p>')
+    status = Configuracao.query.filter_by(chave='lanchonete_status').one()
+    status.valor = 'Fechado'
+    db.session.commit()
+    assert not admissao.lanchonete_aberta()
+    assert 'parte' not in cache_templates._fragmentos
+
+
+def test_invalidar_fragmentos_nao_mexe_no_status(app, produto):
+    assert admissao.lanchonete_aberta()
+    cache_templates._fragmentos['parte'] = (float('inf'), '<p>velho</p>')
+    cache_templates.invalidar()
+    assert 'parte' not in cache_templates._fragmentos
+    assert 'aberta' in admissao._status
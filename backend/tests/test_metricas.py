@@ -0,0 +1,15 @@
+import pytest
+from flask_login import AnonymousUserMixin
+
+from fraternoamor import metricas
+
+
+@pytest.mark.parametrize('cabecalho, aceito', [
+    ('Bearer segredo', True),
+    ('Bearer errado', False),
+    ('Bearer segrédo', False),
+])
+def test_token_das_metricas(app, monkeypatch, cabecalho, aceito):
+    monkeypatch.setenv('METRICAS_TOKEN', 'segredo')
+    with app.test_request_context(headers={'Authorization': cabecalho}):
+        assert metricas.autorizado(AnonymousUserMixin()) is aceito
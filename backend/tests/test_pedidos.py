@@ -0,0 +1,82 @@
+import pytest
+
+from fraternoamor import estoque
+from fraternoamor.extensoes import db
+from fraternoamor.modelos import Cliente, MovimentoEstoque, Pedido
+from fraternoamor.rotas.lanchonete import PedidoInvalido, _gravar_pedido
+
+
+def _vendas():
+    return MovimentoEstoque.query.filter_by(motivo=estoque.VENDA).count()
+
+
+QUANTIDADES_INVALIDAS = [-2, 0, 1.5, True, '2', None]
+
+
+@pytest.mark.parametrize('quantidade', QUANTIDADES_INVALIDAS)
+def test_finalizar_pedido_recusa_quantidade_invalida(client, produto, quantidade):
+    resposta = client.post('/finalizar-pedido', json={
+        'nome_cliente': 'Maria', 'carrinho': [{'id': produto, 'quantidade': quantidade}]})
+    assert resposta.status_code == 400
+    assert estoque.saldos([produto]) == {produto: 10}
+    assert _vendas() == 0
+    assert Pedido.query.count() == 0
+
+
+@pytest.mark.parametrize('quantidade', QUANTIDADES_INVALIDAS)
+def test_gravar_pedido_recusa_antes_de_gravar(app, produto, quantidade):
+    carrinho = [{'id': produto, 'quantidade': 1}, {'id': produto, 'quantidade': quantidade}]
+    with pytest.raises(PedidoInvalido):
+        _gravar_pedido('Maria', carrinho)
+    db.session.rollback()
+    assert _vendas() == 0
+    assert Pedido.query.count() == 0
+    assert Cliente.query.count() == 0
+
+
+@pytest.mark.parametrize('carrinho', ['tudo', [1], [{'id': 'abc', 'quantidade': 1}], [{'quantidade': 1}]])
+def test_finalizar_pedido_recusa_carrinho_malformado(client, produto, carrinho):
+    resposta = client.post('/finalizar-pedido', json={'nome_cliente': 'Maria', 'carrinho': carrinho})
+    assert resposta.status_code == 400
+    assert Pedido.query.count() == 0
+
+
+def test_pedido_valido_baixa_estoque_e_soma_em_centavos(client, produto):
+    resposta = client.post('/finalizar-pedido', json={
+        'nome_cliente': 'Maria', 'carrinho': [{'id': str(produto), 'quantidade': 3}]})
+    assert resposta.status_code == 200
+    pedido = Pedido.query.one()
+    assert pedido.valor_total_centavos == 1350
+    assert isinstance(pedido.valor_total_centavos, int)
+    assert estoque.saldos([produto]) == {produto: 7}
+
+
+def test_mesma_chave_duas_vezes_grava_um_pedido_so(client, produto):
+    corpo = {'nome_cliente': 'Maria', 'carrinho': [{'id': produto, 'quantidade': 2}],
+             'chave_pedido': '8f14e45f-ceea-467f-a8f5-3c9f0e6b1d2a'}
+    primeira = client.post('/finalizar-pedido', json=corpo)
+    # O reenvio da fila offline, depois de a conexão cair com o pedido já gravado.
+    segunda = client.post('/finalizar-pedido', json=corpo)
+    assert primeira.status_code == segunda.status_code == 200
+    assert segunda.get_json() == primeira.get_json()
+    assert Pedido.query.count() == 1
+    assert _vendas() == 1
+    assert estoque.saldos([produto]) == {produto: 8}
+
+
+def test_chaves_diferentes_gravam_pedidos_diferentes(app, produto):
+    primeiro, novo = _gravar_pedido('Maria', [{'id': produto, 'quantidade': 1}], 'chave-1')
+    assert novo
+    repetido, novo = _gravar_pedido('Maria', [{'id': produto, 'quantidade': 1}], 'chave-1')
+    assert not novo and repetido.id == primeiro.id
+    outro, novo = _gravar_pedido('Maria', [{'id': produto, 'quantidade': 1}], 'chave-2')
+    assert novo and outro.id != primeiro.id
+    assert estoque.saldos([produto]) == {produto: 8}
+
+
+@pytest.mark.parametrize('chave', ['', 7, 'x' * 65])
+def test_finalizar_pedido_recusa_chave_invalida(client, produto, chave):
+    resposta = client.post('/finalizar-pedido', json={
+        'nome_cliente': 'Maria', 'carrinho': [{'id': produto, 'quantidade': 1}], 'chave_pedido': chave})
+    assert resposta.status_code == 400
+    assert Pedido.query.count() == 0
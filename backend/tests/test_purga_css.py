@@ -0,0 +1,36 @@
+import glob
+import os
+
+import pytest
+
+from fraternoamor import purga_css
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seletores de classes montadas em tempo de execução, que o CSS publicado precisa manter.
+SELETORES_DINAMICOS = [
+    '.action-button.edit', '.action-button.delete', '.action-button.available', '.action-button.complete',
+    '.status-recebido', '.status-em-produção', '.status-disponível-para-retirada', '.status-concluído',
+    '.alert-success', '.alert-danger', '.alert-info',
+    '.stock-available', '.stock-unavailable',
+]
+
+
+@pytest.fixture(scope='module')
+def css_purgado():
+    classes, prefixos = purga_css.classes_usadas(
+        os.path.join(BACKEND, 'templates'), sorted(glob.glob(os.path.join(BACKEND, 'static', 'js', '*.js'))))
+    with open(os.path.join(BACKEND, 'static', 'css', 'estilos.css'), encoding='utf-8') as arquivo:
+        css, _ = purga_css.purgar(arquivo.read(), classes, prefixos)
+    return css
+
+
+@pytest.mark.parametrize('seletor', SELETORES_DINAMICOS)
+def test_purga_mantem_classes_dinamicas(css_purgado, seletor):
+    assert f'{seletor}{{' in css_purgado or f'{seletor},' in css_purgado
+
+
+@pytest.mark.parametrize('classe', sorted(purga_css.SAFELIST))
+def test_safelist_so_tem_classes_definidas_no_css(classe):
+    with open(os.path.join(BACKEND, 'static', 'css', 'estilos.css'), encoding='utf-8') as arquivo:
+        assert classe in purga_css.classes_definidas(arquivo.read())
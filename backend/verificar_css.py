@@ -1,17 +1,9 @@
-import re
-from bs4 import BeautifulSoup
+from fraternoamor.purga_css import classes_definidas, extrair_classes_template
 
 def extrair_classes_html(arquivo_html):
-    """Extrai todas as classes únicas de um arquivo HTML."""
+    """Extrai todas as classes únicas de um arquivo HTML (ou template Jinja)."""
     try:
-        with open(arquivo_html, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f, 'html.parser')
-        
-        classes = set()
-        for tag in soup.find_all(True, class_=True):
-            for cls in tag.get('class', []):
-                classes.add(cls)
-        return classes
+        return set(extrair_classes_template(arquivo_html)[0])
     except FileNotFoundError:
         print(f"Erro: Arquivo HTML '{arquivo_html}' não encontrado.")
         return None
@@ -20,12 +12,7 @@ def extrair_classes_css(arquivo_css):
     """Extrai todos os seletores de classe de um arquivo CSS."""
     try:
         with open(arquivo_css, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Regex para encontrar seletores de classe (ex: .minha-classe, .outra-classe)
-        # Ignora pseudo-classes como :hover
-        classes = set(re.findall(r'\.([a-zA-Z0-9_-]+)', content))
-        return classes
+            return classes_definidas(f.read())
     except FileNotFoundError:
         print(f"Erro: Arquivo CSS '{arquivo_css}' não encontrado.")
         return None